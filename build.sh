@@ -2,7 +2,14 @@
 # exit on error
 set -o errexit
 
+# Ngoài web service, deploy cần thêm MỘT process worker cho hàng đợi tác vụ nền (recruitment/tasks.py),
+# ví dụ Render Background Worker dùng cùng build này với start command:
+#   python manage.py run_workers --threads 2
+# Không có worker thì hồ sơ ứng tuyển nằm mãi trong hàng đợi và không được AI chấm điểm.
+
 pip install -r requirements.txt
 
 python manage.py collectstatic --no-input
-python manage.py migrate
\ No newline at end of file
+python manage.py migrate
+python manage.py createcachetable
+python manage.py backfill_search_columns
\ No newline at end of file
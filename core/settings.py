@@ -52,6 +52,9 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'core.wsgi.application'
+# Các view async (chatbot streaming, tìm việc phù hợp) chạy được dưới cả gunicorn (WSGI) lẫn ASGI,
+# ví dụ: uvicorn core.asgi:application; chatbot streaming gửi từng đoạn ngay trên cả hai.
+ASGI_APPLICATION = 'core.asgi.application'
 
 
 if os.getenv('RENDER'):
@@ -109,6 +112,117 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'recruitment.CustomUser'
 GROQ_API_KEY = os.getenv('GROQ_API_KEY')
 
+# Cổng gọi LLM dùng chung (recruitment/llm.py)
+LLM_MODEL = os.getenv('LLM_MODEL', 'llama-3.1-8b-instant')
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', 30))
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', 3))
+LLM_BACKOFF_BASE = float(os.getenv('LLM_BACKOFF_BASE', 0.5))
+
+# Backend LLM (recruitment/llm_backends.py): groq | fake | record | replay
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'groq')
+LLM_FAKE_LATENCY = float(os.getenv('LLM_FAKE_LATENCY', 0.5))
+LLM_FAKE_LATENCY_SIGMA = float(os.getenv('LLM_FAKE_LATENCY_SIGMA', 0.3))
+LLM_FAKE_ERROR_RATE = float(os.getenv('LLM_FAKE_ERROR_RATE', 0.0))
+LLM_FAKE_SEED = int(os.getenv('LLM_FAKE_SEED', 0))
+LLM_FIXTURES_DIR = os.getenv('LLM_FIXTURES_DIR', os.path.join(BASE_DIR, 'llm_fixtures'))
+
+# Thống kê từng lời gọi LLM (recruitment/telemetry.py); giá USD cho 1 triệu token (prompt, trả lời).
+# Dòng cũ hơn LLM_TELEMETRY_RETENTION_DAYS ngày được worker (run_workers) xóa mỗi giờ.
+LLM_TELEMETRY = os.getenv('LLM_TELEMETRY', 'True') == 'True'
+LLM_TELEMETRY_RETENTION_DAYS = int(os.getenv('LLM_TELEMETRY_RETENTION_DAYS', 14))
+LLM_PRICES = {
+    'llama-3.1-8b-instant': (0.05, 0.08),
+    'llama-3.3-70b-versatile': (0.59, 0.79),
+}
+
+# Giới hạn tốc độ gọi LLM dùng chung cho mọi worker (recruitment/ratelimit.py). Token bucket mặc định tắt
+# (LLM_RATE_LIMIT_RPS=0); để bật, đặt LLM_RATE_LIMIT_RPS theo hạn mức request/phút của tài khoản Groq
+# chia cho 60, ví dụ 30 request/phút -> 0.5. Giới hạn số lời gọi đồng thời LLM_CONCURRENCY luôn áp dụng.
+LLM_RATE_LIMIT_BACKEND = os.getenv('LLM_RATE_LIMIT_BACKEND', 'db')
+LLM_RATE_LIMIT_RPS = float(os.getenv('LLM_RATE_LIMIT_RPS', 0))
+LLM_RATE_LIMIT_BURST = int(os.getenv('LLM_RATE_LIMIT_BURST', 10))
+LLM_RATE_LIMIT_BATCH_RESERVE = int(os.getenv('LLM_RATE_LIMIT_BATCH_RESERVE', 3))
+LLM_RATE_LIMIT_MAX_WAIT = float(os.getenv('LLM_RATE_LIMIT_MAX_WAIT', 20))
+LLM_CONCURRENCY = {
+    'interactive': int(os.getenv('LLM_CONCURRENCY_INTERACTIVE', 8)),
+    'batch': int(os.getenv('LLM_CONCURRENCY_BATCH', 2)),
+}
+
+# Circuit breaker cho lời gọi LLM (recruitment/circuit.py): mở sau N lần lỗi/chậm liên tiếp
+LLM_CIRCUIT_FAILURES = int(os.getenv('LLM_CIRCUIT_FAILURES', 5))
+LLM_CIRCUIT_SLOW_CALL = float(os.getenv('LLM_CIRCUIT_SLOW_CALL', 15))
+LLM_CIRCUIT_COOLDOWN = float(os.getenv('LLM_CIRCUIT_COOLDOWN', 30))
+
+# Ngân sách token (ước lượng) cho phần CV/JD trong prompt của từng chỗ gọi AI (recruitment/compaction.py)
+PROMPT_TOKEN_BUDGETS = {
+    'match': {'cv': int(os.getenv('PROMPT_MATCH_CV_TOKENS', 2000)), 'jd': int(os.getenv('PROMPT_MATCH_JD_TOKENS', 1000))},
+    'review': {'cv': int(os.getenv('PROMPT_REVIEW_CV_TOKENS', 2500)), 'jd': int(os.getenv('PROMPT_REVIEW_JD_TOKENS', 1000))},
+    'screening': {'cv': int(os.getenv('PROMPT_SCREENING_CV_TOKENS', 2500)), 'jd': int(os.getenv('PROMPT_SCREENING_JD_TOKENS', 1000))},
+    'applicant_search': {'cv': int(os.getenv('PROMPT_APPLICANT_SEARCH_TOKENS', 6000))},
+}
+
+# Chấm điểm đồng thời cho trang "AI Tìm việc phù hợp" (recruitment/scoring.py)
+JOB_MATCH_CONCURRENCY = int(os.getenv('JOB_MATCH_CONCURRENCY', 8))
+JOB_MATCH_CALL_TIMEOUT = float(os.getenv('JOB_MATCH_CALL_TIMEOUT', 20))
+JOB_MATCH_DEADLINE = float(os.getenv('JOB_MATCH_DEADLINE', 8))
+# Ngân sách token cho mỗi lời gọi chấm theo lô và cho mỗi JD đã rút gọn
+JOB_MATCH_BATCH_TOKENS = int(os.getenv('JOB_MATCH_BATCH_TOKENS', 6000))
+JOB_MATCH_JD_TOKENS = int(os.getenv('JOB_MATCH_JD_TOKENS', 250))
+# Lọc sơ bộ bằng BM25 trước khi gọi AI (recruitment/search.py)
+JOB_MATCH_TOP_K = int(os.getenv('JOB_MATCH_TOP_K', 20))
+JOB_MATCH_MIN_LEXICAL_SCORE = float(os.getenv('JOB_MATCH_MIN_LEXICAL_SCORE', 1.0))
+
+# Tìm kiếm ứng viên: số hồ sơ được lọc cục bộ rồi gửi sang AI xếp hạng lại
+APPLICANT_SEARCH_TOP_N = int(os.getenv('APPLICANT_SEARCH_TOP_N', 10))
+
+# Số dòng mỗi trang của các danh sách phân trang keyset (recruitment/pagination.py)
+PAGE_SIZE = int(os.getenv('PAGE_SIZE', 20))
+
+# Cache dùng chung, hiện dùng cho số đếm facet của bảng tin việc làm (recruitment/facets.py). Trên Render
+# dùng bảng trong database (tạo bằng createcachetable) để mọi worker cùng thấy khi cache bị xóa.
+if os.getenv('RENDER'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+JOB_FACET_CACHE_TTL = int(os.getenv('JOB_FACET_CACHE_TTL', 600))
+
+# Cache câu trả lời chatbot theo độ tương đồng câu hỏi (recruitment/answer_cache.py)
+CHATBOT_CACHE_THRESHOLD = float(os.getenv('CHATBOT_CACHE_THRESHOLD', 0.85))
+# Tỉ lệ từ nội dung trùng nhau tối thiểu (Jaccard) giữa hai câu hỏi; 0.8 cho phép thêm/bớt một từ
+# trong câu từ 4 từ nội dung nhưng không cho thay một từ ("kế toán"/"kiểm toán").
+CHATBOT_CACHE_MIN_OVERLAP = float(os.getenv('CHATBOT_CACHE_MIN_OVERLAP', 0.8))
+CHATBOT_CACHE_TTL = int(os.getenv('CHATBOT_CACHE_TTL', 7 * 24 * 3600))
+CHATBOT_CACHE_MAX_ENTRIES = int(os.getenv('CHATBOT_CACHE_MAX_ENTRIES', 500))
+
+# Hàng đợi tác vụ nền lưu trong database (recruitment/tasks.py). Khi deploy phải chạy thêm process
+# worker: python manage.py run_workers (xem build.sh).
+TASK_VISIBILITY_TIMEOUT = int(os.getenv('TASK_VISIBILITY_TIMEOUT', 300))
+TASK_MAX_ATTEMPTS = int(os.getenv('TASK_MAX_ATTEMPTS', 5))
+TASK_RETRY_BACKOFF = float(os.getenv('TASK_RETRY_BACKOFF', 10))
+
+# Trích xuất văn bản CV trong process pool riêng (recruitment/extraction.py)
+CV_EXTRACT_WORKERS = int(os.getenv('CV_EXTRACT_WORKERS', 2))
+CV_EXTRACT_MAX_BYTES = int(os.getenv('CV_EXTRACT_MAX_BYTES', 10 * 1024 * 1024))
+CV_EXTRACT_MAX_PAGES = int(os.getenv('CV_EXTRACT_MAX_PAGES', 30))
+CV_EXTRACT_TIMEOUT = float(os.getenv('CV_EXTRACT_TIMEOUT', 15))
+CV_EXTRACT_TASKS_PER_WORKER = int(os.getenv('CV_EXTRACT_TASKS_PER_WORKER', 50))
+
+# File CV được băm và ghi ra file tạm ngay trong lúc upload (recruitment/upload_handlers.py)
+FILE_UPLOAD_HANDLERS = [
+    'recruitment.upload_handlers.CVUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
 LOGIN_REDIRECT_URL = 'job_list' 
 LOGOUT_REDIRECT_URL = 'job_list' 
 LOGIN_URL = 'login' 
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser, JobPosting, Application, Profile, EmailTemplate
+from .models import CustomUser, JobPosting, Application, Profile, EmailTemplate, Task, ChatAnswer, ChatCacheStats, LLMCall
+from . import tasks
 class CustomUserAdmin(UserAdmin):
     model = CustomUser
     list_display = ('username', 'email', 'user_type', 'is_staff')
@@ -15,4 +16,36 @@ admin.site.register(CustomUser, CustomUserAdmin)
 admin.site.register(JobPosting)
 admin.site.register(Application)
 admin.site.register(Profile)
-admin.site.register(EmailTemplate)
\ No newline at end of file
+admin.site.register(EmailTemplate)
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'attempts', 'max_attempts', 'available_at', 'locked_by', 'created_at')
+    list_filter = ('status', 'name')
+    readonly_fields = ('last_error',)
+    actions = ['requeue_tasks']
+
+    @admin.action(description="Đưa lại vào hàng đợi (tác vụ thất bại)")
+    def requeue_tasks(self, request, queryset):
+        count = tasks.requeue(queryset)
+        self.message_user(request, f"Đã đưa {count} tác vụ trở lại hàng đợi.")
+
+@admin.register(ChatAnswer)
+class ChatAnswerAdmin(admin.ModelAdmin):
+    list_display = ('question', 'hits', 'created_at', 'last_used_at')
+    search_fields = ('question', 'answer')
+    exclude = ('vector',)
+    readonly_fields = ('normalized', 'hits', 'created_at', 'last_used_at')
+
+@admin.register(ChatCacheStats)
+class ChatCacheStatsAdmin(admin.ModelAdmin):
+    list_display = ('date', 'lookups', 'hits', 'hit_rate')
+
+    @admin.display(description="Tỉ lệ trúng cache")
+    def hit_rate(self, obj):
+        return f"{obj.hits / obj.lookups:.0%}" if obj.lookups else "-"
+
+@admin.register(LLMCall)
+class LLMCallAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'call_site', 'model', 'status', 'prompt_tokens', 'completion_tokens', 'latency_ms', 'retries')
+    list_filter = ('call_site', 'status', 'model')
+    date_hierarchy = 'created_at'
@@ -0,0 +1,163 @@
+"""
+Cache câu trả lời của chatbot cho các câu hỏi lặp lại (cách nộp hồ sơ, định dạng CV, mẹo phỏng vấn...).
+
+Câu hỏi được chuẩn hóa (chữ thường, bỏ dấu, bỏ từ dừng) rồi biến thành vector n-gram băm
+(hashing trick, NumPy) đã chuẩn hóa L2; các cụm hỏi cách làm ("cách", "làm sao", "thế nào") cũng
+bị bỏ nên "cách nộp hồ sơ" và "làm sao để nộp hồ sơ" là cùng một câu. Câu hỏi mới được so với các
+câu còn hạn bằng cosine; câu đã lưu chỉ được dùng lại nếu độ tương đồng >= CHATBOT_CACHE_THRESHOLD,
+tập từ nội dung của hai câu trùng nhau đủ nhiều (Jaccard >= CHATBOT_CACHE_MIN_OVERLAP) và từ phủ
+định ("không", "chưa"...) đứng cùng chỗ. Cosine cao mà khác một từ trong câu ngắn ("kế toán"/"kiểm
+toán") hoặc khác phủ định ("nên"/"không nên") thì vẫn hỏi AI.
+
+Các câu trả lời lưu trong bảng ChatAnswer (dùng chung cho mọi worker), hết hạn sau
+CHATBOT_CACHE_TTL giây và bị xóa theo LRU (last_used_at) khi vượt CHATBOT_CACHE_MAX_ENTRIES.
+Ma trận vector được giữ trong bộ nhớ và chỉ nạp lại khi bảng thay đổi. Tỉ lệ trúng cache theo
+ngày nằm ở bảng ChatCacheStats (xem trong trang admin).
+"""
+import zlib
+import threading
+from datetime import timedelta
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, F, Max
+from django.utils import timezone
+from .models import ChatAnswer, ChatCacheStats
+from .search import tokenize
+
+DIM = 1024
+
+# Từ đệm trong câu hỏi hội thoại, không mang nghĩa khi so khớp.
+CHAT_STOPWORDS = {
+    'xin', 'chao', 'ban', 'oi', 'a', 'nhe', 'vay', 'minh', 'toi', 'em', 'anh', 'chi', 'hoi',
+    'giup', 'cam', 'on', 'hi', 'hello', 'please', 'can', 'you', 'me', 'my', 'i',
+}
+
+# Cụm hỏi cách làm, không đổi nghĩa câu hỏi (sau tokenize: "thế", "như", "để" đã là từ dừng).
+# Cụm dài đứng trước để "lam sao" không bị tách.
+QUESTION_PHRASES = (('lam', 'sao'), ('lam', 'nao'), ('ra', 'sao'), ('cach',), ('nao',))
+
+# Từ phủ định: phải khớp cả từ đứng sau ("khong nen" khác "nen ... khong").
+NEGATIONS = {'khong', 'ko', 'chang', 'chua'}
+
+_index = {
+    'generation': None, 'ids': [], 'keys': [],
+    'matrix': np.zeros((0, DIM), dtype=np.float32), 'created': np.zeros(0),
+}
+_index_lock = threading.Lock()
+
+def _config():
+    return {
+        'threshold': getattr(settings, 'CHATBOT_CACHE_THRESHOLD', 0.85),
+        'ttl': timedelta(seconds=getattr(settings, 'CHATBOT_CACHE_TTL', 7 * 24 * 3600)),
+        'max_entries': getattr(settings, 'CHATBOT_CACHE_MAX_ENTRIES', 500),
+        'min_overlap': getattr(settings, 'CHATBOT_CACHE_MIN_OVERLAP', 0.8),
+    }
+
+def _strip_question_phrases(words):
+    kept = []
+    i = 0
+    while i < len(words):
+        for phrase in QUESTION_PHRASES:
+            if tuple(words[i:i + len(phrase)]) == phrase:
+                i += len(phrase)
+                break
+        else:
+            kept.append(words[i])
+            i += 1
+    return kept
+
+def normalize_question(text):
+    return ' '.join(_strip_question_phrases([token for token in tokenize(text) if token not in CHAT_STOPWORDS]))
+
+def content_key(normalized):
+    """Tập từ nội dung của câu hỏi đã chuẩn hóa, kèm vị trí tương đối của các từ phủ định."""
+    words = normalized.split()
+    negations = frozenset(
+        (word, words[i + 1] if i + 1 < len(words) else None) for i, word in enumerate(words) if word in NEGATIONS
+    )
+    return frozenset(words), negations
+
+def overlap(words, other):
+    """Hệ số Jaccard của hai tập từ nội dung."""
+    union = words | other
+    return len(words & other) / len(union) if union else 1.0
+
+def _bucket(feature):
+    # crc32 ổn định giữa các process (khác với hash() của Python).
+    return zlib.crc32(feature.encode('utf-8')) % DIM
+
+def embed(normalized):
+    """Vector n-gram băm: từ đơn (trọng số 1) và 3-gram ký tự (trọng số 0.5), chuẩn hóa L2."""
+    vector = np.zeros(DIM, dtype=np.float32)
+    for word in normalized.split():
+        vector[_bucket('w:' + word)] += 1.0
+    padded = f" {normalized} "
+    for i in range(len(padded) - 2):
+        vector[_bucket('c:' + padded[i:i + 3])] += 0.5
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def _load_index():
+    generation = tuple(ChatAnswer.objects.aggregate(max_id=Max('id'), count=Count('id')).values())
+    with _index_lock:
+        if _index['generation'] != generation:
+            rows = list(ChatAnswer.objects.values_list('id', 'normalized', 'vector', 'created_at'))
+            _index['ids'] = [row[0] for row in rows]
+            # Chuẩn hóa lại để các câu lưu trước khi đổi quy tắc chuẩn hóa vẫn so khớp đúng.
+            _index['keys'] = [content_key(normalize_question(row[1])) for row in rows]
+            _index['matrix'] = (
+                np.vstack([np.frombuffer(bytes(row[2]), dtype=np.float32) for row in rows])
+                if rows else np.zeros((0, DIM), dtype=np.float32)
+            )
+            _index['created'] = np.array([row[3].timestamp() for row in rows], dtype=np.float64)
+            _index['generation'] = generation
+        return _index['ids'], _index['keys'], _index['matrix'], _index['created']
+
+def _count(hit):
+    stats, _ = ChatCacheStats.objects.get_or_create(date=timezone.localdate())
+    ChatCacheStats.objects.filter(pk=stats.pk).update(
+        lookups=F('lookups') + 1, hits=F('hits') + (1 if hit else 0)
+    )
+
+def lookup(question):
+    """Trả về câu trả lời đã lưu cho câu hỏi tương tự, hoặc None."""
+    config = _config()
+    normalized = normalize_question(question)
+    answer = None
+    if normalized:
+        ids, keys, matrix, created = _load_index()
+        if ids:
+            now = timezone.now()
+            cutoff = now - config['ttl']
+            similarities = matrix @ embed(normalized)
+            # Bỏ các câu đã hết hạn trước khi chọn câu giống nhất.
+            candidates = np.flatnonzero((similarities >= config['threshold']) & (created >= cutoff.timestamp()))
+            words, negations = content_key(normalized)
+            for i in candidates[np.argsort(-similarities[candidates], kind='stable')]:
+                stored_words, stored_negations = keys[i]
+                if stored_negations != negations or overlap(stored_words, words) < config['min_overlap']:
+                    continue
+                entry = ChatAnswer.objects.filter(pk=ids[i], created_at__gte=cutoff).first()
+                if entry:
+                    ChatAnswer.objects.filter(pk=entry.pk).update(hits=F('hits') + 1, last_used_at=now)
+                    answer = entry.answer
+                    break
+    _count(answer is not None)
+    return answer
+
+def store(question, answer):
+    normalized = normalize_question(question)
+    if not normalized or not answer:
+        return
+    config = _config()
+    ChatAnswer.objects.create(
+        question=question[:500],
+        normalized=normalized[:500],
+        vector=embed(normalized).tobytes(),
+        answer=answer,
+    )
+    ChatAnswer.objects.filter(created_at__lt=timezone.now() - config['ttl']).delete()
+    stale = ChatAnswer.objects.order_by('-last_used_at').values_list('id', flat=True)[config['max_entries']:]
+    stale_ids = list(stale)
+    if stale_ids:
+        ChatAnswer.objects.filter(id__in=stale_ids).delete()
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class RecruitmentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recruitment'
+
+    def ready(self):
+        # Đăng ký signal đồng bộ chỉ mục full-text và xóa cache đếm facet khi JobPosting được lưu/xóa.
+        from . import fulltext, facets  # noqa: F401
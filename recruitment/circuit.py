@@ -0,0 +1,104 @@
+"""
+Circuit breaker cho lời gọi LLM.
+
+Khi Groq lỗi hoặc chậm, mỗi lời gọi phải chờ hết timeout và retry mới thất bại, làm mọi trang AI
+cùng chậm theo. Breaker đếm số lời gọi thất bại liên tiếp (lỗi API sau khi đã retry, hoặc thành công
+nhưng chậm hơn LLM_CIRCUIT_SLOW_CALL giây):
+
+- closed   : bình thường, lời gọi đi qua.
+- open     : sau LLM_CIRCUIT_FAILURES lần thất bại liên tiếp; mọi lời gọi bị từ chối ngay
+             (llm.CircuitOpenError) trong LLM_CIRCUIT_COOLDOWN giây để các chỗ gọi dùng điểm tạm tính.
+- half_open: hết thời gian chờ, cho đúng một lời gọi thử đi qua; thành công thì đóng lại,
+             thất bại thì mở tiếp một chu kỳ nữa.
+
+Trạng thái nằm trong bộ nhớ của từng process (mỗi worker tự phát hiện sự cố của riêng mình).
+"""
+import time
+import threading
+from django.conf import settings
+
+# Giá trị allow() trả về cho lời gọi thử của trạng thái half_open.
+TRIAL = 'trial'
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, slow_call=15.0, cooldown=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.slow_call = slow_call
+        self.cooldown = cooldown
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return 'closed'
+        if self.clock() - self._opened_at < self.cooldown:
+            return 'open'
+        return 'half_open'
+
+    def allow(self):
+        """
+        Giá trị truthy nếu lời gọi được phép đi qua: True khi closed, TRIAL cho đúng một lời gọi thử ở
+        half_open (lời gọi đó phải kết thúc bằng record_success/record_failure hoặc release()).
+        """
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial_running:
+                self._trial_running = True
+                return TRIAL
+            return False
+
+    def record_success(self, latency):
+        if latency > self.slow_call:
+            self.record_failure()
+            return
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._trial_running:
+                    print(f"Circuit breaker LLM mở sau {self._failures} lần thất bại liên tiếp.")
+                self._opened_at = self.clock()
+            self._trial_running = False
+
+    def release(self):
+        """Lời gọi thử bị hủy giữa chừng (không rõ thành công hay thất bại): cho lời gọi khác thử lại."""
+        with self._lock:
+            self._trial_running = False
+
+_breaker = None
+_breaker_lock = threading.Lock()
+
+def get_breaker():
+    global _breaker
+    with _breaker_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker(
+                failure_threshold=getattr(settings, 'LLM_CIRCUIT_FAILURES', 5),
+                slow_call=getattr(settings, 'LLM_CIRCUIT_SLOW_CALL', 15),
+                cooldown=getattr(settings, 'LLM_CIRCUIT_COOLDOWN', 30),
+            )
+        return _breaker
+
+def set_breaker(breaker):
+    """Thay breaker (ví dụ với đồng hồ giả khi test). Truyền None để tạo lại theo cấu hình."""
+    global _breaker
+    _breaker = breaker
+
+def is_open():
+    """True khi breaker đang mở và chưa đến lúc thử lại (không chiếm lượt thử của half_open)."""
+    return get_breaker().state == 'open'
@@ -0,0 +1,145 @@
+"""
+Rút gọn CV/JD trước khi đưa vào prompt, theo ngân sách token của từng chỗ gọi AI.
+
+1. clean_text(): bỏ khoảng trắng thừa, dòng trang trí (----, số trang) và các dòng lặp lại
+   như header/footer của PDF.
+2. Chia văn bản thành các mục theo tiêu đề (Kỹ năng, Kinh nghiệm, Học vấn, Sở thích...).
+3. Điền ngân sách theo thứ tự ưu tiên: kỹ năng, kinh nghiệm/dự án, giới thiệu, học vấn,
+   các mục khác, cuối cùng là các mục ít giá trị (sở thích, người tham chiếu). Mục cuối cùng
+   còn chỗ bị cắt bớt; kết quả giữ nguyên thứ tự các mục như văn bản gốc.
+
+Ngân sách được cấu hình trong settings.PROMPT_TOKEN_BUDGETS. Số token CV/JD trước/sau khi rút gọn
+được giữ trong context hiện tại cho tới lời gọi AI kế tiếp: llm.complete()/acomplete()/astream() lấy ra
+bằng take_counts() và lưu vào dòng LLMCall (tokens_before/tokens_after), nên telemetry.summarize() và
+`manage.py llm_stats` cho thấy lượng token tiết kiệm được của từng chỗ gọi.
+"""
+import re
+import contextvars
+from collections import Counter
+from django.conf import settings
+from .search import fold_diacritics
+
+DEFAULT_BUDGETS = {
+    'match': {'cv': 2000, 'jd': 1000},
+    'review': {'cv': 2500, 'jd': 1000},
+    'screening': {'cv': 2500, 'jd': 1000},
+    'applicant_search': {'cv': 6000},
+}
+
+# Độ ưu tiên của các mục (số nhỏ được giữ trước) và từ khóa nhận diện tiêu đề (đã bỏ dấu).
+SECTION_PRIORITIES = (
+    (0, ('ky nang', 'skill', 'cong nghe', 'technical', 'chuyen mon', 'yeu cau')),
+    (1, ('kinh nghiem', 'experience', 'du an', 'project', 'qua trinh lam viec', 'work history', 'mo ta cong viec')),
+    (2, ('muc tieu', 'objective', 'summary', 'gioi thieu', 'tom tat', 'about')),
+    (3, ('hoc van', 'education', 'bang cap', 'chung chi', 'certificat', 'giai thuong', 'award')),
+    (5, ('so thich', 'hobbies', 'interest', 'tham chieu', 'reference', 'hoat dong', 'quyen loi', 'phuc loi', 'benefit')),
+)
+OTHER_PRIORITY = 4
+
+NOISE_LINE_RE = re.compile(r'^[\W_]+$|^(trang|page)\s*\d+(\s*(/|of|trên)\s*\d+)?$', re.IGNORECASE)
+
+# (token trước, token sau) của các lần rút gọn chưa gắn vào lời gọi AI nào. Dùng ContextVar để các
+# task asyncio chạy song song (mỗi task một bản sao context) không cộng lẫn vào nhau.
+_pending = contextvars.ContextVar('compaction_pending', default=(0, 0))
+
+def count_tokens(text):
+    # Ước lượng thô: tiếng Việt có dấu tốn khoảng 3 ký tự cho mỗi token.
+    return len(text or '') // 3 + 1
+
+def clean_text(text):
+    lines = [' '.join(line.split()) for line in (text or '').splitlines()]
+    lines = [line for line in lines if line and not NOISE_LINE_RE.match(line)]
+    # Dòng ngắn lặp lại từ 3 lần trở lên thường là header/footer của từng trang.
+    repeated = {line for line, count in Counter(lines).items() if count >= 3 and len(line) < 80}
+    kept, seen = [], set()
+    for line in lines:
+        if line in repeated:
+            if line in seen:
+                continue
+            seen.add(line)
+        kept.append(line)
+    return '\n'.join(kept)
+
+def _heading_priority(line):
+    if len(line) > 50:
+        return None
+    folded = fold_diacritics(line)
+    for priority, keywords in SECTION_PRIORITIES:
+        if any(keyword in folded for keyword in keywords):
+            return priority
+    return None
+
+def split_sections(text):
+    """Trả về danh sách (độ ưu tiên, [các dòng]) theo thứ tự xuất hiện."""
+    sections = [[OTHER_PRIORITY, []]]
+    for line in text.splitlines():
+        priority = _heading_priority(line)
+        if priority is not None:
+            sections.append([priority, [line]])
+        else:
+            sections[-1][1].append(line)
+    return [(priority, lines) for priority, lines in sections if lines]
+
+def _truncate(text, max_tokens):
+    if count_tokens(text) <= max_tokens:
+        return text
+    cut = text[:max(0, max_tokens * 3)]
+    # Cắt ở ranh giới từ để không để lại nửa chữ.
+    return cut.rsplit(' ', 1)[0] if ' ' in cut else cut
+
+def compact(text, max_tokens):
+    """Làm sạch và rút gọn văn bản cho vừa max_tokens, ưu tiên các mục có giá trị cao."""
+    cleaned = clean_text(text)
+    if count_tokens(cleaned) <= max_tokens:
+        return cleaned
+
+    sections = split_sections(cleaned)
+    order = sorted(range(len(sections)), key=lambda index: sections[index][0])
+    kept = {}
+    remaining = max_tokens
+    for index in order:
+        if remaining <= 0:
+            break
+        section_text = '\n'.join(sections[index][1])
+        kept[index] = _truncate(section_text, remaining)
+        remaining -= count_tokens(kept[index])
+    return '\n'.join(kept[index] for index in sorted(kept))
+
+def record(before, after):
+    pending_before, pending_after = _pending.get()
+    _pending.set((pending_before + before, pending_after + after))
+
+def take_counts():
+    """(token trước, token sau) rút gọn từ lần lấy trước tới giờ trong context hiện tại, rồi đặt lại về 0."""
+    counts = _pending.get()
+    _pending.set((0, 0))
+    return counts
+
+def _budget(call_site, part):
+    budgets = getattr(settings, 'PROMPT_TOKEN_BUDGETS', DEFAULT_BUDGETS)
+    return budgets.get(call_site, DEFAULT_BUDGETS.get(call_site, {})).get(part)
+
+def fit_prompt(call_site, cv_text='', jd_text=''):
+    """Rút gọn cặp CV/JD theo ngân sách của call_site. Trả về (cv_text, jd_text) đã rút gọn."""
+    cv_compact = compact(cv_text, _budget(call_site, 'cv') or 2000) if cv_text else ''
+    jd_compact = compact(jd_text, _budget(call_site, 'jd') or 1000) if jd_text else ''
+    record(
+        count_tokens(cv_text) + count_tokens(jd_text),
+        count_tokens(cv_compact) + count_tokens(jd_compact),
+    )
+    return cv_compact, jd_compact
+
+def fit_many(call_site, texts):
+    """
+    Rút gọn nhiều CV ({key: text}) cho cùng một prompt: ngân sách 'cv' của call_site được chia
+    đều cho các CV. Trả về {key: text đã rút gọn}.
+    """
+    if not texts:
+        return {}
+    share = max(50, (_budget(call_site, 'cv') or 6000) // len(texts))
+    compacted = {key: compact(text, share) for key, text in texts.items()}
+    record(
+        sum(count_tokens(text) for text in texts.values()),
+        sum(count_tokens(text) for text in compacted.values()),
+    )
+    return compacted
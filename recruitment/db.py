@@ -0,0 +1,22 @@
+"""
+Truy cập ORM từ coroutine chạy ngoài vòng đời request, ví dụ trên loop nền của llm.py.
+
+Django chỉ gọi close_old_connections() khi request bắt đầu/kết thúc. Thread của executor mà
+sync_to_async dùng cho loop nền không thuộc request nào, nên kết nối của nó không bao giờ được
+đóng theo CONN_MAX_AGE và vẫn hỏng sau khi database khởi động lại. database_sync_to_async()
+dọn kết nối trước và sau mỗi lần gọi, giống như một request.
+"""
+import functools
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+def database_sync_to_async(func):
+    """Như sync_to_async(func), nhưng gọi close_old_connections() trước và sau func."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(wrapper)
@@ -0,0 +1,242 @@
+"""
+Dịch vụ trích xuất văn bản CV chạy trong một process pool riêng.
+
+PyMuPDF và bộ đọc DOCX (lxml) được chạy ngoài luồng xử lý request, có giới hạn về dung lượng file,
+số trang PDF và thời gian cho mỗi tài liệu (tính từ lúc worker bắt đầu xử lý, không tính thời gian
+chờ worker rảnh). Tài liệu quá thời gian chỉ làm dừng worker đang xử lý nó. Các worker được thay mới
+sau một số tài liệu nhất định để bộ nhớ bị phình ra do file lớn/hỏng không tồn tại mãi.
+
+Module này không được import models: các worker (spawn) chỉ cần fitz và lxml.
+"""
+import io
+import os
+import re
+import mmap
+import zipfile
+import threading
+import multiprocessing
+import fitz
+from lxml import etree
+from django.conf import settings
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+DOCX_PART_PATTERN = re.compile(r'^word/(header\d*|document|footer\d*)\.xml$')
+
+_pool = None
+_pool_lock = threading.Lock()
+_workers_override = None
+
+def _limits():
+    return {
+        'workers': _workers_override if _workers_override is not None else getattr(settings, 'CV_EXTRACT_WORKERS', 2),
+        'max_bytes': getattr(settings, 'CV_EXTRACT_MAX_BYTES', 10 * 1024 * 1024),
+        'max_pages': getattr(settings, 'CV_EXTRACT_MAX_PAGES', 30),
+        'timeout': getattr(settings, 'CV_EXTRACT_TIMEOUT', 15),
+        'tasks_per_worker': getattr(settings, 'CV_EXTRACT_TASKS_PER_WORKER', 50),
+    }
+
+def _extract(data, file_extension, max_pages):
+    """Chạy trong worker: trích xuất văn bản, chỉ đọc tối đa max_pages trang PDF."""
+    if file_extension == '.pdf':
+        with fitz.open(stream=data, filetype='pdf') as doc:
+            return "".join(doc[i].get_text() for i in range(min(doc.page_count, max_pages)))
+
+    if file_extension == '.docx':
+        return extract_docx_text(data if hasattr(data, 'read') else io.BytesIO(data))
+
+    return None
+
+def _docx_part_order(name):
+    part = DOCX_PART_PATTERN.match(name).group(1)
+    return (0 if part.startswith('header') else 1 if part == 'document' else 2, name)
+
+def extract_docx_text(source):
+    """
+    Đọc văn bản DOCX bằng cách stream các phần XML (header, nội dung, footer) ra khỏi file zip
+    với lxml.etree.iterparse, thay vì dựng toàn bộ mô hình đối tượng của python-docx.
+    Lấy được cả chữ trong bảng và text box (thường chứa phần kỹ năng của nhiều mẫu CV),
+    bỏ qua nhánh mc:Fallback để text box không bị lặp hai lần.
+    """
+    parts = []
+    with zipfile.ZipFile(source) as archive:
+        names = sorted((n for n in archive.namelist() if DOCX_PART_PATTERN.match(n)), key=_docx_part_order)
+        for name in names:
+            with archive.open(name) as xml:
+                fallback_depth = 0
+                for event, elem in etree.iterparse(xml, events=('start', 'end')):
+                    tag = elem.tag
+                    if tag == MC_FALLBACK:
+                        fallback_depth += 1 if event == 'start' else -1
+                        continue
+                    if event == 'start' or fallback_depth:
+                        continue
+                    if tag == W_NS + 't':
+                        parts.append(elem.text or '')
+                    elif tag == W_NS + 'tab' and elem.getparent().tag == W_NS + 'r':
+                        parts.append('\t')
+                    elif tag in (W_NS + 'br', W_NS + 'cr'):
+                        parts.append('\n')
+                    elif tag == W_NS + 'p':
+                        parts.append('\n')
+                        elem.clear()
+    return "".join(parts)
+
+def _extract_path(path, file_extension, max_pages):
+    """Chạy trong worker: đọc file tạm qua mmap thay vì nạp toàn bộ nội dung vào bộ nhớ."""
+    with open(path, 'rb') as f:
+        if file_extension == '.docx':
+            # zipfile chỉ đọc những phần cần thiết của file.
+            return _extract(f, file_extension, max_pages)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf, memoryview(buf) as view:
+            return _extract(view, file_extension, max_pages)
+
+def _worker_main(conn):
+    """Vòng lặp của một worker: nhận (hàm, tham số), gửi lại (True, kết quả) hoặc (False, lỗi)."""
+    conn.send(None)  # đã import xong, sẵn sàng nhận tài liệu
+    while True:
+        try:
+            func, args = conn.recv()
+        except EOFError:
+            return
+        try:
+            reply = (True, func(*args))
+        except Exception as e:
+            reply = (False, e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # Lỗi không pickle được: gửi lại dạng RuntimeError để nơi gọi vẫn nhận được thông báo.
+            conn.send((False, RuntimeError(f"{e.__class__.__name__}: {e}")))
+
+class _Worker:
+    """Một process trích xuất, nói chuyện với process chính qua Pipe riêng."""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+        self.conn.recv()
+
+    def run(self, func, args, timeout):
+        """
+        Trả về (ok, kết quả hoặc lỗi của func). Thời gian chỉ tính từ lúc worker nhận tài liệu.
+        Ném TimeoutError nếu quá timeout, EOFError/OSError nếu worker chết giữa chừng.
+        """
+        self.tasks += 1
+        self.conn.send((func, args))
+        if not self.conn.poll(timeout):
+            raise TimeoutError
+        return self.conn.recv()
+
+    def stop(self):
+        self.process.terminate()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+class _WorkerPool:
+    """
+    Tối đa workers process, mỗi tài liệu chiếm riêng một worker. Tài liệu quá thời gian chỉ làm dừng
+    đúng worker đang xử lý nó; các worker khác tiếp tục chạy. Worker được khởi động khi cần và thay
+    mới sau tasks_per_worker tài liệu.
+    """
+
+    def __init__(self, workers, tasks_per_worker):
+        # 'spawn': fork một process đang chạy nhiều thread (gunicorn, asyncio) không an toàn.
+        self.context = multiprocessing.get_context('spawn')
+        self.tasks_per_worker = tasks_per_worker
+        self.closed = False
+        self._slots = threading.BoundedSemaphore(workers)
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def run(self, func, args, timeout):
+        with self._slots:
+            with self._lock:
+                worker = self._idle.pop() if self._idle else None
+            worker = worker or _Worker(self.context)
+            try:
+                ok, value = worker.run(func, args, timeout)
+            except BaseException:
+                worker.stop()
+                raise
+            self._release(worker)
+        if not ok:
+            raise value
+        return value
+
+    def _release(self, worker):
+        with self._lock:
+            if not self.closed and worker.tasks < self.tasks_per_worker:
+                self._idle.append(worker)
+                return
+        worker.stop()
+
+    def shutdown(self):
+        """Dừng các worker rảnh; worker đang bận sẽ dừng khi xong tài liệu hiện tại."""
+        with self._lock:
+            self.closed = True
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+
+def _get_pool(limits):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = _WorkerPool(limits['workers'], limits['tasks_per_worker'])
+        return _pool
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+def set_worker_count(workers):
+    """Đổi số worker của pool (ví dụ cho lệnh backfill chạy trên mọi CPU)."""
+    global _workers_override
+    _reset_pool()
+    _workers_override = workers
+
+def _run(func, source, file_extension, size):
+    file_extension = file_extension.lower()
+    if file_extension not in SUPPORTED_EXTENSIONS:
+        print(f"Định dạng file không được hỗ trợ: {file_extension}")
+        return None
+
+    limits = _limits()
+    if size > limits['max_bytes']:
+        print(f"File CV quá lớn ({size} bytes), giới hạn là {limits['max_bytes']} bytes.")
+        return None
+
+    if limits['workers'] <= 0:
+        return func(source, file_extension, limits['max_pages'])
+
+    try:
+        return _get_pool(limits).run(func, (source, file_extension, limits['max_pages']), limits['timeout'])
+    except TimeoutError:
+        print(f"Trích xuất CV vượt quá {limits['timeout']} giây, đã dừng worker xử lý file này.")
+    except (EOFError, OSError):
+        print("Worker trích xuất CV bị dừng bất thường, sẽ khởi động worker mới.")
+    return None
+
+def extract_text(data, file_extension):
+    """
+    Trích xuất văn bản từ nội dung nhị phân của CV (PDF hoặc DOCX) trong process pool.
+    Trả về None nếu định dạng không được hỗ trợ, file vượt giới hạn, quá thời gian hoặc worker
+    bị dừng; lỗi khi phân tích file (PDF hỏng...) được ném lại cho nơi gọi như trước đây.
+    """
+    return _run(_extract, data, file_extension, len(data))
+
+def extract_text_from_path(path, file_extension):
+    """
+    Như extract_text nhưng nhận đường dẫn file trên đĩa (ví dụ file tạm của upload).
+    Chỉ đường dẫn được gửi sang worker; worker tự ánh xạ file vào bộ nhớ.
+    """
+    return _run(_extract_path, path, file_extension, os.path.getsize(path))
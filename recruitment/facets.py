@@ -0,0 +1,89 @@
+"""
+Số tin tuyển dụng theo từng ngành nghề và tỉnh/thành cho bộ lọc của bảng tin việc làm.
+
+Với câu tìm kiếm hiện tại, một truy vấn GROUP BY (category, province_folded) trên các job đang mở
+cho ra mọi con số cần thiết; phần còn lại tính trong Python:
+- số theo ngành áp dụng bộ lọc địa điểm đang chọn (không áp dụng bộ lọc ngành),
+- số theo tỉnh/thành áp dụng bộ lọc ngành đang chọn (không áp dụng bộ lọc địa điểm),
+nên mỗi con số trong dropdown là số kết quả nếu chọn mục đó. Tỉnh/thành được khớp bằng
+province_folded, giống bộ lọc thật trong job_board_view/job_list_view.
+
+Kết quả được cache (django.core.cache) theo bộ lọc đã chuẩn hóa trong JOB_FACET_CACHE_TTL giây.
+Khóa cache gồm một số thế hệ được tăng mỗi khi JobPosting được tạo, sửa, lưu trữ hoặc xóa, nên
+mọi kết quả cũ bị bỏ qua ngay lập tức.
+"""
+import json
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from . import fulltext
+from .search import fold_key, province_key, tokenize
+
+GENERATION_KEY = 'job_facets:generation'
+
+def _generation():
+    return cache.get_or_set(GENERATION_KEY, 1, timeout=None)
+
+def invalidate():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, timeout=None)
+
+def _normalized_query(query):
+    # Thứ tự từ và dấu không ảnh hưởng tới kết quả full-text (AND các từ đã bỏ dấu).
+    terms = sorted(set(tokenize(query)))
+    return ' '.join(terms) if terms else fold_key(query)
+
+def _grouped_counts(query):
+    from .models import JobPosting
+    jobs = JobPosting.objects.filter(is_archived=False)
+    if query:
+        jobs = fulltext.search_jobs(jobs, query)
+    return list(jobs.order_by().values('category', 'category_folded', 'province_folded').annotate(n=Count('id')))
+
+def job_facets(query, location, category, provinces):
+    """
+    {'total': số job khớp cả ba bộ lọc, 'categories': [(giá trị, tên, số)], 'locations': [(tỉnh, số)]}
+    cho câu tìm kiếm query cùng bộ lọc location/category đang chọn.
+    """
+    from .models import JobPosting
+    location_key = province_key(location) or fold_key(location)
+    category_key = fold_key(category)
+    signature = json.dumps([_normalized_query(query), location_key, category], ensure_ascii=False)
+    key = f"job_facets:{_generation()}:{hashlib.sha256(signature.encode('utf-8')).hexdigest()}"
+    facets = cache.get(key)
+    if facets is not None:
+        return facets
+
+    groups = _grouped_counts(query)
+
+    def in_location(group):
+        return not location_key or group['province_folded'] == location_key
+
+    def in_category(group):
+        return not category or group['category'] == category or group['category_folded'] == category_key
+
+    categories = [
+        (value, label, sum(group['n'] for group in groups if group['category'] == value and in_location(group)))
+        for value, label in JobPosting.CATEGORY_CHOICES
+    ]
+    locations = [
+        (province, sum(group['n'] for group in groups if group['province_folded'] == folded and in_category(group)))
+        for province, folded in ((province, fold_key(province)) for province in provinces)
+    ]
+    facets = {
+        'total': sum(group['n'] for group in groups if in_location(group) and in_category(group)),
+        'categories': categories,
+        'locations': locations,
+    }
+    cache.set(key, facets, getattr(settings, 'JOB_FACET_CACHE_TTL', 600))
+    return facets
+
+@receiver(post_save, sender='recruitment.JobPosting', dispatch_uid='facets_invalidate_on_save')
+@receiver(post_delete, sender='recruitment.JobPosting', dispatch_uid='facets_invalidate_on_delete')
+def _invalidate_on_change(sender, **kwargs):
+    invalidate()
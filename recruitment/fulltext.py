@@ -0,0 +1,135 @@
+"""
+Chỉ mục full-text cho tiêu đề + mô tả tin tuyển dụng, thay cho lọc icontains (quét toàn bảng).
+
+Bảng recruitment_jobposting_fts được tạo trong migration 0011 tùy theo cơ sở dữ liệu:
+- SQLite (chạy local): bảng ảo FTS5, rowid = id của job, hai cột title/body, xếp hạng bằng bm25().
+- PostgreSQL (khi có RENDER): bảng (job_id, document tsvector) với chỉ mục GIN, xếp hạng bằng ts_rank().
+
+Tiêu đề (kèm tên ngành) và mô tả được bỏ dấu, tách từ bằng search.tokenize() trước khi đưa vào
+chỉ mục, nên gõ "ke toan" hay "kế toán" đều ra cùng kết quả. Mỗi từ trong câu tìm kiếm được so khớp
+theo tiền tố (gõ "pyth" đã ra "python") và mọi từ đều phải có mặt. Chỉ mục được cập nhật qua signal khi JobPosting được
+lưu/xóa; chạy lệnh rebuild_job_search_index sau khi nhập dữ liệu hàng loạt (bulk_create không gửi signal).
+"""
+from django.db import connection, transaction, DatabaseError
+from django.db.models import Q, Value, FloatField
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .search import tokenize, fold_key
+
+TABLE = 'recruitment_jobposting_fts'
+
+# Trọng số bm25() của tiêu đề so với mô tả (SQLite).
+TITLE_WEIGHT = 4.0
+
+def _vendor():
+    return connection.vendor
+
+def supported():
+    return _vendor() in ('sqlite', 'postgresql')
+
+def _document(job):
+    # Tên ngành (đã bỏ dấu) được đánh chỉ mục cùng tiêu đề: tìm "kiem thu" ra cả job ngành Tester.
+    return ' '.join(tokenize(f"{job.title} {job.category_folded}")), ' '.join(tokenize(job.description))
+
+def index_jobs(jobs):
+    """Thêm/cập nhật các job vào chỉ mục."""
+    rows = [(job.pk, *_document(job)) for job in jobs]
+    if not rows or not supported():
+        return
+    with connection.cursor() as cursor:
+        if _vendor() == 'sqlite':
+            cursor.executemany(f"DELETE FROM {TABLE} WHERE rowid = %s", [(pk,) for pk, _, _ in rows])
+            cursor.executemany(f"INSERT INTO {TABLE} (rowid, title, body) VALUES (%s, %s, %s)", rows)
+        else:
+            cursor.executemany(
+                f"INSERT INTO {TABLE} (job_id, document) VALUES "
+                f"(%s, setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B')) "
+                f"ON CONFLICT (job_id) DO UPDATE SET document = EXCLUDED.document",
+                rows,
+            )
+
+def remove_job(job_id):
+    if not supported():
+        return
+    column = 'rowid' if _vendor() == 'sqlite' else 'job_id'
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE} WHERE {column} = %s", [job_id])
+
+def rebuild(batch_size=2000):
+    """Dựng lại toàn bộ chỉ mục từ bảng JobPosting. Trả về số job đã được đánh chỉ mục."""
+    from .models import JobPosting
+    if not supported():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE}")
+    total = 0
+    batch = []
+    for job in JobPosting.objects.only('id', 'title', 'category_folded', 'description').iterator(chunk_size=batch_size):
+        batch.append(job)
+        if len(batch) >= batch_size:
+            index_jobs(batch)
+            total += len(batch)
+            batch = []
+    index_jobs(batch)
+    return total + len(batch)
+
+def _fts5_query(terms):
+    # Mỗi từ được đặt trong ngoặc kép (tránh cú pháp FTS5) và khớp theo tiền tố; các từ nối nhau là AND.
+    return ' '.join(f'"{term}"*' for term in terms)
+
+def _tsquery(terms):
+    return ' & '.join("'{}':*".format(term.replace("'", '')) for term in terms)
+
+# Thứ tự kết quả tìm kiếm; cũng là khóa phân trang keyset (pagination.paginate).
+RANKED_ORDERING = ('-search_rank', '-created_at', '-id')
+
+def search_jobs(jobs, query):
+    """
+    Lọc queryset JobPosting theo query, annotate search_rank (lớn hơn = liên quan hơn) và sắp xếp theo
+    RANKED_ORDERING. Nếu query không còn từ nào sau khi bỏ từ dừng, hoặc cơ sở dữ liệu không hỗ trợ
+    full-text, quay về lọc icontains như cũ (search_rank = 0, job mới hơn lên trước).
+    """
+    terms = tokenize(query)
+    if not terms or not supported():
+        jobs = jobs.filter(Q(title_folded__contains=fold_key(query)) | Q(description__icontains=query))
+        return jobs.annotate(search_rank=Value(0.0, output_field=FloatField())).order_by(*RANKED_ORDERING)
+
+    job_table = jobs.model._meta.db_table
+    if _vendor() == 'sqlite':
+        jobs = jobs.extra(
+            tables=[TABLE],
+            where=[f"{TABLE}.rowid = {job_table}.id", f"{TABLE} MATCH %s"],
+            params=[_fts5_query(terms)],
+        )
+        rank = RawSQL(f"-bm25({TABLE}, {TITLE_WEIGHT}, 1.0)", [], output_field=FloatField())
+    else:
+        tsquery = _tsquery(terms)
+        jobs = jobs.extra(
+            tables=[TABLE],
+            where=[f"{TABLE}.job_id = {job_table}.id", f"{TABLE}.document @@ to_tsquery('simple', %s)"],
+            params=[tsquery],
+        )
+        # Trọng số mặc định của ts_rank: nhãn A (tiêu đề) 1.0, nhãn B (mô tả) 0.4. Ép sang float8 để giá trị
+        # trong cursor phân trang so sánh bằng chính xác với giá trị trong database.
+        rank = RawSQL(f"ts_rank({TABLE}.document, to_tsquery('simple', %s))::float8", [tsquery], output_field=FloatField())
+    return jobs.annotate(search_rank=rank).order_by(*RANKED_ORDERING)
+
+def _sync(action, *args):
+    # Lỗi chỉ mục (ví dụ chưa chạy migration) không được làm hỏng việc lưu job; savepoint giữ cho
+    # transaction bên ngoài vẫn dùng được trên PostgreSQL.
+    try:
+        with transaction.atomic():
+            action(*args)
+    except DatabaseError as e:
+        print(f"Lỗi cập nhật chỉ mục full-text (chạy rebuild_job_search_index để đồng bộ lại): {e}")
+
+@receiver(post_save, sender='recruitment.JobPosting', dispatch_uid='fulltext_index_job')
+def _index_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    _sync(index_jobs, [instance])
+
+@receiver(post_delete, sender='recruitment.JobPosting', dispatch_uid='fulltext_remove_job')
+def _remove_on_delete(sender, instance, **kwargs):
+    _sync(remove_job, instance.pk)
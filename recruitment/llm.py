@@ -0,0 +1,328 @@
+"""
+Cổng gọi LLM (Groq) dùng chung cho mọi view.
+
+settings.LLM_BACKEND chọn nơi xử lý lời gọi: 'groq' (mặc định), 'fake', 'record' hoặc 'replay'
+(xem llm_backends.py).
+
+Một client duy nhất cho cả process được giữ lại giữa các request để tái sử dụng kết nối
+HTTP (keep-alive) thay vì bắt tay TLS lại mỗi lần. Mọi lời gọi đi qua complete() (hoặc
+acomplete()/astream() trong view async), nơi có timeout, retry với exponential backoff cho
+lỗi 429/5xx/kết nối, và phân tích JSON. Lời gọi async chạy trên một event loop nền riêng của process
+nên cả process cũng chỉ dùng một AsyncGroq, kể cả dưới WSGI (mỗi request async có loop riêng). Khi Groq liên tục lỗi hoặc chậm, circuit breaker
+(circuit.py) từ chối lời gọi ngay bằng CircuitOpenError để các chỗ gọi dùng điểm tạm tính.
+"""
+import os
+import json
+import re
+import time
+import random
+import asyncio
+import threading
+import contextlib
+import groq
+from django.conf import settings
+from . import ratelimit, telemetry, circuit, compaction
+from .llm_backends import create_client
+
+class LLMError(Exception):
+    """Lỗi khi gọi LLM hoặc khi kết quả trả về không đúng định dạng yêu cầu."""
+
+class CircuitOpenError(LLMError):
+    """Circuit breaker đang mở: không gọi AI, chỗ gọi nên dùng kết quả dự phòng."""
+
+_clients = {}
+_client_lock = threading.Lock()
+# AsyncGroq gắn với event loop đã tạo ra nó; chỉ được dùng trên loop nền (_llm_loop()).
+_async_clients = {}
+_loop = None
+_loop_pid = None
+_loop_lock = threading.Lock()
+
+def _config():
+    return {
+        'model': getattr(settings, 'LLM_MODEL', 'llama-3.1-8b-instant'),
+        'timeout': getattr(settings, 'LLM_TIMEOUT', 30),
+        'max_retries': getattr(settings, 'LLM_MAX_RETRIES', 3),
+        'backoff': getattr(settings, 'LLM_BACKOFF_BASE', 0.5),
+        'backend': getattr(settings, 'LLM_BACKEND', 'groq'),
+    }
+
+def get_client():
+    config = _config()
+    with _client_lock:
+        if config['backend'] not in _clients:
+            _clients[config['backend']] = create_client(config['backend'], config['timeout'])
+        return _clients[config['backend']]
+
+def get_async_client():
+    """AsyncGroq dùng chung của process; chỉ gọi từ loop nền (bên trong acomplete/astream)."""
+    config = _config()
+    if config['backend'] not in _async_clients:
+        _async_clients[config['backend']] = create_client(config['backend'], config['timeout'], is_async=True)
+    return _async_clients[config['backend']]
+
+def _llm_loop():
+    """Event loop nền (thread daemon) chạy mọi lời gọi async tới AI của process này."""
+    global _loop, _loop_pid
+    with _loop_lock:
+        # Sau fork (gunicorn --preload), thread của process cha không còn: tạo loop mới.
+        if _loop is None or _loop_pid != os.getpid():
+            _async_clients.clear()
+            _loop, _loop_pid = asyncio.new_event_loop(), os.getpid()
+            threading.Thread(target=_loop.run_forever, name='llm-loop', daemon=True).start()
+        return _loop
+
+async def _on_llm_loop(coro):
+    """Chạy coroutine trên loop nền và chờ kết quả từ loop hiện tại; hủy ở đây thì hủy cả bên kia."""
+    loop = _llm_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+def _is_retryable(error):
+    if isinstance(error, (groq.RateLimitError, groq.APIConnectionError)):
+        return True
+    return isinstance(error, groq.APIStatusError) and error.status_code >= 500
+
+def _retry_delay(error, attempt, base):
+    retry_after = None
+    response = getattr(error, 'response', None)
+    if response is not None:
+        retry_after = response.headers.get('retry-after')
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return base * (2 ** attempt) + random.uniform(0, base)
+
+def _check_schema(data, schema):
+    expected = {'object': dict, 'array': list}[schema.get('type', 'object')]
+    if not isinstance(data, expected):
+        raise LLMError(f"AI trả về {type(data).__name__}, cần {schema.get('type', 'object')}.")
+    items = [data] if expected is dict else data
+    for item in items:
+        missing = [key for key in schema.get('required', []) if not isinstance(item, dict) or key not in item]
+        if missing:
+            raise LLMError(f"Kết quả AI thiếu trường: {', '.join(missing)}")
+
+def parse_json(text, schema=None):
+    """
+    Lấy JSON từ câu trả lời của AI: ưu tiên khối ```json ... ```, sau đó đến đoạn {...} hoặc [...]
+    đầu tiên. schema là một tập con đơn giản của JSON Schema: {"type": "object"|"array", "required": [...]}.
+    """
+    candidates = []
+    fenced = re.search(r'```(?:json)?\s*\n(.*?)\n\s*```', text, re.DOTALL)
+    if fenced:
+        candidates.append(fenced.group(1))
+    candidates.append(text)
+    bracketed = re.search(r'[\{\[].*[\}\]]', text, re.DOTALL)
+    if bracketed:
+        candidates.append(bracketed.group(0))
+
+    for candidate in candidates:
+        try:
+            data = json.loads(candidate)
+        except ValueError:
+            continue
+        if schema:
+            _check_schema(data, schema)
+        return data
+    raise LLMError(f"Không đọc được JSON từ câu trả lời của AI: {text[:200]}")
+
+def _request_params(config, prompt, system, model, temperature):
+    messages = []
+    if system:
+        messages.append({"role": "system", "content": system})
+    messages.append({"role": "user", "content": prompt})
+
+    params = {'messages': messages, 'model': model or config['model']}
+    if temperature is not None:
+        params['temperature'] = temperature
+    return params
+
+def _parse(chat_completion, schema):
+    """Trả về (nội dung, kết quả, trạng thái cho telemetry, lỗi định dạng hoặc None)."""
+    content = chat_completion.choices[0].message.content or ""
+    if not schema:
+        return content, content, 'ok', None
+    try:
+        return content, parse_json(content, schema), 'ok', None
+    except LLMError as e:
+        return content, None, 'parse_error', e
+
+def _check_circuit(breaker):
+    """Ném CircuitOpenError nếu breaker từ chối; trả về True nếu lời gọi này là lượt thử của half_open."""
+    admitted = breaker.allow()
+    if not admitted:
+        raise CircuitOpenError("AI tạm thời không khả dụng, vui lòng thử lại sau ít phút.")
+    return admitted == circuit.TRIAL
+
+def _cancelled(breaker, attempt_started, trial):
+    # Lời gọi bị hủy (ví dụ asyncio.wait_for hết giờ): tính là quá chậm nếu đã vượt ngưỡng.
+    if attempt_started is not None and time.perf_counter() - attempt_started > breaker.slow_call:
+        breaker.record_failure()
+    elif trial:
+        breaker.release()
+
+def _call(priority, prompt, system, compacted):
+    # Tham số chung cho telemetry.record(); compacted là số token CV/JD trước/sau khi rút gọn cho prompt này.
+    return {'priority': priority, 'prompt': f"{system or ''}{prompt}", 'started': time.perf_counter(), 'compacted': compacted}
+
+def complete(prompt, schema=None, system=None, model=None, temperature=None, priority='interactive', site='other'):
+    """
+    Gửi một prompt tới LLM và trả về câu trả lời.
+    Nếu có schema thì trả về dữ liệu JSON đã được phân tích và kiểm tra, ngược lại trả về chuỗi.
+    priority ('interactive' hoặc 'batch') quyết định thứ tự ưu tiên khi bị giới hạn tốc độ (ratelimit.py).
+    site là tên chỗ gọi, dùng để thống kê token/độ trễ (telemetry.py).
+    Ném LLMError khi hết số lần thử, khi chờ hạn mức quá lâu hoặc khi câu trả lời không đúng schema;
+    ném CircuitOpenError (lớp con của LLMError) khi circuit breaker đang mở.
+    """
+    config = _config()
+    params = _request_params(config, prompt, system, model, temperature)
+    call = _call(priority, prompt, system, compaction.take_counts())
+    breaker = circuit.get_breaker()
+    try:
+        trial = _check_circuit(breaker)
+    except CircuitOpenError:
+        telemetry.record(site, params['model'], 'circuit_open', **call)
+        raise
+
+    try:
+        for attempt in range(config['max_retries'] + 1):
+            try:
+                with ratelimit.limit(priority):
+                    attempt_started = time.perf_counter()
+                    chat_completion = get_client().chat.completions.create(**params)
+                break
+            except ratelimit.RateLimitExceeded as e:
+                telemetry.record(site, params['model'], 'rate_limited', retries=attempt, **call)
+                raise LLMError(str(e)) from e
+            except groq.GroqError as e:
+                if attempt >= config['max_retries'] or not _is_retryable(e):
+                    breaker.record_failure()
+                    telemetry.record(site, params['model'], 'error', retries=attempt, **call)
+                    raise LLMError(str(e)) from e
+                delay = _retry_delay(e, attempt, config['backoff'])
+                print(f"Lỗi Groq API ({e.__class__.__name__}), thử lại sau {delay:.1f}s...")
+                time.sleep(delay)
+    except BaseException:
+        # Mọi đường thoát khác (hết hạn mức, DatabaseError từ bucket giới hạn tốc độ, lỗi bất ngờ của
+        # client...) phải trả lại lượt thử, nếu không breaker kẹt ở half_open cho tới khi restart.
+        if trial:
+            breaker.release()
+        raise
+    breaker.record_success(time.perf_counter() - attempt_started)
+
+    content, result, status, error = _parse(chat_completion, schema)
+    telemetry.record(site, params['model'], status, retries=attempt, usage=getattr(chat_completion, 'usage', None), completion=content, **call)
+    if error:
+        raise error
+    return result
+
+async def _aconnect(params, config, priority, site, call, breaker, slot=None):
+    """
+    Gửi lời gọi async với retry; trả về (kết quả của create(), số lần đã thử lại).
+    Nếu truyền slot (AsyncExitStack), lượt gọi trong ratelimit được giữ tới khi slot đóng thay vì
+    trả lại ngay sau create() (dùng cho streaming).
+    """
+    try:
+        trial = _check_circuit(breaker)
+    except CircuitOpenError:
+        await telemetry.arecord(site, params['model'], 'circuit_open', **call)
+        raise
+
+    attempt_started = None
+    try:
+        for attempt in range(config['max_retries'] + 1):
+            try:
+                async with contextlib.AsyncExitStack() as attempt_slot:
+                    await attempt_slot.enter_async_context(ratelimit.alimit(priority))
+                    attempt_started = time.perf_counter()
+                    response = await get_async_client().chat.completions.create(**params)
+                    if slot is not None:
+                        slot.push_async_exit(attempt_slot.pop_all())
+                break
+            except ratelimit.RateLimitExceeded as e:
+                await telemetry.arecord(site, params['model'], 'rate_limited', retries=attempt, **call)
+                raise LLMError(str(e)) from e
+            except groq.GroqError as e:
+                if attempt >= config['max_retries'] or not _is_retryable(e):
+                    breaker.record_failure()
+                    await telemetry.arecord(site, params['model'], 'error', retries=attempt, **call)
+                    raise LLMError(str(e)) from e
+                delay = _retry_delay(e, attempt, config['backoff'])
+                print(f"Lỗi Groq API ({e.__class__.__name__}), thử lại sau {delay:.1f}s...")
+                attempt_started = None
+                await asyncio.sleep(delay)
+    except asyncio.CancelledError:
+        _cancelled(breaker, attempt_started, trial)
+        raise
+    except BaseException:
+        # Như complete(): mọi lỗi khác đều trả lại lượt thử của half_open.
+        if trial:
+            breaker.release()
+        raise
+    breaker.record_success(time.perf_counter() - attempt_started)
+    return response, attempt
+
+async def acomplete(prompt, schema=None, system=None, model=None, temperature=None, priority='interactive', site='other'):
+    """Phiên bản async của complete(), dùng AsyncGroq và không chặn event loop khi chờ retry."""
+    # Số token rút gọn thuộc context của người gọi, phải lấy trước khi chuyển sang loop nền.
+    compacted = compaction.take_counts()
+    return await _on_llm_loop(_acomplete(prompt, schema, system, model, temperature, priority, site, compacted))
+
+async def _acomplete(prompt, schema, system, model, temperature, priority, site, compacted):
+    config = _config()
+    params = _request_params(config, prompt, system, model, temperature)
+    call = _call(priority, prompt, system, compacted)
+
+    chat_completion, attempt = await _aconnect(params, config, priority, site, call, circuit.get_breaker())
+
+    content, result, status, error = _parse(chat_completion, schema)
+    await telemetry.arecord(site, params['model'], status, retries=attempt, usage=getattr(chat_completion, 'usage', None), completion=content, **call)
+    if error:
+        raise error
+    return result
+
+async def _next(stream):
+    # Một bước của async generator, chạy trên loop nền; (False, None) khi đã hết.
+    try:
+        return True, await stream.__anext__()
+    except StopAsyncIteration:
+        return False, None
+
+async def astream(prompt, system=None, model=None, temperature=None, priority='interactive', site='other'):
+    """
+    Phiên bản streaming của acomplete(): yield từng đoạn văn bản ngay khi model sinh ra.
+    Chỉ retry khi chưa nhận được đoạn nào, để không gửi lặp nội dung cho người dùng.
+    """
+    stream = _astream(prompt, system, model, temperature, priority, site, compaction.take_counts())
+    try:
+        while True:
+            has_more, delta = await _on_llm_loop(_next(stream))
+            if not has_more:
+                return
+            yield delta
+    finally:
+        await _on_llm_loop(stream.aclose())
+
+async def _astream(prompt, system, model, temperature, priority, site, compacted):
+    config = _config()
+    params = _request_params(config, prompt, system, model, temperature)
+    params['stream'] = True
+    call = _call(priority, prompt, system, compacted)
+
+    # Giữ lượt gọi (giới hạn đồng thời) cho tới khi đọc hết stream, không chỉ lúc mở kết nối.
+    async with contextlib.AsyncExitStack() as slot:
+        stream, attempt = await _aconnect(params, config, priority, site, call, circuit.get_breaker(), slot=slot)
+
+        parts = []
+        try:
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        except groq.GroqError as e:
+            await telemetry.arecord(site, params['model'], 'error', retries=attempt, completion=''.join(parts), **call)
+            raise LLMError(str(e)) from e
+    await telemetry.arecord(site, params['model'], 'ok', retries=attempt, completion=''.join(parts), **call)
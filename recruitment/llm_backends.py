@@ -0,0 +1,253 @@
+"""
+Các backend LLM có cùng giao diện với client Groq (client.chat.completions.create(...)), chọn bằng
+settings.LLM_BACKEND:
+
+- 'groq'   : client Groq thật.
+- 'fake'   : LLM giả lập chạy cục bộ, không cần mạng. Câu trả lời được suy ra từ prompt (đúng định
+             dạng JSON mà từng view chờ) và cố định theo prompt; độ trễ theo phân phối log-normal
+             (LLM_FAKE_LATENCY là trung vị, LLM_FAKE_LATENCY_SIGMA là độ lệch), và một tỉ lệ lời
+             gọi lỗi 429/500 (LLM_FAKE_ERROR_RATE). LLM_FAKE_SEED cố định chuỗi ngẫu nhiên.
+- 'record' : gọi Groq thật và lưu câu trả lời vào LLM_FIXTURES_DIR/<mã băm prompt>.json.
+- 'replay' : chỉ đọc câu trả lời từ các file đã ghi; prompt chưa có file thì báo lỗi.
+
+Nhờ vậy có thể đo thông lượng và độ trễ đuôi của các view AI trên máy cá nhân mà không tốn quota.
+"""
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from types import SimpleNamespace
+import groq
+import httpx
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+class FixtureMissing(groq.GroqError):
+    """Chế độ replay nhưng chưa có câu trả lời đã ghi cho prompt này."""
+
+def _completion(content, prompt_tokens=0):
+    message = SimpleNamespace(role='assistant', content=content)
+    usage = SimpleNamespace(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=len(content) // 3 + 1,
+        total_tokens=prompt_tokens + len(content) // 3 + 1,
+    )
+    return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason='stop')], usage=usage)
+
+def _chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+def _split_chunks(content):
+    return re.findall(r'\S+\s*|\s+', content) or ['']
+
+def prompt_hash(params):
+    key = {name: params.get(name) for name in ('model', 'messages', 'temperature')}
+    return hashlib.sha256(json.dumps(key, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+# --- LLM giả lập ---------------------------------------------------------------
+
+def fake_answer(prompt):
+    """Câu trả lời giả có đúng định dạng mà từng chỗ gọi AI trong views/scoring chờ đợi."""
+    seed = int(hashlib.sha256(prompt.encode('utf-8')).hexdigest(), 16)
+    score = seed % 101
+
+    job_ids = re.findall(r'\[job_id=(\d+)\]', prompt)
+    if job_ids:
+        return json.dumps([{'job_id': int(job_id), 'score': (seed >> i) % 101} for i, job_id in enumerate(job_ids)])
+
+    application_ids = re.findall(r'"application_id":\s*(\d+)', prompt)
+    if application_ids:
+        picked = application_ids[:3]
+        return json.dumps([{'application_id': int(app_id), 'reason': "Hồ sơ phù hợp với yêu cầu."} for app_id in picked], ensure_ascii=False)
+
+    if '"strengths"' in prompt or 'strengths' in prompt:
+        data = {
+            'strengths': ["Kinh nghiệm phù hợp với vị trí", "Kỹ năng kỹ thuật tốt"],
+            'suggestions': ["Bổ sung số liệu cụ thể cho các dự án", "Nêu rõ công nghệ đã dùng"],
+        }
+        if '"score"' in prompt:
+            data = {'score': score, **data}
+        return json.dumps(data, ensure_ascii=False)
+
+    if '"score"' in prompt:
+        return json.dumps({'score': score, 'summary': "Ứng viên đáp ứng phần lớn yêu cầu của công việc."}, ensure_ascii=False)
+
+    return "Đây là câu trả lời giả lập từ LLM_BACKEND=fake. Nội dung thật sẽ do mô hình AI sinh ra."
+
+class _FakeBehaviour:
+    def __init__(self):
+        seed = getattr(settings, 'LLM_FAKE_SEED', None)
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.latency = getattr(settings, 'LLM_FAKE_LATENCY', 0.5)
+        self.sigma = getattr(settings, 'LLM_FAKE_LATENCY_SIGMA', 0.3)
+        self.error_rate = getattr(settings, 'LLM_FAKE_ERROR_RATE', 0.0)
+        self.calls = 0
+
+    def draw(self):
+        """Trả về (độ trễ, lỗi sẽ ném ra hoặc None) cho một lời gọi."""
+        with self.lock:
+            self.calls += 1
+            delay = self.random.lognormvariate(0, self.sigma) * self.latency if self.latency > 0 else 0.0
+            failing = self.random.random() < self.error_rate
+            status = self.random.choice((429, 500)) if failing else None
+        if status is None:
+            return delay, None
+        response = httpx.Response(status, request=httpx.Request('POST', 'http://fake-llm.local/chat/completions'))
+        error_class = groq.RateLimitError if status == 429 else groq.InternalServerError
+        return delay, error_class(f"Lỗi giả lập {status}", response=response, body=None)
+
+class _FakeCompletions:
+    def create(self, messages, stream=False, **kwargs):
+        delay, error = fake_behaviour().draw()
+        time.sleep(delay)
+        if error:
+            raise error
+        prompt = messages[-1]['content']
+        content = fake_answer(prompt)
+        if stream:
+            return iter([_chunk(text) for text in _split_chunks(content)])
+        return _completion(content, len(prompt) // 3 + 1)
+
+class _AsyncFakeCompletions(_FakeCompletions):
+    async def create(self, messages, stream=False, **kwargs):
+        delay, error = fake_behaviour().draw()
+        if stream:
+            # Độ trễ đến token đầu tiên ngắn hơn tổng độ trễ; phần còn lại rải đều cho các chunk.
+            await asyncio.sleep(delay * 0.2)
+        else:
+            await asyncio.sleep(delay)
+        if error:
+            raise error
+        prompt = messages[-1]['content']
+        content = fake_answer(prompt)
+        if not stream:
+            return _completion(content, len(prompt) // 3 + 1)
+
+        chunks = _split_chunks(content)
+
+        async def generate():
+            for text in chunks:
+                await asyncio.sleep(delay * 0.8 / len(chunks))
+                yield _chunk(text)
+        return generate()
+
+_fake_behaviour = None
+_fake_lock = threading.Lock()
+
+def fake_behaviour():
+    """
+    Trạng thái dùng chung của mọi client giả trong process (bộ sinh ngẫu nhiên, số lời gọi), để
+    client sync và các client async của từng event loop cùng đi theo một chuỗi ngẫu nhiên duy nhất.
+    """
+    global _fake_behaviour
+    with _fake_lock:
+        if _fake_behaviour is None:
+            _fake_behaviour = _FakeBehaviour()
+        return _fake_behaviour
+
+def reset_fake():
+    """Tạo lại trạng thái giả lập (đọc lại LLM_FAKE_* và seed)."""
+    global _fake_behaviour
+    with _fake_lock:
+        _fake_behaviour = None
+
+class FakeClient:
+    def __init__(self, is_async=False):
+        completions = _AsyncFakeCompletions() if is_async else _FakeCompletions()
+        self.chat = SimpleNamespace(completions=completions)
+
+# --- Ghi / phát lại ------------------------------------------------------------
+
+class _ReplayCompletions:
+    def __init__(self, inner, directory, record):
+        self.inner = inner
+        self.directory = directory
+        self.record = record
+
+    def _path(self, params):
+        return os.path.join(self.directory, f"{prompt_hash(params)}.json")
+
+    def _load(self, params):
+        path = self._path(params)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)['content']
+
+    def _save(self, params, content):
+        os.makedirs(self.directory, exist_ok=True)
+        fixture = {'model': params.get('model'), 'messages': params.get('messages'), 'content': content}
+        with open(self._path(params), 'w', encoding='utf-8') as f:
+            json.dump(fixture, f, ensure_ascii=False, indent=2)
+
+    def _replayed(self, content, stream):
+        if stream:
+            return iter([_chunk(text) for text in _split_chunks(content)])
+        return _completion(content)
+
+    def create(self, stream=False, **params):
+        content = self._load(params)
+        if content is not None:
+            return self._replayed(content, stream)
+        if not self.record:
+            raise FixtureMissing(f"Chưa có câu trả lời đã ghi cho prompt {prompt_hash(params)[:12]}.")
+        if stream:
+            content = ''.join(chunk.choices[0].delta.content or '' for chunk in self.inner.chat.completions.create(stream=True, **params) if chunk.choices)
+            self._save(params, content)
+            return self._replayed(content, stream)
+        completion = self.inner.chat.completions.create(**params)
+        self._save(params, completion.choices[0].message.content or '')
+        return completion
+
+class _AsyncReplayCompletions(_ReplayCompletions):
+    def _replayed(self, content, stream):
+        if not stream:
+            return _completion(content)
+
+        async def generate():
+            for text in _split_chunks(content):
+                yield _chunk(text)
+        return generate()
+
+    async def create(self, stream=False, **params):
+        content = self._load(params)
+        if content is not None:
+            return self._replayed(content, stream)
+        if not self.record:
+            raise FixtureMissing(f"Chưa có câu trả lời đã ghi cho prompt {prompt_hash(params)[:12]}.")
+        if stream:
+            parts = []
+            async for chunk in await self.inner.chat.completions.create(stream=True, **params):
+                if chunk.choices:
+                    parts.append(chunk.choices[0].delta.content or '')
+            content = ''.join(parts)
+            self._save(params, content)
+            return self._replayed(content, stream)
+        completion = await self.inner.chat.completions.create(**params)
+        self._save(params, completion.choices[0].message.content or '')
+        return completion
+
+class ReplayClient:
+    def __init__(self, inner, directory, record, is_async=False):
+        completions_class = _AsyncReplayCompletions if is_async else _ReplayCompletions
+        self.chat = SimpleNamespace(completions=completions_class(inner, directory, record))
+
+# -------------------------------------------------------------------------------
+
+def create_client(name, timeout, is_async=False):
+    if name == 'groq':
+        client_class = groq.AsyncGroq if is_async else groq.Groq
+        # llm.py tự retry nên tắt retry của SDK để không bị nhân đôi.
+        return client_class(api_key=settings.GROQ_API_KEY, timeout=timeout, max_retries=0)
+    if name == 'fake':
+        return FakeClient(is_async=is_async)
+    if name in ('record', 'replay'):
+        directory = str(getattr(settings, 'LLM_FIXTURES_DIR', 'llm_fixtures'))
+        inner = create_client('groq', timeout, is_async) if name == 'record' else None
+        return ReplayClient(inner, directory, record=(name == 'record'), is_async=is_async)
+    raise ImproperlyConfigured(f"LLM_BACKEND không hợp lệ: {name!r} (chọn groq, fake, record hoặc replay).")
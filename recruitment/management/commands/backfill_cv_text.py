@@ -0,0 +1,127 @@
+import os
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from django.db.models import Q, Exists, OuterRef
+from recruitment import extraction
+from recruitment.models import Application, Profile, CVText, BackfillProgress
+from recruitment.utils import read_cv_bytes
+
+TARGETS = (
+    ('application', Application, 'cv'),
+    ('profile', Profile, 'cv_file'),
+)
+
+class Command(BaseCommand):
+    help = "Trích xuất và lưu văn bản CV còn thiếu cho Application.cv và Profile.cv_file (có thể chạy tiếp khi bị dừng)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help="Số bản ghi mỗi lượt.")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help="Số process trích xuất song song.")
+        parser.add_argument('--dry-run', action='store_true', help="Chỉ đọc và trích xuất, không ghi gì vào database.")
+        parser.add_argument('--restart', action='store_true', help="Bỏ qua tiến độ đã lưu và quét lại từ đầu.")
+
+    def handle(self, *args, **options):
+        extraction.set_worker_count(options['workers'])
+        self.totals = {'docs': 0, 'bytes': 0, 'extracted': 0, 'failed': 0}
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for name, model, file_attr in TARGETS:
+                self.backfill(pool, name, model, file_attr, options)
+
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stdout.write(self.style.SUCCESS(
+            f"Hoàn tất: {self.totals['docs']} file, {self.totals['extracted']} file mới được trích xuất, "
+            f"{self.totals['failed']} lỗi. {self.throughput(self.totals['docs'], self.totals['bytes'], elapsed)}"
+        ))
+        if self.totals['failed']:
+            self.stdout.write("Các file lỗi đã được bỏ qua; tiến độ được lưu ngay trước file lỗi đầu tiên nên chạy lại lệnh sẽ thử lại chúng.")
+
+    def throughput(self, docs, size, elapsed):
+        return f"{docs / elapsed:.1f} docs/s, {size / elapsed / (1024 * 1024):.2f} MB/s"
+
+    def backfill(self, pool, name, model, file_attr, options):
+        progress_name = f'backfill_cv_text:{name}'
+        progress, _ = BackfillProgress.objects.get_or_create(name=progress_name)
+        last_pk = 0 if options['restart'] else progress.last_pk
+        # Tiến độ lưu lại không vượt qua file lỗi đầu tiên, để lần chạy sau thử lại; các file đã
+        # trích xuất thành công không bị làm lại vì pending chỉ chọn bản ghi còn thiếu văn bản.
+        checkpoint, failed_before = last_pk, False
+
+        pending = model.objects.exclude(**{file_attr: ''}).exclude(**{f'{file_attr}__isnull': True}).filter(
+            Q(cv_sha256='') | ~Exists(CVText.objects.filter(sha256=OuterRef('cv_sha256')))
+        ).order_by('pk')
+
+        while True:
+            rows = list(pending.filter(pk__gt=last_pk)[:options['batch_size']])
+            if not rows:
+                break
+
+            started = time.monotonic()
+            size, failed_pks = self.process_batch(pool, rows, file_attr, options['dry_run'])
+            last_pk = rows[-1].pk
+            if not failed_before:
+                checkpoint = min(failed_pks) - 1 if failed_pks else last_pk
+                failed_before = bool(failed_pks)
+            if not options['dry_run'] and progress.last_pk != checkpoint:
+                progress.last_pk = checkpoint
+                progress.save(update_fields=['last_pk', 'updated_at'])
+
+            elapsed = max(time.monotonic() - started, 1e-9)
+            self.stdout.write(f"[{name}] đến pk={last_pk}: {len(rows)} file, {self.throughput(len(rows), size, elapsed)}")
+
+    def process_batch(self, pool, rows, file_attr, dry_run):
+        def read(row):
+            cv_file = getattr(row, file_attr)
+            try:
+                data = read_cv_bytes(cv_file)
+            except Exception as e:
+                self.stderr.write(f"Không đọc được '{cv_file.name}': {e}")
+                return row, None, None
+            return row, data, hashlib.sha256(data).hexdigest()
+
+        read_results = list(pool.map(read, rows))
+        digests = {digest for _, _, digest in read_results if digest}
+        known = set(CVText.objects.filter(sha256__in=digests).values_list('sha256', flat=True))
+
+        to_extract = {}
+        for row, data, digest in read_results:
+            if digest and digest not in known and digest not in to_extract:
+                to_extract[digest] = (getattr(row, file_attr).name, data)
+
+        def extract(item):
+            digest, (file_name, data) = item
+            try:
+                return digest, extraction.extract_text(data, os.path.splitext(file_name)[1])
+            except Exception as e:
+                self.stderr.write(f"Không trích xuất được '{file_name}': {e}")
+                return digest, None
+
+        new_texts = {digest: text for digest, text in pool.map(extract, to_extract.items()) if text is not None}
+
+        changed = []
+        failed_pks = []
+        for row, data, digest in read_results:
+            if digest is None or (digest not in known and digest not in new_texts):
+                failed_pks.append(row.pk)
+                continue
+            if row.cv_sha256 != digest:
+                row.cv_sha256 = digest
+                changed.append(row)
+
+        batch_bytes = sum(len(data) for _, data, _ in read_results if data is not None)
+        self.totals['docs'] += len(rows)
+        self.totals['bytes'] += batch_bytes
+        self.totals['extracted'] += len(new_texts)
+        self.totals['failed'] += len(failed_pks)
+
+        if not dry_run:
+            CVText.objects.bulk_create(
+                [CVText(sha256=digest, text=text) for digest, text in new_texts.items()],
+                ignore_conflicts=True,
+            )
+            if changed:
+                type(changed[0]).objects.bulk_update(changed, ['cv_sha256'])
+        return batch_bytes, failed_pks
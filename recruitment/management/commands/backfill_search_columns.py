@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from recruitment import fulltext
+from recruitment.models import JobPosting, Profile
+
+class Command(BaseCommand):
+    help = (
+        "Điền/cập nhật các cột bỏ dấu dùng để lọc (JobPosting.title/location/category, Profile.full_name). "
+        "Chỉ ghi những bản ghi bị lệch nên có thể chạy lại an toàn."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Số bản ghi mỗi lượt.")
+
+    def handle(self, *args, **options):
+        jobs = self._backfill(JobPosting, options['batch_size'], on_changed=fulltext.index_jobs)
+        profiles = self._backfill(Profile, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Đã cập nhật {jobs} tin tuyển dụng và {profiles} hồ sơ."))
+
+    def _backfill(self, model, batch_size, on_changed=None):
+        folded_fields = list(model.FOLDED_SOURCES.values())
+        updated = 0
+        batch = []
+        for obj in model.objects.order_by('pk').iterator(chunk_size=batch_size):
+            before = [getattr(obj, field) for field in folded_fields]
+            obj.refresh_folded()
+            if [getattr(obj, field) for field in folded_fields] != before:
+                batch.append(obj)
+            if len(batch) >= batch_size:
+                updated += self._flush(model, batch, folded_fields, on_changed)
+                batch = []
+        return updated + self._flush(model, batch, folded_fields, on_changed)
+
+    def _flush(self, model, batch, folded_fields, on_changed):
+        if not batch:
+            return 0
+        with transaction.atomic():
+            model.objects.bulk_update(batch, folded_fields)
+            if on_changed:
+                # bulk_update không gửi signal: cập nhật chỉ mục full-text (tiêu đề kèm tên ngành) tại đây.
+                on_changed(batch)
+        self.stdout.write(f"  {model.__name__}: {len(batch)} bản ghi")
+        return len(batch)
@@ -0,0 +1,73 @@
+import time
+import random
+import hashlib
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from recruitment import search
+from recruitment.compaction import count_tokens, fit_many
+
+SKILLS = [
+    'Python', 'Django', 'Flask', 'Java', 'Spring Boot', 'ReactJS', 'VueJS', 'NodeJS', 'PostgreSQL', 'MySQL',
+    'Docker', 'Kubernetes', 'AWS', 'Git', 'Selenium', 'kiểm thử phần mềm', 'Figma', 'UI/UX', 'kế toán',
+    'Excel', 'SAP', 'marketing', 'SEO', 'Content', 'tiếng Anh', 'tiếng Nhật', 'quản lý dự án', 'Scrum',
+]
+
+def build_cv(index, rng):
+    skills = rng.sample(SKILLS, 6)
+    years = rng.randint(0, 10)
+    lines = [
+        f"Nguyễn Văn {index}",
+        "Mục tiêu nghề nghiệp",
+        f"Trở thành chuyên gia {skills[0]} với {years} năm kinh nghiệm.",
+        "Kỹ năng",
+        ', '.join(skills),
+        "Kinh nghiệm làm việc",
+    ]
+    for project in range(rng.randint(3, 8)):
+        lines.append(f"Dự án {project}: phát triển hệ thống dùng {skills[project % 6]} và {skills[(project + 1) % 6]}, làm việc nhóm theo Scrum.")
+    lines += ["Học vấn", "Đại học Bách Khoa, chuyên ngành Công nghệ thông tin."]
+    return '\n'.join(lines)
+
+class Command(BaseCommand):
+    help = "Đo thời gian lọc cục bộ và số token gửi AI của tìm kiếm ứng viên theo kích thước kho hồ sơ (không gọi AI)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='50,200,1000,5000', help="Các kích thước kho hồ sơ, cách nhau bởi dấu phẩy.")
+        parser.add_argument('--queries', type=int, default=20, help="Số câu truy vấn đo cho mỗi kích thước.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        top_n = getattr(settings, 'APPLICANT_SEARCH_TOP_N', 10)
+        queries = [f"Cần ứng viên {' '.join(rng.sample(SKILLS, 3))}, có kinh nghiệm làm việc nhóm" for _ in range(options['queries'])]
+        self.stdout.write(f"top_n = {top_n}, {options['queries']} truy vấn mỗi kích thước.")
+        self.stdout.write(f"{'Số hồ sơ':>9} {'Token cũ':>10} {'Token mới':>10} {'Dựng đặc trưng':>15} {'Lọc cục bộ (TB)':>16}")
+
+        for size in [int(value) for value in options['sizes'].split(',')]:
+            cvs = {i: build_cv(i, rng) for i in range(size)}
+            documents = [(i, hashlib.sha256(text.encode('utf-8')).hexdigest(), text) for i, text in cvs.items()]
+
+            # Cách cũ: mọi CV (đã rút gọn theo ngân sách chung) vào cùng một prompt.
+            tokens_before = sum(count_tokens(text) for text in fit_many('applicant_search', cvs).values())
+
+            started = time.perf_counter()
+            for _, digest, text in documents:
+                search.document_features(digest, text)
+            build_time = time.perf_counter() - started
+
+            cached = [(key, digest, None) for key, digest, _ in documents]
+            started = time.perf_counter()
+            tokens_after = 0
+            for query in queries:
+                shortlist = search.hybrid_rank(query, cached, top_n)
+                texts = {key: cvs[key] for key, _ in shortlist}
+                tokens_after += sum(count_tokens(text) for text in fit_many('applicant_search', texts).values())
+            rank_time = (time.perf_counter() - started) / len(queries)
+
+            self.stdout.write(
+                f"{size:>9} {tokens_before:>10} {tokens_after // len(queries):>10} "
+                f"{build_time * 1000:>12.0f} ms {rank_time * 1000:>13.1f} ms"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            "Token gửi AI gần như không đổi khi kho hồ sơ lớn lên; bước lọc cục bộ tăng tuyến tính nhưng "
+            "vẫn ở mức mili giây, và đặc trưng của mỗi CV chỉ phải dựng một lần."
+        ))
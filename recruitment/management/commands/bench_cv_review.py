@@ -0,0 +1,64 @@
+import time
+import random
+import statistics
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from recruitment import llm, llm_backends
+from recruitment.scoring import get_ai_match_score, review_cv, build_commentary_prompt
+
+def legacy_review(cv_text, jd_text):
+    """Cách cũ: một lời gọi lấy điểm, rồi thêm một lời gọi nữa với cùng CV/JD để lấy nhận xét."""
+    score = get_ai_match_score(cv_text, jd_text)
+    analysis_data = llm.complete(build_commentary_prompt(cv_text, jd_text, score), schema={'type': 'object'})
+    return {'score': score, **analysis_data}
+
+class Command(BaseCommand):
+    help = "Đo độ trễ của nút \"Phân tích & nhận xét CV\" trước/sau khi gộp điểm và nhận xét vào một lời gọi AI (dùng LLM giả lập)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20, help="Số lượt phân tích cho mỗi kịch bản.")
+        parser.add_argument('--latency', type=float, default=0.8, help="Độ trễ trung bình (giây) của mỗi lời gọi LLM giả lập.")
+        parser.add_argument('--sigma', type=float, default=0.1, help="Độ lệch của phân phối log-normal của độ trễ.")
+
+    def measure(self, label, func, pairs):
+        behaviour = llm_backends.fake_behaviour()
+        behaviour.calls = 0
+        timings = []
+        for cv_text, jd_text in pairs:
+            started = time.perf_counter()
+            func(cv_text, jd_text)
+            timings.append(time.perf_counter() - started)
+        self.stdout.write(
+            f"{label:>28}: trung bình {statistics.mean(timings) * 1000:.0f} ms, "
+            f"p95 {sorted(timings)[int(len(timings) * 0.95) - 1] * 1000:.0f} ms, "
+            f"{behaviour.calls / len(pairs):.1f} lời gọi/lượt"
+        )
+        return statistics.mean(timings)
+
+    def handle(self, *args, **options):
+        run = random.randint(0, 10 ** 9)
+        pairs = lambda name: [
+            (f"CV {name} {run} {i}: Python, Django, SQL", f"JD {name} {run} {i}: Lập trình viên Python")
+            for i in range(options['requests'])
+        ]
+        self.stdout.write(f"LLM giả lập: độ trễ trung vị {options['latency']}s (sigma {options['sigma']}), {options['requests']} lượt mỗi kịch bản.")
+
+        fake = override_settings(
+            LLM_BACKEND='fake', LLM_FAKE_LATENCY=options['latency'], LLM_FAKE_LATENCY_SIGMA=options['sigma'],
+            LLM_FAKE_ERROR_RATE=0.0, LLM_RATE_LIMIT_RPS=0,
+        )
+        # Mọi điểm lưu vào MatchScore trong lúc đo đều bị rollback ở cuối.
+        with fake, transaction.atomic():
+            llm_backends.reset_fake()
+            before_cold = self.measure("Trước, cặp CV/JD mới", legacy_review, pairs('legacy'))
+            before_warm = self.measure("Trước, cặp CV/JD đã có điểm", legacy_review, pairs('legacy'))
+            after_cold = self.measure("Sau, cặp CV/JD mới", review_cv, pairs('review'))
+            after_warm = self.measure("Sau, cặp CV/JD đã có điểm", review_cv, pairs('review'))
+            transaction.set_rollback(True)
+        llm_backends.reset_fake()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Cặp mới: nhanh hơn {before_cold / after_cold:.1f} lần; "
+            f"cặp đã có điểm: {before_warm / after_warm:.1f} lần."
+        ))
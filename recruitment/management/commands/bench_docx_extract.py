@@ -0,0 +1,80 @@
+import io
+import os
+import time
+import statistics
+import docx
+from django.core.management.base import BaseCommand
+from recruitment.extraction import extract_docx_text
+
+def legacy_docx_text(data):
+    """Cách trích xuất cũ: dựng docx.Document và nối para.text (bỏ sót bảng, text box, header)."""
+    doc = docx.Document(io.BytesIO(data))
+    text = ""
+    for para in doc.paragraphs:
+        text += para.text + '\n'
+    return text
+
+def build_sample_docx(index, paragraphs=60, table_rows=15):
+    doc = docx.Document()
+    doc.sections[0].header.paragraphs[0].text = f"Nguyễn Văn {index} - ứng viên {index}@example.com"
+    doc.add_heading("Kinh nghiệm làm việc", level=1)
+    for i in range(paragraphs):
+        doc.add_paragraph(f"Dự án {i}: phát triển hệ thống tuyển dụng bằng Python, Django, PostgreSQL, REST API.")
+    table = doc.add_table(rows=table_rows, cols=2)
+    for i, row in enumerate(table.rows):
+        row.cells[0].text = f"Kỹ năng {i}"
+        row.cells[1].text = "Kiểm thử phần mềm, Selenium, SQL, Docker"
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+class Command(BaseCommand):
+    help = "So sánh tốc độ trích xuất DOCX giữa python-docx (cách cũ) và bộ đọc lxml iterparse."
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help="File .docx hoặc thư mục chứa file .docx.")
+        parser.add_argument('--generate', type=int, default=50, help="Số file mẫu tự sinh khi không truyền đường dẫn.")
+        parser.add_argument('--repeat', type=int, default=3, help="Số lần chạy lại toàn bộ bộ file.")
+
+    def load_corpus(self, paths, generate):
+        corpus = []
+        for path in paths:
+            if os.path.isdir(path):
+                for root, _, files in os.walk(path):
+                    corpus += [os.path.join(root, f) for f in files if f.lower().endswith('.docx')]
+            else:
+                corpus.append(path)
+        if corpus:
+            documents = []
+            for path in corpus:
+                with open(path, 'rb') as f:
+                    documents.append(f.read())
+            return documents
+        return [build_sample_docx(i) for i in range(generate)]
+
+    def measure(self, func, documents, repeat):
+        timings = []
+        for _ in range(repeat):
+            for data in documents:
+                started = time.perf_counter()
+                func(data)
+                timings.append(time.perf_counter() - started)
+        chars = sum(len(func(data)) for data in documents)
+        return timings, chars
+
+    def handle(self, *args, **options):
+        documents = self.load_corpus(options['paths'], options['generate'])
+        total_mb = sum(len(d) for d in documents) / (1024 * 1024)
+        self.stdout.write(f"Bộ file: {len(documents)} DOCX, {total_mb:.2f} MB, chạy {options['repeat']} lần.")
+
+        results = {}
+        for label, func in (('python-docx', legacy_docx_text), ('lxml iterparse', lambda d: extract_docx_text(io.BytesIO(d)))):
+            timings, chars = self.measure(func, documents, options['repeat'])
+            results[label] = sum(timings)
+            self.stdout.write(
+                f"{label:>15}: tổng {sum(timings) * 1000:.1f} ms, trung bình {statistics.mean(timings) * 1000:.2f} ms/file, "
+                f"p95 {sorted(timings)[int(len(timings) * 0.95) - 1] * 1000:.2f} ms, {chars} ký tự"
+            )
+
+        speedup = results['python-docx'] / max(results['lxml iterparse'], 1e-9)
+        self.stdout.write(self.style.SUCCESS(f"lxml nhanh hơn {speedup:.1f} lần."))
@@ -0,0 +1,86 @@
+import time
+import random
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from recruitment import fulltext
+from recruitment.models import CustomUser, JobPosting
+
+TITLES = [
+    'Lập trình viên Python', 'Kỹ sư Java Spring Boot', 'Frontend ReactJS', 'Chuyên viên kiểm thử phần mềm',
+    'Nhân viên kế toán tổng hợp', 'Chuyên viên nhân sự', 'Nhân viên kinh doanh phần mềm', 'Business Analyst',
+    'Chuyên viên Marketing Online', 'DevOps Engineer', 'Thiết kế UI/UX', 'Data Engineer',
+]
+WORDS = (
+    'phát triển hệ thống quản lý khách hàng làm việc nhóm báo cáo định kỳ phối hợp phòng ban triển khai dự án '
+    'bảo trì nâng cấp phân tích yêu cầu tiếng Anh giao tiếp chủ động trách nhiệm môi trường năng động lương thưởng'
+).split()
+SKILLS = [
+    'Docker', 'Kubernetes', 'AWS', 'PostgreSQL', 'MySQL', 'Git', 'Scrum', 'Agile', 'Excel', 'SAP', 'SEO', 'Figma',
+    'Selenium', 'NodeJS', 'VueJS', 'Redis', 'Kafka', 'Jenkins', 'Terraform', 'Photoshop', 'Power BI', 'Tableau',
+    'Jira', 'Linux', 'GraphQL', 'TypeScript', 'Flutter', 'Kotlin', 'Swift', 'MongoDB',
+]
+QUERIES = ['python', 'kiểm thử', 'ke toan', 'reactjs', 'kubernetes aws', 'spring boot', 'figma', 'marketing seo']
+
+class Command(BaseCommand):
+    help = (
+        "So sánh tìm kiếm job bằng icontains với chỉ mục full-text trên N tin tuyển dụng giả "
+        "(dữ liệu được tạo trong transaction và xóa khi đo xong)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100000, help="Số tin tuyển dụng giả.")
+        parser.add_argument('--repeat', type=int, default=5, help="Số lần chạy mỗi truy vấn.")
+
+    def handle(self, *args, **options):
+        if not fulltext.supported():
+            self.stderr.write("Cơ sở dữ liệu hiện tại không hỗ trợ full-text (chỉ SQLite FTS5 và PostgreSQL).")
+            return
+        with transaction.atomic():
+            self._run(options['count'], options['repeat'])
+            transaction.set_rollback(True)
+
+    def _run(self, count, repeat):
+        rng = random.Random(42)
+        recruiter = CustomUser.objects.create_user(username='bench_job_search', password=None, user_type='recruiter')
+        started = time.perf_counter()
+        JobPosting.objects.bulk_create(
+            [
+                JobPosting(
+                    recruiter=recruiter,
+                    title=f"{rng.choice(TITLES)} {i}",
+                    description=' '.join(rng.choices(WORDS, k=rng.randint(80, 200)) + rng.sample(SKILLS, 3)),
+                    location='Hà Nội',
+                )
+                for i in range(count)
+            ],
+            batch_size=2000,
+        )
+        self.stdout.write(f"Tạo {count} tin tuyển dụng: {time.perf_counter() - started:.1f} s")
+        started = time.perf_counter()
+        indexed = fulltext.rebuild()
+        self.stdout.write(f"Dựng chỉ mục full-text cho {indexed} tin: {time.perf_counter() - started:.1f} s")
+
+        base = JobPosting.objects.filter(is_archived=False)
+        self.stdout.write(f"{'Truy vấn':<16} {'Kết quả':>8} {'icontains':>12} {'full-text':>12} {'Nhanh hơn':>10}")
+        for query in QUERIES:
+            scan = base.filter(Q(title__icontains=query) | Q(description__icontains=query)).order_by('-created_at')
+            indexed_query = fulltext.search_jobs(base, query)
+            scan_time, scan_count = self._time(scan, repeat)
+            index_time, index_count = self._time(indexed_query, repeat)
+            self.stdout.write(
+                f"{query:<16} {index_count:>8} {scan_time * 1000:>9.1f} ms {index_time * 1000:>9.1f} ms "
+                f"{scan_time / index_time if index_time else 0:>9.1f}x"
+                + (f"  (icontains: {scan_count})" if scan_count != index_count else '')
+            )
+        self.stdout.write(self.style.SUCCESS(
+            "Thời gian là trung bình một lần lấy 20 kết quả đầu và đếm tổng số kết quả, như một trang tìm kiếm. "
+            "icontains không bỏ dấu nên \"ke toan\" không tìm ra \"kế toán\"."
+        ))
+
+    def _time(self, queryset, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            list(queryset[:20])
+            total = queryset.count()
+        return (time.perf_counter() - started) / repeat, total
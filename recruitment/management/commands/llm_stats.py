@@ -0,0 +1,46 @@
+import json
+from django.core.management.base import BaseCommand
+from recruitment import telemetry
+
+class Command(BaseCommand):
+    help = "Báo cáo lời gọi AI theo chỗ gọi: số lời gọi, token, chi phí ước tính, độ trễ p50/p95, retry và lỗi."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help="Chỉ tính các lời gọi trong số giờ gần nhất.")
+        parser.add_argument('--json', action='store_true', help="In kết quả dạng JSON (giống /api/llm-metrics/).")
+        parser.add_argument('--histogram', action='store_true', help="In thêm histogram độ trễ của từng chỗ gọi.")
+
+    def handle(self, *args, **options):
+        stats = telemetry.summarize(options['hours'])
+        if options['json']:
+            self.stdout.write(json.dumps(stats, ensure_ascii=False, indent=2))
+            return
+        if not stats:
+            self.stdout.write(f"Không có lời gọi AI nào trong {options['hours']} giờ qua.")
+            return
+
+        self.stdout.write(
+            f"{'Chỗ gọi':<20} {'Lời gọi':>8} {'Token vào':>10} {'Token ra':>9} {'USD':>9} "
+            f"{'p50 ms':>7} {'p95 ms':>7} {'Max ms':>7} {'Retry':>6} {'Lỗi':>5} {'JSON':>5} {'429':>5} {'Ngắt':>5} {'Rút gọn':>9}"
+        )
+        for call_site, site in stats.items():
+            latency = site['latency_ms']
+            self.stdout.write(
+                f"{call_site:<20} {site['calls']:>8} {site['prompt_tokens']:>10} {site['completion_tokens']:>9} "
+                f"{site['cost_usd']:>9.4f} {latency['p50']:>7} {latency['p95']:>7} {latency['max']:>7} "
+                f"{site['retries']:>6} {site['errors']:>5} {site['parse_failures']:>5} {site['rate_limited']:>5} {site['circuit_open']:>5} "
+                f"{site['compaction']['tokens_saved']:>9}"
+            )
+            if options['histogram']:
+                total = site['calls']
+                for label, count in site['histogram'].items():
+                    bar = '#' * round(40 * count / total) if total else ''
+                    self.stdout.write(f"    {label:>8} ms {count:>6} {bar}")
+
+        total_tokens = sum(site['total_tokens'] for site in stats.values())
+        total_cost = sum(site['cost_usd'] for site in stats.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Tổng: {sum(site['calls'] for site in stats.values())} lời gọi, {total_tokens} token, ~{total_cost:.4f} USD "
+            f"trong {options['hours']} giờ qua. Cột JSON: trả lời sai định dạng; 429: bị chặn bởi giới hạn tốc độ nội bộ; "
+            f"Ngắt: bị circuit breaker từ chối; Rút gọn: số token CV/JD bớt được nhờ rút gọn prompt."
+        ))
@@ -0,0 +1,64 @@
+import hashlib
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from recruitment.models import Application, Profile
+from recruitment.storage import cv_storage, release_cv_files
+from recruitment.utils import read_cv_bytes
+
+TARGETS = (
+    ('application', Application, 'cv'),
+    ('profile', Profile, 'cv_file'),
+)
+
+class Command(BaseCommand):
+    help = ("Chuyển các file CV lưu trước khi có ContentAddressedStorage sang tên theo SHA-256 "
+            "(cvs/<sha256>.<đuôi>), để các bản trùng nội dung dùng chung một file; file cũ bị xóa "
+            "khi không còn bản ghi nào trỏ tới. Chạy lại nhiều lần cũng an toàn.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help="Số bản ghi mỗi lượt.")
+        parser.add_argument('--dry-run', action='store_true', help="Chỉ liệt kê file sẽ được chuyển, không ghi gì.")
+
+    def handle(self, *args, **options):
+        totals = {'moved': 0, 'failed': 0}
+        old_names = set()
+        for name, model, file_attr in TARGETS:
+            self.migrate(name, model, file_attr, options, totals, old_names)
+
+        if not options['dry_run']:
+            release_cv_files(old_names)
+        self.stdout.write(self.style.SUCCESS(
+            f"Hoàn tất: {totals['moved']} bản ghi được chuyển sang tên theo nội dung, {totals['failed']} lỗi."
+        ))
+
+    def migrate(self, name, model, file_attr, options, totals, old_names):
+        rows = model.objects.exclude(**{file_attr: ''}).exclude(**{f'{file_attr}__isnull': True}).order_by('pk')
+        last_pk = 0
+        while True:
+            batch = list(rows.filter(pk__gt=last_pk)[:options['batch_size']])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            for row in batch:
+                cv_file = getattr(row, file_attr)
+                if cv_storage.is_hashed(cv_file.name):
+                    continue
+                if options['dry_run']:
+                    self.stdout.write(f"[{name}] pk={row.pk}: {cv_file.name}")
+                    totals['moved'] += 1
+                    continue
+                try:
+                    data = read_cv_bytes(cv_file)
+                except Exception as e:
+                    self.stderr.write(f"Không đọc được '{cv_file.name}': {e}")
+                    totals['failed'] += 1
+                    continue
+                new_name = cv_storage.save(cv_file.name, ContentFile(data), max_length=cv_file.field.max_length)
+                # update() thay vì save() để không chạy lại các xử lý trong save()/signal của model.
+                model.objects.filter(pk=row.pk).update(**{
+                    file_attr: new_name,
+                    'cv_sha256': hashlib.sha256(data).hexdigest(),
+                })
+                old_names.add(cv_file.name)
+                totals['moved'] += 1
+            self.stdout.write(f"[{name}] đến pk={last_pk}")
@@ -0,0 +1,19 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from recruitment import fulltext
+
+class Command(BaseCommand):
+    help = "Dựng lại chỉ mục full-text của tin tuyển dụng (sau khi nhập dữ liệu hàng loạt hoặc khi chỉ mục bị lệch)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help="Số job mỗi lượt ghi vào chỉ mục.")
+
+    def handle(self, *args, **options):
+        if not fulltext.supported():
+            self.stderr.write("Cơ sở dữ liệu hiện tại không hỗ trợ full-text (chỉ SQLite FTS5 và PostgreSQL).")
+            return
+        started = time.monotonic()
+        with transaction.atomic():
+            total = fulltext.rebuild(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Đã đánh chỉ mục {total} tin tuyển dụng trong {time.monotonic() - started:.1f} s."))
@@ -0,0 +1,79 @@
+import time
+import signal
+import threading
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from recruitment import tasks, telemetry
+
+# Chu kỳ (giây) dọn thống kê lời gọi AI cũ (telemetry.prune) trong luồng chính của worker.
+PRUNE_INTERVAL = 3600
+
+class Command(BaseCommand):
+    help = "Chạy worker xử lý hàng đợi tác vụ nền (chấm điểm hồ sơ ứng tuyển, ...)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=2, help="Số luồng worker chạy song song.")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Số giây chờ khi hàng đợi trống.")
+        parser.add_argument('--burst', action='store_true', help="Xử lý hết các tác vụ đến hạn rồi thoát.")
+        parser.add_argument('--worker-id', default=None, help="Tên worker (mặc định: hostname:pid).")
+
+    def work(self, worker_id, poll_interval, burst, counters, lock):
+        while not self.stop.is_set():
+            close_old_connections()
+            try:
+                task_obj = tasks.claim(worker_id)
+            except Exception as e:
+                print(f"Lỗi khi lấy tác vụ ({worker_id}): {e}")
+                task_obj = None
+            if task_obj is None:
+                if burst:
+                    break
+                self.stop.wait(poll_interval)
+                continue
+
+            ok = tasks.run_task(task_obj)
+            with lock:
+                counters['done' if ok else 'failed'] += 1
+        close_old_connections()
+
+    def prune(self):
+        try:
+            deleted = telemetry.prune()
+        except Exception as e:
+            print(f"Lỗi khi dọn thống kê lời gọi AI: {e}")
+        else:
+            if deleted:
+                self.stdout.write(f"Đã xóa {deleted} dòng thống kê lời gọi AI cũ.")
+        finally:
+            close_old_connections()
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: self.stop.set())
+
+        base_id = options['worker_id'] or tasks.default_worker_id()
+        counters = {'done': 0, 'failed': 0}
+        lock = threading.Lock()
+        threads = [
+            threading.Thread(
+                target=self.work,
+                args=(f"{base_id}/{i}", options['poll_interval'], options['burst'], counters, lock),
+                daemon=True,
+            )
+            for i in range(max(1, options['threads']))
+        ]
+        self.stdout.write(f"Khởi động {len(threads)} luồng worker ({base_id}). Nhấn Ctrl+C để dừng.")
+        for thread in threads:
+            thread.start()
+        next_prune = 0.0
+        while any(thread.is_alive() for thread in threads):
+            if not options['burst'] and time.monotonic() >= next_prune:
+                next_prune = time.monotonic() + PRUNE_INTERVAL
+                self.prune()
+            for thread in threads:
+                thread.join(timeout=0.5)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Worker dừng: {counters['done']} tác vụ thành công, {counters['failed']} tác vụ lỗi."
+        ))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CVText',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='Mã băm SHA-256 của file')),
+                ('text', models.TextField(blank=True, verbose_name='Văn bản trích xuất')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='cv_sha256',
+            field=models.CharField(blank=True, db_index=True, max_length=64, verbose_name='Mã băm CV'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='cv_sha256',
+            field=models.CharField(blank=True, db_index=True, max_length=64, verbose_name='Mã băm CV'),
+        ),
+    ]
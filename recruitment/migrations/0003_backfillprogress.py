@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0002_cvtext_store'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackfillProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Tên tác vụ')),
+                ('last_pk', models.BigIntegerField(default=0, verbose_name='Khóa chính cuối cùng đã xử lý')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:09
+
+import recruitment.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0003_backfillprogress'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='application',
+            name='cv',
+            field=models.FileField(storage=recruitment.storage.get_cv_storage, upload_to='cvs/'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='cv_file',
+            field=models.FileField(blank=True, null=True, storage=recruitment.storage.get_cv_storage, upload_to='cvs/'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0004_content_addressed_cv_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cv_digest', models.CharField(max_length=64, verbose_name='Mã băm văn bản CV')),
+                ('jd_digest', models.CharField(max_length=64, verbose_name='Mã băm mô tả công việc')),
+                ('model', models.CharField(max_length=100, verbose_name='Mô hình AI')),
+                ('prompt_version', models.CharField(max_length=20, verbose_name='Phiên bản prompt')),
+                ('score', models.IntegerField(verbose_name='Điểm phù hợp')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'unique_together': {('cv_digest', 'jd_digest', 'model', 'prompt_version')},
+            },
+        ),
+    ]
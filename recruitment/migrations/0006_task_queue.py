@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:16
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0005_matchscore'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Tên tác vụ')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Tham số')),
+                ('status', models.CharField(choices=[('queued', 'Đang chờ'), ('running', 'Đang xử lý'), ('dead', 'Thất bại')], default='queued', max_length=10, verbose_name='Trạng thái')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Số lần đã chạy')),
+                ('max_attempts', models.PositiveIntegerField(default=5, verbose_name='Số lần chạy tối đa')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Được chạy từ lúc')),
+                ('locked_by', models.CharField(blank=True, max_length=100, verbose_name='Worker đang giữ')),
+                ('last_error', models.TextField(blank=True, verbose_name='Lỗi gần nhất')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'available_at'], name='recruitment_status_c9990f_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:24
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0006_task_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatAnswer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question', models.CharField(max_length=500, verbose_name='Câu hỏi gốc')),
+                ('normalized', models.CharField(max_length=500, verbose_name='Câu hỏi đã chuẩn hóa')),
+                ('vector', models.BinaryField(verbose_name='Vector n-gram')),
+                ('answer', models.TextField(verbose_name='Câu trả lời')),
+                ('hits', models.PositiveIntegerField(default=0, verbose_name='Số lần dùng lại')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Dùng lần cuối')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ChatCacheStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True, verbose_name='Ngày')),
+                ('lookups', models.PositiveIntegerField(default=0, verbose_name='Số câu hỏi')),
+                ('hits', models.PositiveIntegerField(default=0, verbose_name='Số lần trúng cache')),
+            ],
+            options={
+                'ordering': ['-date'],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0007_chat_answer_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateLimitBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Tên bucket')),
+                ('tokens', models.FloatField(verbose_name='Số token còn lại')),
+                ('updated_at', models.FloatField(verbose_name='Thời điểm nạp lại (epoch)')),
+                ('version', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0008_ratelimitbucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMCall',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('call_site', models.CharField(max_length=50, verbose_name='Chỗ gọi')),
+                ('model', models.CharField(max_length=100, verbose_name='Model')),
+                ('priority', models.CharField(default='interactive', max_length=20, verbose_name='Ưu tiên')),
+                ('status', models.CharField(choices=[('ok', 'Thành công'), ('error', 'Lỗi API'), ('parse_error', 'Sai định dạng'), ('rate_limited', 'Vượt hạn mức')], max_length=20, verbose_name='Kết quả')),
+                ('prompt_tokens', models.PositiveIntegerField(default=0, verbose_name='Token prompt')),
+                ('completion_tokens', models.PositiveIntegerField(default=0, verbose_name='Token trả lời')),
+                ('latency_ms', models.PositiveIntegerField(verbose_name='Độ trễ (ms)')),
+                ('retries', models.PositiveIntegerField(default=0, verbose_name='Số lần thử lại')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0009_llm_call'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='ai_score_provisional',
+            field=models.BooleanField(default=False, verbose_name='Điểm tạm tính (chờ AI chấm lại)'),
+        ),
+        migrations.AlterField(
+            model_name='llmcall',
+            name='status',
+            field=models.CharField(choices=[('ok', 'Thành công'), ('error', 'Lỗi API'), ('parse_error', 'Sai định dạng'), ('rate_limited', 'Vượt hạn mức'), ('circuit_open', 'Bị ngắt (circuit breaker)')], max_length=20, verbose_name='Kết quả'),
+        ),
+    ]
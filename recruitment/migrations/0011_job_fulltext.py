@@ -0,0 +1,53 @@
+from django.db import migrations
+
+from recruitment.search import tokenize
+
+TABLE = 'recruitment_jobposting_fts'
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {TABLE} USING fts5(title, body, tokenize = \"unicode61 tokenchars '+#.'\")"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            f"CREATE TABLE {TABLE} ("
+            f"job_id bigint PRIMARY KEY REFERENCES recruitment_jobposting (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            f"document tsvector NOT NULL)"
+        )
+        schema_editor.execute(f"CREATE INDEX {TABLE}_document_gin ON {TABLE} USING gin (document)")
+    else:
+        return
+
+    JobPosting = apps.get_model('recruitment', 'JobPosting')
+    rows = [
+        (job.id, ' '.join(tokenize(job.title)), ' '.join(tokenize(job.description)))
+        for job in JobPosting.objects.only('id', 'title', 'description').iterator()
+    ]
+    if not rows:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            cursor.executemany(f"INSERT INTO {TABLE} (rowid, title, body) VALUES (%s, %s, %s)", rows)
+        else:
+            cursor.executemany(
+                f"INSERT INTO {TABLE} (job_id, document) VALUES "
+                f"(%s, setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B'))",
+                rows,
+            )
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0010_circuit_breaker'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:44
+
+from django.db import migrations, models, transaction
+
+# Lọc "chứa chuỗi" (LIKE '%...%') không dùng được chỉ mục B-tree; trên PostgreSQL thêm chỉ mục trigram.
+TRIGRAM_INDEXES = (
+    ('recruitment_jobposting', 'title_folded'),
+    ('recruitment_jobposting', 'location_folded'),
+    ('recruitment_profile', 'full_name_folded'),
+)
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except Exception as e:
+        print(f"Không bật được pg_trgm, bỏ qua chỉ mục trigram: {e}")
+        return
+    for table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(f"CREATE INDEX IF NOT EXISTS {table}_{column}_trgm ON {table} USING gin ({column} gin_trgm_ops)")
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {table}_{column}_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0011_job_fulltext'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobposting',
+            name='category_folded',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='location_folded',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='title_folded',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='full_name_folded',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0012_search_folded_columns'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['job', '-applied_at', '-id'], name='recruitment_job_id_6368e0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='directmessage',
+            index=models.Index(fields=['application', '-timestamp', '-id'], name='recruitment_applica_42b3c3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['is_archived', '-created_at', '-id'], name='recruitment_is_arch_2bb75b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', '-created_at', '-id'], name='recruitment_recipie_ef76e0_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0013_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='llmcall',
+            name='tokens_after',
+            field=models.PositiveIntegerField(default=0, verbose_name='Token CV/JD sau khi rút gọn'),
+        ),
+        migrations.AddField(
+            model_name='llmcall',
+            name='tokens_before',
+            field=models.PositiveIntegerField(default=0, verbose_name='Token CV/JD trước khi rút gọn'),
+        ),
+    ]
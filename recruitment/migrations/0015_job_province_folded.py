@@ -0,0 +1,66 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:23
+
+from django.db import migrations, models, transaction
+
+from recruitment.search import province_key
+
+# Lọc tên ứng viên: full_name_folded đã có chỉ mục trigram (0012); thêm cho UPPER(username) mà icontains dùng.
+USERNAME_TRIGRAM_INDEX = 'recruitment_customuser_username_upper_trgm'
+
+def fill_provinces(apps, schema_editor):
+    JobPosting = apps.get_model('recruitment', 'JobPosting')
+    batch = []
+    for job in JobPosting.objects.only('id', 'location').iterator(chunk_size=1000):
+        job.province_folded = province_key(job.location)
+        if job.province_folded:
+            batch.append(job)
+        if len(batch) >= 1000:
+            JobPosting.objects.bulk_update(batch, ['province_folded'])
+            batch = []
+    JobPosting.objects.bulk_update(batch, ['province_folded'])
+
+def create_username_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except Exception as e:
+        print(f"Không bật được pg_trgm, bỏ qua chỉ mục trigram: {e}")
+        return
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {USERNAME_TRIGRAM_INDEX} ON recruitment_customuser "
+        f"USING gin ((UPPER(username::text)) gin_trgm_ops)"
+    )
+
+def drop_username_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {USERNAME_TRIGRAM_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0014_llm_call_compaction_tokens'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobposting',
+            name='province_folded',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=100),
+        ),
+        migrations.RunPython(fill_provinces, migrations.RunPython.noop),
+        # Bộ lọc địa điểm chuyển sang so sánh bằng trên province_folded; cột cũ (và chỉ mục trigram của nó) bỏ đi.
+        migrations.RemoveField(
+            model_name='jobposting',
+            name='location_folded',
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='full_name_folded',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.RunPython(create_username_trigram_index, drop_username_trigram_index),
+    ]
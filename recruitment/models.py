@@ -1,5 +1,15 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
+from .storage import get_cv_storage
+from .search import fold_key, province_key
+
+def _folded_update_fields(update_fields, sources):
+    """Khi save(update_fields=...) có trường nguồn, thêm cột *_folded tương ứng để được ghi cùng."""
+    if update_fields is None:
+        return None
+    update_fields = set(update_fields)
+    return update_fields | {folded for source, folded in sources.items() if source in update_fields}
 
 class CustomUser(AbstractUser):
     USER_TYPE_CHOICES = (
@@ -35,9 +45,33 @@ class JobPosting(models.Model):
     benefits = models.TextField(blank=True, null=True, verbose_name="Phúc lợi")
     created_at = models.DateTimeField(auto_now_add=True)
     is_archived = models.BooleanField(default=False, verbose_name="Đã lưu trữ ")
+
+    # Bản bỏ dấu (search.fold_key) để lọc không phân biệt dấu bằng so sánh bằng trên chỉ mục; cập nhật
+    # trong save(), dữ liệu cũ được điền bằng lệnh backfill_search_columns. province_folded là tỉnh/thành
+    # của địa điểm (search.province_key), dùng cho bộ lọc địa điểm thay vì "chứa chuỗi" trên địa chỉ đầy đủ.
+    title_folded = models.CharField(max_length=255, blank=True, editable=False, db_index=True)
+    province_folded = models.CharField(max_length=100, blank=True, editable=False, db_index=True)
+    category_folded = models.CharField(max_length=100, blank=True, editable=False, db_index=True)
+
+    FOLDED_SOURCES = {'title': 'title_folded', 'location': 'province_folded', 'category': 'category_folded'}
+
     def __str__(self):
         return self.title
 
+    def refresh_folded(self):
+        self.title_folded = fold_key(self.title)
+        self.province_folded = province_key(self.location)
+        self.category_folded = fold_key(self.get_category_display())
+
+    def save(self, *args, **kwargs):
+        self.refresh_folded()
+        kwargs['update_fields'] = _folded_update_fields(kwargs.get('update_fields'), self.FOLDED_SOURCES)
+        super().save(*args, **kwargs)
+
+    class Meta:
+        # Khóa phân trang keyset của bảng tin việc làm (recruitment/pagination.py).
+        indexes = [models.Index(fields=['is_archived', '-created_at', '-id'])]
+
 class Application(models.Model):
     STATUS_CHOICES = (
         ('pending', 'Chờ xử lý'),
@@ -50,14 +84,19 @@ class Application(models.Model):
     
     job = models.ForeignKey(JobPosting, on_delete=models.CASCADE, related_name='application')
     candidate = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
-    cv = models.FileField(upload_to='cvs/')
+    cv = models.FileField(upload_to='cvs/', storage=get_cv_storage)
+    cv_sha256 = models.CharField(max_length=64, blank=True, db_index=True, verbose_name="Mã băm CV")
     ai_score = models.FloatField(null=True, blank=True)
     ai_summary = models.TextField(blank=True)
+    ai_score_provisional = models.BooleanField(default=False, verbose_name="Điểm tạm tính (chờ AI chấm lại)")
     applied_at = models.DateTimeField(auto_now_add=True)
     is_talent_pool = models.BooleanField(default=False, verbose_name="Lưu vào Kho nhân tài")
 
     def __str__(self):
         return f"{self.candidate.username} applied for {self.job.title}"
+
+    class Meta:
+        indexes = [models.Index(fields=['job', '-applied_at', '-id'])]
     
 class Notification(models.Model):
     recipient = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='notifications', verbose_name="Người nhận")
@@ -71,16 +110,30 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [models.Index(fields=['recipient', '-created_at', '-id'])]
     
 class Profile(models.Model):
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE)
     full_name = models.CharField(max_length=255, blank=True)
-    cv_file = models.FileField(upload_to='cvs/', blank=True, null=True)
+    cv_file = models.FileField(upload_to='cvs/', storage=get_cv_storage, blank=True, null=True)
+    cv_sha256 = models.CharField(max_length=64, blank=True, db_index=True, verbose_name="Mã băm CV")
     summary = models.TextField(default='', blank=True, verbose_name="Tóm tắt bản thân")
     avatar = models.ImageField(upload_to='avatars/', null=True, blank=True, verbose_name="Ảnh đại diện")
-    
+    # Lọc "chứa chuỗi" theo tên: trên PostgreSQL dùng chỉ mục trigram (migration 0012), không cần B-tree.
+    full_name_folded = models.CharField(max_length=255, blank=True, editable=False)
+
+    FOLDED_SOURCES = {'full_name': 'full_name_folded'}
+
     def __str__(self):
         return self.user.username
+
+    def refresh_folded(self):
+        self.full_name_folded = fold_key(self.full_name)
+
+    def save(self, *args, **kwargs):
+        self.refresh_folded()
+        kwargs['update_fields'] = _folded_update_fields(kwargs.get('update_fields'), self.FOLDED_SOURCES)
+        super().save(*args, **kwargs)
     
 class DirectMessage(models.Model):
     application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='messages', verbose_name="Hồ sơ")
@@ -95,6 +148,7 @@ class DirectMessage(models.Model):
 
     class Meta:
         ordering = ['timestamp']
+        indexes = [models.Index(fields=['application', '-timestamp', '-id'])]
 
 class EmailTemplate(models.Model):
     TEMPLATE_TYPES = (
@@ -124,4 +178,115 @@ class Interview(models.Model):
     ai_score = models.IntegerField(default=0, verbose_name="Điểm phỏng vấn từ AI (Không bắt buộc)")
 
     def __str__(self):
-        return f"Phỏng vấn cho {self.application.candidate.username} vị trí {self.application.job.title}"
\ No newline at end of file
+        return f"Phỏng vấn cho {self.application.candidate.username} vị trí {self.application.job.title}"
+
+class CVText(models.Model):
+    sha256 = models.CharField(max_length=64, unique=True, verbose_name="Mã băm SHA-256 của file")
+    text = models.TextField(blank=True, verbose_name="Văn bản trích xuất")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"CVText {self.sha256[:12]}"
+
+class BackfillProgress(models.Model):
+    name = models.CharField(max_length=100, unique=True, verbose_name="Tên tác vụ")
+    last_pk = models.BigIntegerField(default=0, verbose_name="Khóa chính cuối cùng đã xử lý")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.last_pk}"
+
+class MatchScore(models.Model):
+    cv_digest = models.CharField(max_length=64, verbose_name="Mã băm văn bản CV")
+    jd_digest = models.CharField(max_length=64, verbose_name="Mã băm mô tả công việc")
+    model = models.CharField(max_length=100, verbose_name="Mô hình AI")
+    prompt_version = models.CharField(max_length=20, verbose_name="Phiên bản prompt")
+    score = models.IntegerField(verbose_name="Điểm phù hợp")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('cv_digest', 'jd_digest', 'model', 'prompt_version')
+
+    def __str__(self):
+        return f"{self.cv_digest[:8]}/{self.jd_digest[:8]}: {self.score}"
+
+class Task(models.Model):
+    STATUS_CHOICES = (
+        ('queued', 'Đang chờ'),
+        ('running', 'Đang xử lý'),
+        ('dead', 'Thất bại'),
+    )
+    name = models.CharField(max_length=100, verbose_name="Tên tác vụ")
+    payload = models.JSONField(default=dict, blank=True, verbose_name="Tham số")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued', verbose_name="Trạng thái")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Số lần đã chạy")
+    max_attempts = models.PositiveIntegerField(default=5, verbose_name="Số lần chạy tối đa")
+    available_at = models.DateTimeField(default=timezone.now, verbose_name="Được chạy từ lúc")
+    locked_by = models.CharField(max_length=100, blank=True, verbose_name="Worker đang giữ")
+    last_error = models.TextField(blank=True, verbose_name="Lỗi gần nhất")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'available_at'])]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+class ChatAnswer(models.Model):
+    question = models.CharField(max_length=500, verbose_name="Câu hỏi gốc")
+    normalized = models.CharField(max_length=500, verbose_name="Câu hỏi đã chuẩn hóa")
+    vector = models.BinaryField(verbose_name="Vector n-gram")
+    answer = models.TextField(verbose_name="Câu trả lời")
+    hits = models.PositiveIntegerField(default=0, verbose_name="Số lần dùng lại")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True, verbose_name="Dùng lần cuối")
+
+    def __str__(self):
+        return self.question[:80]
+
+class ChatCacheStats(models.Model):
+    date = models.DateField(unique=True, verbose_name="Ngày")
+    lookups = models.PositiveIntegerField(default=0, verbose_name="Số câu hỏi")
+    hits = models.PositiveIntegerField(default=0, verbose_name="Số lần trúng cache")
+
+    class Meta:
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"{self.date}: {self.hits}/{self.lookups}"
+
+class RateLimitBucket(models.Model):
+    name = models.CharField(max_length=100, unique=True, verbose_name="Tên bucket")
+    tokens = models.FloatField(verbose_name="Số token còn lại")
+    updated_at = models.FloatField(verbose_name="Thời điểm nạp lại (epoch)")
+    version = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.tokens:.1f}"
+
+class LLMCall(models.Model):
+    STATUS_CHOICES = (
+        ('ok', 'Thành công'),
+        ('error', 'Lỗi API'),
+        ('parse_error', 'Sai định dạng'),
+        ('rate_limited', 'Vượt hạn mức'),
+        ('circuit_open', 'Bị ngắt (circuit breaker)'),
+    )
+    call_site = models.CharField(max_length=50, verbose_name="Chỗ gọi")
+    model = models.CharField(max_length=100, verbose_name="Model")
+    priority = models.CharField(max_length=20, default='interactive', verbose_name="Ưu tiên")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, verbose_name="Kết quả")
+    prompt_tokens = models.PositiveIntegerField(default=0, verbose_name="Token prompt")
+    completion_tokens = models.PositiveIntegerField(default=0, verbose_name="Token trả lời")
+    latency_ms = models.PositiveIntegerField(verbose_name="Độ trễ (ms)")
+    retries = models.PositiveIntegerField(default=0, verbose_name="Số lần thử lại")
+    tokens_before = models.PositiveIntegerField(default=0, verbose_name="Token CV/JD trước khi rút gọn")
+    tokens_after = models.PositiveIntegerField(default=0, verbose_name="Token CV/JD sau khi rút gọn")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.call_site} ({self.status}, {self.latency_ms} ms)"
@@ -0,0 +1,106 @@
+"""
+Phân trang keyset (cursor) cho các danh sách dài: bảng tin việc làm, danh sách ứng viên, thông báo, chat.
+
+Thay vì OFFSET (càng cuộn sâu database càng phải bỏ qua nhiều dòng), mỗi trang lọc theo giá trị
+sắp xếp của dòng cuối trang trước: với thứ tự ('-created_at', '-id') trang sau là
+created_at < c OR (created_at = c AND id < i). Kết hợp với chỉ mục trên các cột sắp xếp, chi phí
+mỗi trang không đổi dù người dùng đã tải bao nhiêu trang. Cột cuối luôn là id để thứ tự ổn định
+khi trùng giá trị; các cột sắp xếp không được NULL (dùng Coalesce nếu cần).
+
+Cursor là chuỗi được ký (django.core.signing) nên người dùng không đọc/sửa được; cursor sai hoặc
+bị sửa được coi như không có (quay về trang đầu).
+"""
+import datetime
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+CURSOR_SALT = 'recruitment.pagination'
+
+def _ordering(ordering):
+    return [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+
+def encode_cursor(values):
+    return signing.dumps(
+        [value.isoformat() if isinstance(value, (datetime.datetime, datetime.date)) else value for value in values],
+        salt=CURSOR_SALT,
+    )
+
+def decode_cursor(token, model, ordering):
+    """Giá trị sắp xếp trong cursor (đã chuyển về kiểu của trường), hoặc None nếu cursor không hợp lệ."""
+    try:
+        values = signing.loads(token, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        return None
+    if not isinstance(values, list) or len(values) != len(ordering):
+        return None
+    decoded = []
+    for (name, _), value in zip(_ordering(ordering), values):
+        try:
+            value = model._meta.get_field(name).to_python(value)
+        except FieldDoesNotExist:
+            pass  # giá trị annotate (ví dụ search_rank) đã đúng kiểu sau JSON
+        except ValidationError:
+            return None
+        decoded.append(value)
+    return decoded
+
+def after(values, ordering):
+    """Điều kiện Q chọn các dòng đứng sau dòng có giá trị sắp xếp values."""
+    condition = Q()
+    equal = Q()
+    for (name, descending), value in zip(_ordering(ordering), values):
+        condition |= equal & Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+        equal &= Q(**{name: value})
+    return condition
+
+class KeysetPage:
+    def __init__(self, items, next_cursor, request, param):
+        self.object_list = items
+        self.next_cursor = next_cursor
+        self.request = request
+        self.param = param
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def is_first(self):
+        return self.param not in self.request.GET
+
+    @property
+    def next_url(self):
+        """URL trang sau, giữ nguyên các tham số lọc hiện tại."""
+        if self.next_cursor is None:
+            return None
+        params = self.request.GET.copy()
+        params[self.param] = self.next_cursor
+        return f"?{params.urlencode()}"
+
+def paginate(request, queryset, ordering, per_page=None, param='cursor'):
+    """
+    Trả về KeysetPage gồm tối đa per_page dòng của queryset theo ordering (danh sách tên trường như
+    order_by, kết thúc bằng 'id' hoặc '-id'), bắt đầu sau cursor trong request.GET[param].
+    """
+    per_page = per_page or getattr(settings, 'PAGE_SIZE', 20)
+    queryset = queryset.order_by(*ordering)
+    token = request.GET.get(param)
+    values = decode_cursor(token, queryset.model, ordering) if token else None
+    if values is not None:
+        queryset = queryset.filter(after(values, ordering))
+
+    items = list(queryset[:per_page + 1])
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, name) for name, _ in _ordering(ordering)])
+    return KeysetPage(items, next_cursor, request, param)
@@ -0,0 +1,169 @@
+"""
+Giới hạn tốc độ và số lời gọi đồng thời tới LLM, dùng chung cho mọi worker.
+
+- Token bucket: mỗi lời gọi lấy 1 token; bucket nạp lại LLM_RATE_LIMIT_RPS token/giây, chứa
+  tối đa LLM_RATE_LIMIT_BURST token. Trạng thái bucket nằm trong database (DatabaseBackend)
+  nên nhiều process gunicorn cùng chia một hạn mức; LocalBackend giữ trong bộ nhớ, dùng khi dev
+  hoặc làm stub trong test (có thể truyền đồng hồ giả vào).
+- Ưu tiên: lời gọi 'batch' (chấm điểm hàng loạt) chỉ được lấy token khi bucket còn nhiều hơn
+  LLM_RATE_LIMIT_BATCH_RESERVE token, phần dự trữ đó dành cho lời gọi 'interactive' (chatbot,
+  nhận xét CV...). Ngoài ra mỗi mức ưu tiên có giới hạn số lời gọi đồng thời trong một process
+  (LLM_CONCURRENCY).
+- Lời gọi vượt hạn mức sẽ chờ, tối đa LLM_RATE_LIMIT_MAX_WAIT giây, rồi mới báo lỗi
+  RateLimitExceeded.
+
+Token bucket mặc định tắt (LLM_RATE_LIMIT_RPS=0): bật bằng hạn mức thực tế của tài khoản Groq (xem
+core/settings.py). Giới hạn số lời gọi đồng thời (LLM_CONCURRENCY) là lớp bảo vệ riêng và luôn được áp dụng.
+"""
+import time
+import asyncio
+import weakref
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from django.conf import settings
+from django.db.models import F
+from .models import RateLimitBucket
+from .db import database_sync_to_async
+
+BUCKET_NAME = 'llm'
+
+class RateLimitExceeded(Exception):
+    """Chờ quá LLM_RATE_LIMIT_MAX_WAIT giây mà vẫn chưa đến lượt gọi LLM."""
+
+def _config():
+    return {
+        'rate': getattr(settings, 'LLM_RATE_LIMIT_RPS', 0),
+        'burst': getattr(settings, 'LLM_RATE_LIMIT_BURST', 10),
+        'reserve': getattr(settings, 'LLM_RATE_LIMIT_BATCH_RESERVE', 3),
+        'max_wait': getattr(settings, 'LLM_RATE_LIMIT_MAX_WAIT', 20),
+        'concurrency': getattr(settings, 'LLM_CONCURRENCY', {'interactive': 8, 'batch': 2}),
+    }
+
+def _refill(tokens, updated_at, now, rate, capacity):
+    return min(capacity, tokens + max(0.0, now - updated_at) * rate)
+
+def _wait_time(tokens, rate, floor):
+    # Thời gian cần chờ để bucket có đủ (floor + 1) token.
+    return (floor + 1 - tokens) / rate
+
+class LocalBackend:
+    """Bucket trong bộ nhớ của một process."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, name, rate, capacity, floor=0.0):
+        """Lấy 1 token nếu sau đó bucket vẫn còn >= floor. Trả về 0 nếu được, ngược lại số giây nên chờ."""
+        with self._lock:
+            now = self.clock()
+            tokens, updated_at = self._buckets.get(name, (capacity, now))
+            tokens = _refill(tokens, updated_at, now, rate, capacity)
+            if tokens - 1 >= floor:
+                self._buckets[name] = (tokens - 1, now)
+                return 0.0
+            self._buckets[name] = (tokens, now)
+            return _wait_time(tokens, rate, floor)
+
+class DatabaseBackend:
+    """Bucket lưu trong bảng RateLimitBucket, cập nhật bằng optimistic locking trên cột version."""
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+
+    def take(self, name, rate, capacity, floor=0.0):
+        for _ in range(10):
+            now = self.clock()
+            bucket, _ = RateLimitBucket.objects.get_or_create(
+                name=name, defaults={'tokens': capacity, 'updated_at': now}
+            )
+            tokens = _refill(bucket.tokens, bucket.updated_at, now, rate, capacity)
+            granted = tokens - 1 >= floor
+            updated = RateLimitBucket.objects.filter(pk=bucket.pk, version=bucket.version).update(
+                tokens=tokens - 1 if granted else tokens, updated_at=now, version=F('version') + 1,
+            )
+            if updated:
+                return 0.0 if granted else _wait_time(tokens, rate, floor)
+        # Tranh chấp liên tục với worker khác: thử lại sau một chút.
+        return 0.05
+
+_backend = None
+_semaphores = {}
+_semaphores_lock = threading.Lock()
+_async_semaphores = weakref.WeakKeyDictionary()
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        name = getattr(settings, 'LLM_RATE_LIMIT_BACKEND', 'db')
+        _backend = LocalBackend() if name == 'local' else DatabaseBackend()
+    return _backend
+
+def set_backend(backend):
+    """Thay backend (ví dụ LocalBackend với đồng hồ giả khi test). Truyền None để dùng lại cấu hình."""
+    global _backend
+    _backend = backend
+
+def _floor(priority, config):
+    return config['reserve'] if priority == 'batch' else 0.0
+
+def _semaphore(priority, config):
+    with _semaphores_lock:
+        if priority not in _semaphores:
+            _semaphores[priority] = threading.BoundedSemaphore(config['concurrency'].get(priority, 1))
+        return _semaphores[priority]
+
+def _async_semaphore(priority, config):
+    loop = asyncio.get_running_loop()
+    semaphores = _async_semaphores.setdefault(loop, {})
+    if priority not in semaphores:
+        semaphores[priority] = asyncio.Semaphore(config['concurrency'].get(priority, 1))
+    return semaphores[priority]
+
+@contextmanager
+def limit(priority='interactive'):
+    """
+    Chờ đến lượt (giới hạn đồng thời + token bucket) trước khi gọi LLM. Giới hạn đồng thời luôn
+    áp dụng; token bucket chỉ khi LLM_RATE_LIMIT_RPS > 0.
+    """
+    config = _config()
+    deadline = time.monotonic() + config['max_wait']
+    semaphore = _semaphore(priority, config)
+    if not semaphore.acquire(timeout=config['max_wait']):
+        raise RateLimitExceeded(f"Quá nhiều lời gọi AI '{priority}' đang chạy.")
+    try:
+        while config['rate'] > 0:
+            wait = get_backend().take(BUCKET_NAME, config['rate'], config['burst'], _floor(priority, config))
+            if not wait:
+                break
+            if time.monotonic() + wait > deadline:
+                raise RateLimitExceeded(f"Vượt hạn mức gọi AI, cần chờ thêm {wait:.1f}s.")
+            time.sleep(wait)
+        yield
+    finally:
+        semaphore.release()
+
+@asynccontextmanager
+async def alimit(priority='interactive'):
+    """Phiên bản async của limit(): chờ bằng asyncio.sleep, không chặn event loop."""
+    config = _config()
+    deadline = time.monotonic() + config['max_wait']
+    semaphore = _async_semaphore(priority, config)
+    try:
+        await asyncio.wait_for(semaphore.acquire(), timeout=config['max_wait'])
+    except asyncio.TimeoutError:
+        raise RateLimitExceeded(f"Quá nhiều lời gọi AI '{priority}' đang chạy.")
+    try:
+        # alimit() chạy trên loop nền của llm.py, ngoài request: dọn kết nối database như một request.
+        take = database_sync_to_async(get_backend().take)
+        while config['rate'] > 0:
+            wait = await take(BUCKET_NAME, config['rate'], config['burst'], _floor(priority, config))
+            if not wait:
+                break
+            if time.monotonic() + wait > deadline:
+                raise RateLimitExceeded(f"Vượt hạn mức gọi AI, cần chờ thêm {wait:.1f}s.")
+            await asyncio.sleep(wait)
+        yield
+    finally:
+        semaphore.release()
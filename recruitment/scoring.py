@@ -0,0 +1,461 @@
+"""
+Chấm điểm mức độ phù hợp giữa CV và JD bằng AI.
+
+Điểm được gọi ở temperature=0 nên kết quả cho cùng một cặp CV/JD là ổn định; vì vậy mỗi
+điểm được lưu vào bảng MatchScore theo (mã băm CV, mã băm JD, mô hình, phiên bản prompt)
+và chỉ gọi LLM khi chưa có. Sửa JD (edit_job_view) làm đổi mã băm nên điểm cũ tự hết hiệu lực;
+đổi prompt thì tăng MATCH_PROMPT_VERSION.
+
+score_jobs_async() chấm một CV với nhiều JD cùng lúc trên AsyncGroq. Các JD được rút gọn và gom
+thành từng lô vừa ngân sách token (JOB_MATCH_BATCH_TOKENS) để CV chỉ phải gửi một lần cho mỗi lô;
+JD ở đây là tiêu đề + mô tả (job_text), cả khi gửi cho AI lẫn khi làm khóa cache. Job nào AI bỏ
+sót trong câu trả lời thì được chấm lại riêng lẻ. Số lời gọi đồng thời bị giới hạn bởi semaphore,
+mỗi lời gọi có timeout riêng, và kết quả được trả về ngay khi hết thời hạn chung kể cả khi còn job
+chưa chấm xong.
+
+Khi AI không khả dụng (circuit breaker mở, hoặc lời gọi thất bại), các chỗ chấm điểm dùng điểm tạm
+tính theo độ trùng từ khóa (search.keyword_overlap) thay vì 0. Điểm tạm tính được đánh dấu và không
+được lưu vào MatchScore, để lần sau AI chấm lại.
+"""
+import re
+import json
+import asyncio
+import hashlib
+from django.conf import settings
+from . import llm, circuit
+from .models import MatchScore
+from .utils import cv_text_for
+from .compaction import compact, count_tokens, fit_prompt, record
+from .search import keyword_overlap
+
+MATCH_PROMPT_VERSION = 'match-v1'
+BATCH_PROMPT_VERSION = 'match-batch-v1'
+REVIEW_PROMPT_VERSION = 'review-v1'
+# Tóm tắt tạm của hồ sơ đang chờ worker chấm điểm (ai_score=None).
+AI_PENDING_SUMMARY = "AI đang phân tích hồ sơ này..."
+
+def text_digest(text):
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+def _model_name():
+    return getattr(settings, 'LLM_MODEL', 'llama-3.1-8b-instant')
+
+def build_match_prompt(cv_text, jd_text):
+    cv_text, jd_text = fit_prompt('match', cv_text, jd_text)
+    return f"""
+        Bạn là một chuyên gia tuyển dụng, hãy tiến hành phân tích CV và JD dưới đây theo 4 bước sau:
+        1. Rút ra 3-5 yêu cầu quan trọng như kỹ năng, kinh nghiệm từ JD.
+        2. Tìm điểm chung cụ thể trong CV khớp với từng yêu cầu của JD.
+        3. Ghi nhận những điểm mạnh và điểm yếu.
+        4. Dựa trên phân tích ở bước 3, hãy cho một điểm số duy nhất từ 0 đến 100.
+
+        Hãy trả về kết quả dưới dạng một chuỗi json hợp lệ và không có gì khác.
+        JSON object phải có dạng: {{"score": <số_nguyên>}}
+
+
+        --- JD ---
+        {jd_text}
+
+        --- CV ---
+        {cv_text}
+        """
+
+def valid_score(value):
+    """Điểm số nguyên 0-100 từ giá trị AI trả về, hoặc None nếu sai kiểu hoặc nằm ngoài khoảng."""
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value.strip())
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 100 or value != int(value):
+        return None
+    return int(value)
+
+def parse_match_score(response_content):
+    """
+    Lấy điểm từ key "score" trong JSON AI trả về. Ném LLMError nếu không có JSON hoặc điểm không hợp lệ:
+    chỉ điểm đọc được từ JSON mới được lưu cache, nên không đoán điểm từ các con số trong văn bản.
+    """
+    json_match = re.search(r'\{.*\}', response_content, re.DOTALL)
+    try:
+        ai_result = json.loads(json_match.group(0)) if json_match else None
+    except ValueError:
+        ai_result = None
+    score = valid_score(ai_result.get("score")) if isinstance(ai_result, dict) else None
+    if score is None:
+        raise llm.LLMError(f"AI không trả về điểm hợp lệ: {response_content[:200]!r}")
+    return score
+
+def screen_application(application):
+    """
+    Sàng lọc một hồ sơ ứng tuyển: trả về (điểm, tóm tắt). Lỗi khi gọi AI, hoặc điểm AI trả về thiếu/sai
+    kiểu/ngoài 0-100 (LLMError), được ném ra ngoài để hàng đợi tác vụ chạy lại; hết số lần thử thì
+    hồ sơ nhận điểm tạm tính theo từ khóa như get_ai_match_score().
+    """
+    cv_text = cv_text_for(application)
+    if not cv_text:
+        return 0, "Không thể đọc được file CV."
+
+    cv_text, jd_text = fit_prompt('screening', cv_text, application.job.description)
+    prompt = f"""Phân tích JD và CV dưới đây.
+    JD: {jd_text}
+    CV: {cv_text}
+    Hãy trả về kết quả là MỘT CHUỖI JSON HỢP LỆ và KHÔNG có bất kỳ văn bản nào khác. JSON object phải có 2 key: "score" (số nguyên từ 0-100) và "summary" (tóm tắt 3 điểm mạnh nhất)."""
+
+    ai_result = llm.complete(
+        prompt,
+        schema={'type': 'object', 'required': ['score']},
+        system="Bạn là một AI chuyên sàng lọc CV, chỉ trả về kết quả dưới dạng JSON.",
+        priority='batch',
+        site='screening',
+    )
+    score = valid_score(ai_result['score'])
+    if score is None:
+        raise llm.LLMError(f"Điểm AI trả về không hợp lệ: {ai_result['score']!r}")
+    return score, ai_result.get('summary', 'Lỗi tóm tắt.')
+
+def provisional_screening(application):
+    """(điểm, tóm tắt) tạm tính theo từ khóa cho một hồ sơ, dùng khi AI không khả dụng."""
+    cv_text = cv_text_for(application)
+    if not cv_text:
+        return 0, "Không thể đọc được file CV."
+    score, matched, missing = keyword_overlap(cv_text, application.job.description)
+    return score, (
+        "Điểm tạm tính theo từ khóa, AI sẽ chấm lại khi hoạt động bình thường. "
+        f"Từ khóa khớp: {', '.join(matched[:8]) or 'không có'}. "
+        f"Còn thiếu: {', '.join(missing[:5]) or 'không có'}."
+    )
+
+def provisional_review(cv_text, jd_text):
+    """Kết quả nhận xét CV tạm tính theo từ khóa, cùng định dạng với review_cv()."""
+    score, matched, missing = keyword_overlap(cv_text, jd_text)
+    return {
+        'score': score,
+        'strengths': [f"CV có các từ khóa JD yêu cầu: {', '.join(matched[:8])}."] if matched else ["Chưa tìm thấy từ khóa trùng với JD."],
+        'suggestions': [f"Cân nhắc bổ sung nếu bạn có kinh nghiệm: {', '.join(missing[:8])}."] if missing else ["CV đã bao phủ các từ khóa chính của JD."],
+        'provisional': True,
+    }
+
+def job_text(job):
+    """Nội dung JD dùng khi chấm điểm một job: tiêu đề + mô tả. Cũng là khóa cache của điểm đó."""
+    return f"{job.title}\n{job.description}"
+
+def provisional_scores(cv_text, jobs):
+    """{job.id: điểm tạm tính theo từ khóa} cho các job, không gọi AI."""
+    return {job.id: keyword_overlap(cv_text, job_text(job))[0] for job in jobs}
+
+def _cached_scores_query(cv_text, jd_texts, prompt_versions):
+    # Sắp theo phiên bản prompt để khi dựng dict, điểm của prompt đứng trước (ưu tiên hơn) được giữ lại.
+    rows = MatchScore.objects.filter(
+        cv_digest=text_digest(cv_text),
+        jd_digest__in={text_digest(jd_text) for jd_text in jd_texts},
+        model=_model_name(),
+        prompt_version__in=prompt_versions,
+    ).values_list('jd_digest', 'score', 'prompt_version')
+    rank = {version: index for index, version in enumerate(prompt_versions)}
+    return rows, rank
+
+def _prefer(rows, rank):
+    best = {}
+    for jd_digest, score, version in sorted(rows, key=lambda row: rank[row[2]], reverse=True):
+        best[jd_digest] = score
+    return best
+
+def cached_match_scores(cv_text, jd_texts, prompt_versions=(MATCH_PROMPT_VERSION,)):
+    """
+    Tra cứu hàng loạt các điểm đã lưu cho một CV với nhiều JD bằng một truy vấn.
+    Trả về dict {jd_digest: score}.
+    """
+    rows, rank = _cached_scores_query(cv_text, jd_texts, prompt_versions)
+    return _prefer(list(rows), rank)
+
+def store_match_score(cv_text, jd_text, score, prompt_version=MATCH_PROMPT_VERSION):
+    MatchScore.objects.update_or_create(
+        cv_digest=text_digest(cv_text),
+        jd_digest=text_digest(jd_text),
+        model=_model_name(),
+        prompt_version=prompt_version,
+        defaults={'score': score},
+    )
+
+def get_ai_match_score(cv_text, jd_text):
+    cached = cached_match_scores(cv_text, [jd_text])
+    if cached:
+        return next(iter(cached.values()))
+
+    response_content = ""
+    try:
+        response_content = llm.complete(
+            build_match_prompt(cv_text, jd_text),
+            system="Bạn là một AI chỉ trả lời bằng định dạng JSON.",
+            model=_model_name(),
+            temperature=0.0,
+            site='match',
+        )
+        score = parse_match_score(response_content)
+    except Exception as e:
+        # Điểm tạm tính theo từ khóa không được lưu, lần sau sẽ hỏi lại AI.
+        print(f"Lỗi khi lấy điểm AI: {e}")
+        print(f"Nội dung AI trả về (gây lỗi): {response_content}")
+        return keyword_overlap(cv_text, jd_text)[0]
+
+    store_match_score(cv_text, jd_text, score)
+    return score
+
+def build_review_prompt(cv_text, jd_text):
+    cv_text, jd_text = fit_prompt('review', cv_text, jd_text)
+    return f"""
+        Bạn là một chuyên gia tư vấn sự nghiệp. Hãy so sánh CV với Mô tả công việc (JD) dưới đây.
+
+        Hãy trả về kết quả dưới dạng MỘT CHUỖI JSON HỢP LỆ và KHÔNG có gì khác.
+        JSON object có đúng 3 key:
+        1. "score": (số nguyên) mức độ phù hợp từ 0 đến 100.
+        2. "strengths": (list) 2-3 điểm mạnh cụ thể của CV so với JD.
+        3. "suggestions": (list) 2-3 gợi ý cải thiện mang tính hành động cao.
+
+        --- JD ---
+        {jd_text}
+
+        --- CV ---
+        {cv_text}
+        """
+
+def build_commentary_prompt(cv_text, jd_text, score):
+    cv_text, jd_text = fit_prompt('review', cv_text, jd_text)
+    return f"""
+        Một ứng viên có CV đạt {score} điểm (trên thang 100) khi so sánh với một Mô tả công việc.
+        Dựa trên CV và JD dưới đây, hãy đóng vai một chuyên gia tư vấn sự nghiệp và đưa ra phân tích.
+
+        --- CV ---
+        {cv_text}
+        --- JD ---
+        {jd_text}
+
+        Hãy trả về kết quả dưới dạng MỘT CHUỖI JSON HỢP LỆ và KHÔNG có gì khác.
+        JSON object chỉ cần có 2 key:
+        1. "strengths": (list) 2-3 điểm mạnh cụ thể của CV so với JD.
+        2. "suggestions": (list) 2-3 gợi ý cải thiện mang tính hành động cao.
+        """
+
+def review_cv(cv_text, jd_text):
+    """
+    Nhận xét CV so với một JD: trả về {"score", "strengths", "suggestions"} bằng đúng một lời gọi AI.
+    jd_text của một JobPosting là job_text(job), cùng khóa với điểm của trang "AI Tìm việc phù hợp".
+    Nếu cặp CV/JD đã có điểm trong cache (chấm riêng, theo lô hoặc từ lần nhận xét trước) thì chỉ xin
+    phần nhận xét; nếu chưa thì một lời gọi trả về cả điểm lẫn nhận xét, và điểm được lưu lại. Khi circuit breaker đang mở thì trả về kết quả
+    tạm tính theo từ khóa (có thêm key "provisional"). Ném LLMError khi AI lỗi.
+    """
+    cached = cached_match_scores(
+        cv_text, [jd_text], (MATCH_PROMPT_VERSION, REVIEW_PROMPT_VERSION, BATCH_PROMPT_VERSION)
+    )
+    try:
+        if cached:
+            score = next(iter(cached.values()))
+            analysis_data = llm.complete(
+                build_commentary_prompt(cv_text, jd_text, score), schema={'type': 'object'}, site='review_commentary'
+            )
+        else:
+            analysis_data = llm.complete(
+                build_review_prompt(cv_text, jd_text),
+                schema={'type': 'object', 'required': ['score']},
+                model=_model_name(),
+                temperature=0.0,
+                site='review',
+            )
+    except llm.CircuitOpenError:
+        return provisional_review(cv_text, jd_text)
+
+    if not cached:
+        score = valid_score(analysis_data['score'])
+        if score is None:
+            raise llm.LLMError(f"Điểm AI trả về không hợp lệ: {analysis_data['score']!r}")
+        store_match_score(cv_text, jd_text, score, REVIEW_PROMPT_VERSION)
+
+    return {
+        'score': score,
+        'strengths': analysis_data.get('strengths') or ["AI không tìm thấy điểm mạnh."],
+        'suggestions': analysis_data.get('suggestions') or ["AI không có gợi ý cải thiện."],
+    }
+
+async def acached_match_scores(cv_text, jd_texts, prompt_versions=(MATCH_PROMPT_VERSION,)):
+    rows, rank = _cached_scores_query(cv_text, jd_texts, prompt_versions)
+    return _prefer([row async for row in rows], rank)
+
+async def _astore(cv_text, jd_text, score, prompt_version):
+    await MatchScore.objects.aupdate_or_create(
+        cv_digest=text_digest(cv_text),
+        jd_digest=text_digest(jd_text),
+        model=_model_name(),
+        prompt_version=prompt_version,
+        defaults={'score': score},
+    )
+
+async def _ascore(cv_text, jd_text):
+    response_content = await llm.acomplete(
+        build_match_prompt(cv_text, jd_text),
+        system="Bạn là một AI chỉ trả lời bằng định dạng JSON.",
+        model=_model_name(),
+        temperature=0.0,
+        priority='batch',
+        site='match',
+    )
+    score = parse_match_score(response_content)
+    await _astore(cv_text, jd_text, score, MATCH_PROMPT_VERSION)
+    return score
+
+def plan_batches(cv_text, jobs, budget=None, jd_tokens=None):
+    """
+    Chia danh sách job thành các lô sao cho (CV + các JD rút gọn + phần hướng dẫn) không vượt
+    quá ngân sách token. Trả về (cv_text đã rút gọn, danh sách các lô [(job, jd_rút_gọn), ...]).
+    """
+    budget = budget or getattr(settings, 'JOB_MATCH_BATCH_TOKENS', 6000)
+    jd_tokens = jd_tokens or getattr(settings, 'JOB_MATCH_JD_TOKENS', 250)
+    overhead = count_tokens(build_batch_prompt('', []))
+
+    cv_compact = compact(cv_text, budget // 2)
+    available = budget - overhead - count_tokens(cv_compact)
+
+    batches, current, used = [], [], 0
+    for job in jobs:
+        jd_text = job_text(job)
+        jd_compact = ' '.join(compact(jd_text, jd_tokens).split())
+        # Mỗi job còn tốn thêm khoảng 15 token cho phần trả lời {"job_id": ..., "score": ...}.
+        cost = count_tokens(jd_compact) + 15
+        if current and used + cost > available:
+            batches.append(current)
+            current, used = [], 0
+        current.append((job, jd_compact))
+        used += cost
+    if current:
+        batches.append(current)
+    return cv_compact, batches
+
+def build_batch_prompt(cv_text, items):
+    jobs_block = "\n".join(f"[job_id={job.id}] {jd_compact}" for job, jd_compact in items)
+    return f"""
+        Bạn là một chuyên gia tuyển dụng. Hãy chấm mức độ phù hợp của CV dưới đây với TỪNG công việc
+        trong danh sách, mỗi công việc một điểm số nguyên từ 0 đến 100 dựa trên kỹ năng và kinh nghiệm khớp với yêu cầu.
+
+        Hãy trả về MỘT mảng JSON hợp lệ và không có gì khác, có đủ mọi job_id trong danh sách.
+        Mỗi phần tử có dạng: {{"job_id": <số_nguyên>, "score": <số_nguyên>}}
+
+        --- CV ---
+        {cv_text}
+
+        --- DANH SÁCH CÔNG VIỆC ---
+        {jobs_block}
+        """
+
+def parse_batch_scores(results, job_ids):
+    """
+    Lấy điểm cho các job_id hợp lệ từ mảng JSON của AI; job_id lạ hoặc điểm sai kiểu/ngoài 0-100 bị bỏ qua
+    (job đó sẽ được chấm riêng).
+    """
+    scores = {}
+    for item in results:
+        try:
+            job_id, score = int(item['job_id']), valid_score(item['score'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if job_id in job_ids and score is not None:
+            scores[job_id] = score
+    return scores
+
+async def _ascore_batch(cv_text, cv_compact, items):
+    """
+    Chấm một lô job bằng một lời gọi; job nào thiếu trong kết quả thì chấm riêng lẻ.
+    Trả về (scores, provisional): provisional là tập job.id chỉ có điểm tạm tính vì AI lỗi.
+    """
+    jobs = {job.id: job for job, _ in items}
+    scores = {}
+    provisional = set()
+    # Số token rút gọn được tính cho từng lô (mỗi lô là một lời gọi, gửi lại CV).
+    record(
+        count_tokens(cv_text) + sum(count_tokens(job_text(job)) for job in jobs.values()),
+        count_tokens(cv_compact) + sum(count_tokens(jd_compact) for _, jd_compact in items),
+    )
+    try:
+        results = await llm.acomplete(
+            build_batch_prompt(cv_compact, items),
+            schema={'type': 'array'},
+            system="Bạn là một AI chỉ trả lời bằng định dạng JSON.",
+            model=_model_name(),
+            temperature=0.0,
+            priority='batch',
+            site='match_batch',
+        )
+        scores = parse_batch_scores(results, set(jobs))
+    except llm.LLMError as e:
+        print(f"Lỗi khi chấm theo lô ({len(items)} job), chuyển sang chấm từng job: {e}")
+
+    for job_id, score in scores.items():
+        await _astore(cv_text, job_text(jobs[job_id]), score, BATCH_PROMPT_VERSION)
+
+    missing = [job for job_id, job in jobs.items() if job_id not in scores]
+    if missing and circuit.is_open():
+        # Không chấm lẻ từng job khi biết chắc AI đang bị ngắt.
+        scores.update(provisional_scores(cv_text, missing))
+        return scores, {job.id for job in missing}
+    if missing:
+        singles = await asyncio.gather(*(_ascore(cv_text, job_text(job)) for job in missing), return_exceptions=True)
+        for job, result in zip(missing, singles):
+            if isinstance(result, Exception):
+                print(f"Lỗi khi lấy điểm AI cho job {job.id}, dùng điểm tạm tính: {result}")
+                result = provisional_scores(cv_text, [job])[job.id]
+                provisional.add(job.id)
+            scores[job.id] = result
+    return scores, provisional
+
+async def score_jobs_async(cv_text, jobs, concurrency=None, call_timeout=None, deadline=None):
+    """
+    Chấm điểm một CV với danh sách JobPosting theo lô, nhiều lô chạy đồng thời.
+    Trả về (scores, pending, provisional): scores là dict {job.id: score}; pending là danh sách job.id
+    chưa có kết quả vì hết thời hạn chung hoặc lời gọi bị timeout, để trang có thể tải tiếp sau;
+    provisional là tập job.id chỉ có điểm tạm tính theo từ khóa vì AI lỗi hoặc circuit breaker đang mở.
+    """
+    concurrency = concurrency or getattr(settings, 'JOB_MATCH_CONCURRENCY', 8)
+    call_timeout = call_timeout or getattr(settings, 'JOB_MATCH_CALL_TIMEOUT', 20)
+    deadline = deadline or getattr(settings, 'JOB_MATCH_DEADLINE', 8)
+
+    cached = await acached_match_scores(
+        cv_text, [job_text(job) for job in jobs], (MATCH_PROMPT_VERSION, BATCH_PROMPT_VERSION)
+    )
+    scores = {}
+    misses = []
+    for job in jobs:
+        jd_digest = text_digest(job_text(job))
+        if jd_digest in cached:
+            scores[job.id] = cached[jd_digest]
+        else:
+            misses.append(job)
+    if not misses:
+        return scores, [], set()
+    if circuit.is_open():
+        scores.update(provisional_scores(cv_text, misses))
+        return scores, [], {job.id for job in misses}
+
+    cv_compact, batches = plan_batches(cv_text, misses)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def score_batch(items):
+        async with semaphore:
+            return await asyncio.wait_for(_ascore_batch(cv_text, cv_compact, items), timeout=call_timeout)
+
+    tasks = {asyncio.create_task(score_batch(items)): items for items in batches}
+    done, not_done = await asyncio.wait(tasks, timeout=deadline)
+    for task in not_done:
+        task.cancel()
+    await asyncio.gather(*not_done, return_exceptions=True)
+
+    pending = [job.id for task in not_done for job, _ in tasks[task]]
+    provisional = set()
+    for task in done:
+        items = tasks[task]
+        try:
+            batch_scores, batch_provisional = task.result()
+            scores.update(batch_scores)
+            provisional |= batch_provisional
+        except asyncio.TimeoutError:
+            pending += [job.id for job, _ in items]
+        except Exception as e:
+            print(f"Lỗi khi lấy điểm AI cho lô {[job.id for job, _ in items]}, dùng điểm tạm tính: {e}")
+            scores.update(provisional_scores(cv_text, [job for job, _ in items]))
+            provisional |= {job.id for job, _ in items}
+    return scores, pending, provisional
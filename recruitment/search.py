@@ -0,0 +1,224 @@
+"""
+Tìm kiếm từ vựng (lexical) chạy ngay trong process, không cần gọi AI.
+
+Văn bản được bỏ dấu tiếng Việt (fold_diacritics) rồi tách từ, sau đó xếp hạng bằng BM25.
+Trang "AI Tìm việc phù hợp" dùng rank_jobs() để chỉ gửi top-K job gần với CV nhất sang LLM
+thay vì chấm toàn bộ job đang mở. keyword_overlap() là điểm dự phòng khi AI không khả dụng.
+Tìm kiếm ứng viên dùng hybrid_rank() (BM25 + vector n-gram băm bằng NumPy) để chọn vài hồ sơ
+gần nhất trước khi nhờ AI xếp hạng lại.
+"""
+import re
+import math
+import zlib
+import threading
+import unicodedata
+from collections import Counter, OrderedDict, defaultdict
+import numpy as np
+from django.conf import settings
+
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]')
+
+# Các từ quá phổ biến trong CV/JD tiếng Việt, không giúp phân biệt job.
+STOPWORDS = {
+    'va', 'cac', 'cua', 'co', 'cho', 'voi', 'la', 'trong', 'duoc', 'mot', 'nhung', 'tai', 've',
+    'de', 'khi', 'tu', 'den', 'theo', 'nhu', 'hoac', 'cung', 'da', 'se', 'dang', 'nay', 'do',
+    'the', 'and', 'or', 'of', 'to', 'in', 'for', 'with', 'on', 'at', 'an', 'is', 'are', 'be',
+}
+
+def fold_diacritics(text):
+    """Bỏ dấu tiếng Việt và chuyển về chữ thường: "Kiểm thử Phần mềm" -> "kiem thu phan mem"."""
+    text = (text or '').replace('đ', 'd').replace('Đ', 'D')
+    decomposed = unicodedata.normalize('NFD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+def fold_key(text):
+    """Dạng chuẩn hóa dùng cho các cột *_folded: bỏ dấu, chữ thường, gộp khoảng trắng: "  Hà  Nội" -> "ha noi"."""
+    return ' '.join(fold_diacritics(text).split())
+
+# Các tỉnh/thành trong bộ lọc địa điểm của bảng tin việc làm.
+VIETNAM_PROVINCES = [
+    "Hà Nội",
+    "Hồ Chí Minh",
+    "Đà Nẵng",
+    "Hải Phòng",
+    "Cần Thơ",
+    "Bắc Ninh",
+    "Bình Dương",
+    "Đồng Nai",
+    "Khánh Hòa",
+    "Quảng Ninh",
+]
+
+def province_key(location):
+    """
+    fold_key của tỉnh/thành (trong VIETNAM_PROVINCES) xuất hiện sớm nhất trong địa điểm, hoặc '' nếu không có:
+    "Tầng 5, 12 Duy Tân, TP. Hà Nội" -> "ha noi". Lưu vào JobPosting.province_folded để lọc bằng so sánh bằng.
+    """
+    folded = fold_key(location)
+    found = [(folded.find(key), key) for key in map(fold_key, VIETNAM_PROVINCES) if key in folded]
+    return min(found)[1] if found else ''
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(fold_diacritics(text)) if token not in STOPWORDS]
+
+class BM25Index:
+    """Chỉ mục BM25 đơn giản trên bộ nhớ: documents là danh sách (key, text)."""
+
+    def __init__(self, documents, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.keys = []
+        self.lengths = []
+        self.postings = defaultdict(list)
+        for key, text in documents:
+            index = len(self.keys)
+            tokens = tokenize(text)
+            self.keys.append(key)
+            self.lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                self.postings[term].append((index, tf))
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0
+
+    def idf(self, term):
+        n = len(self.keys)
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def scores(self, query):
+        """Trả về dict {key: điểm BM25} cho các document có ít nhất một từ trùng với query."""
+        totals = defaultdict(float)
+        avg_length = self.avg_length or 1
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for index, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[index] / avg_length)
+                totals[index] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return {self.keys[index]: score for index, score in totals.items()}
+
+    def top(self, query, k, min_score=0.0):
+        ranked = sorted(self.scores(query).items(), key=lambda item: item[1], reverse=True)
+        return [(key, score) for key, score in ranked if score >= min_score][:k]
+
+_job_index = None
+_job_index_lock = threading.Lock()
+
+def job_index(jobs):
+    """
+    Chỉ mục BM25 trên tiêu đề + mô tả của các job. Chỉ mục được giữ lại giữa các request
+    và chỉ dựng lại khi danh sách job hoặc nội dung của chúng thay đổi.
+    """
+    global _job_index
+    documents = [(job.id, f"{job.title}\n{job.description}") for job in jobs]
+    signature = hash(tuple(documents))
+    with _job_index_lock:
+        if _job_index is None or _job_index[0] != signature:
+            _job_index = (signature, BM25Index(documents))
+        return _job_index[1]
+
+def rank_jobs(cv_text, jobs, top_k=None, min_score=None):
+    """
+    Lọc sơ bộ các job theo độ trùng từ vựng với CV. Trả về tối đa top_k job có điểm BM25
+    >= min_score, xếp theo điểm giảm dần.
+    """
+    top_k = top_k or getattr(settings, 'JOB_MATCH_TOP_K', 20)
+    min_score = getattr(settings, 'JOB_MATCH_MIN_LEXICAL_SCORE', 1.0) if min_score is None else min_score
+    jobs_by_id = {job.id: job for job in jobs}
+    ranked = job_index(jobs).top(cv_text, top_k, min_score)
+    return [jobs_by_id[job_id] for job_id, _ in ranked]
+
+def keyword_overlap(cv_text, jd_text, top_n=30):
+    """
+    Chấm nhanh mức độ phù hợp CV/JD không cần AI: lấy top_n từ khóa xuất hiện nhiều nhất trong JD
+    và tính tỉ lệ (có trọng số theo tần suất) các từ khóa đó có trong CV.
+    Trả về (điểm 0-100, [từ khóa trùng], [từ khóa còn thiếu]), từ khóa xếp theo tần suất trong JD.
+    """
+    counts = Counter(token for token in tokenize(jd_text) if len(token) > 1 and not token.isdigit())
+    keywords = counts.most_common(top_n)
+    if not keywords:
+        return 0, [], []
+    cv_terms = set(tokenize(cv_text))
+    matched = [term for term, _ in keywords if term in cv_terms]
+    missing = [term for term, _ in keywords if term not in cv_terms]
+    covered = sum(count for term, count in keywords if term in cv_terms)
+    return round(100 * covered / sum(count for _, count in keywords)), matched, missing
+
+# --- Truy hồi hồ sơ cho tìm kiếm ứng viên ---------------------------------------
+# Đặc trưng của mỗi CV (đếm từ cho BM25 và vector n-gram băm) được tính một lần và giữ trong bộ nhớ
+# theo mã băm nội dung CV, nên không bao giờ bị cũ và mỗi lượt tìm chỉ tốn vài mili giây.
+
+VECTOR_DIM = 2048
+FEATURE_CACHE_SIZE = 5000
+
+_features = OrderedDict()
+_features_lock = threading.Lock()
+
+def _hash_bucket(feature):
+    # crc32 ổn định giữa các process (khác với hash() của Python).
+    return zlib.crc32(feature.encode('utf-8')) % VECTOR_DIM
+
+def ngram_vector(tokens):
+    """Vector từ đơn + cặp từ liền nhau (hashing trick), trọng số log(1 + tf), chuẩn hóa L2."""
+    counts = Counter(tokens)
+    counts.update(f"{a}_{b}" for a, b in zip(tokens, tokens[1:]))
+    vector = np.zeros(VECTOR_DIM, dtype=np.float32)
+    for feature, count in counts.items():
+        vector[_hash_bucket(feature)] += 1.0 + math.log(count)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def has_features(digest):
+    with _features_lock:
+        return digest in _features
+
+def document_features(digest, text=None):
+    """(Counter từ, độ dài, vector) của một văn bản theo mã băm; None nếu chưa có và không truyền text."""
+    with _features_lock:
+        if digest in _features:
+            _features.move_to_end(digest)
+            return _features[digest]
+    if text is None:
+        return None
+    tokens = tokenize(text)
+    features = (Counter(tokens), len(tokens), ngram_vector(tokens))
+    with _features_lock:
+        _features[digest] = features
+        while len(_features) > FEATURE_CACHE_SIZE:
+            _features.popitem(last=False)
+    return features
+
+def hybrid_rank(query, documents, top_n, bm25_weight=0.6, k1=1.5, b=0.75, min_similarity=0.05):
+    """
+    Xếp hạng documents [(key, digest, text hoặc None nếu đã có đặc trưng)] theo query, kết hợp
+    BM25 (chuẩn hóa về 0-1 theo điểm cao nhất) và cosine giữa các vector n-gram.
+    Trả về tối đa top_n (key, điểm) giảm dần; bỏ các document không trùng từ nào và quá khác query.
+    """
+    rows = []
+    for key, digest, text in documents:
+        features = document_features(digest, text)
+        if features is not None:
+            rows.append((key, features))
+    query_tokens = tokenize(query)
+    if not rows or not query_tokens:
+        return []
+
+    n = len(rows)
+    avg_length = sum(length for _, (_, length, _) in rows) / n or 1
+    bm25 = np.zeros(n, dtype=np.float32)
+    for term in set(query_tokens):
+        df = sum(1 for _, (counts, _, _) in rows if term in counts)
+        if not df:
+            continue
+        idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        for index, (_, (counts, length, _)) in enumerate(rows):
+            tf = counts.get(term)
+            if tf:
+                bm25[index] += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / avg_length))
+
+    similarity = np.vstack([vector for _, (_, _, vector) in rows]) @ ngram_vector(query_tokens)
+    combined = bm25_weight * (bm25 / bm25.max() if bm25.max() > 0 else bm25) + (1 - bm25_weight) * similarity
+    keep = (bm25 > 0) | (similarity >= min_similarity)
+    order = [index for index in np.argsort(-combined, kind='stable') if keep[index]][:top_n]
+    return [(rows[index][0], float(combined[index])) for index in order]
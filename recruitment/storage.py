@@ -0,0 +1,113 @@
+import os
+import re
+import hashlib
+from django.core.files import File
+from django.core.files.utils import validate_file_name
+from django.core.files.storage import Storage, default_storage
+
+HASHED_STEM_RE = re.compile(r'[0-9a-f]{64}')
+
+class ContentAddressedStorage(Storage):
+    """
+    Lớp lưu trữ cho file CV, bọc quanh default_storage (local hoặc Cloudinary).
+    Tên file được đặt theo SHA-256 của nội dung (cvs/<sha256>.pdf), nên một CV được
+    nộp nhiều lần chỉ được lưu (và upload lên Cloudinary) đúng một lần; các bản ghi
+    Application/Profile cùng trỏ đến một file.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        validate_file_name(name, allow_relative_path=True)
+        digest = getattr(content, 'sha256', None)
+        if not digest:
+            hasher = hashlib.sha256()
+            for chunk in content.chunks():
+                hasher.update(chunk)
+            digest = hasher.hexdigest()
+
+        name = self.hashed_name(name, digest)
+        validate_file_name(name, allow_relative_path=True)
+        if default_storage.exists(name):
+            return name
+        try:
+            saved = default_storage.save(name, content, max_length=max_length)
+        except FileExistsError:
+            # Một upload cùng nội dung vừa ghi file này giữa lúc kiểm tra và lúc lưu.
+            return name
+        if saved != name and default_storage.exists(name):
+            # Cũng là upload đồng thời: backend đã đặt tên khác (thêm hậu tố) cho bản sao, bỏ bản sao đi.
+            try:
+                default_storage.delete(saved)
+            except Exception as e:
+                print(f"Lỗi khi xóa bản sao CV '{saved}': {e}")
+            return name
+        return saved
+
+    @staticmethod
+    def hashed_name(name, digest):
+        """Tên theo nội dung: giữ thư mục và phần mở rộng (chữ thường), thay tên file bằng mã băm."""
+        directory, filename = os.path.split(name)
+        return os.path.join(directory, digest + os.path.splitext(filename)[1].lower())
+
+    @staticmethod
+    def is_hashed(name):
+        """True nếu name đã là tên theo nội dung (<sha256>.<đuôi>)."""
+        stem = os.path.splitext(os.path.basename(name))[0]
+        return bool(HASHED_STEM_RE.fullmatch(stem))
+
+    def _open(self, name, mode='rb'):
+        return default_storage.open(name, mode)
+
+    def delete(self, name):
+        return default_storage.delete(name)
+
+    def exists(self, name):
+        return default_storage.exists(name)
+
+    def listdir(self, path):
+        return default_storage.listdir(path)
+
+    def size(self, name):
+        return default_storage.size(name)
+
+    def url(self, name):
+        return default_storage.url(name)
+
+    def path(self, name):
+        return default_storage.path(name)
+
+    def get_accessed_time(self, name):
+        return default_storage.get_accessed_time(name)
+
+    def get_created_time(self, name):
+        return default_storage.get_created_time(name)
+
+    def get_modified_time(self, name):
+        return default_storage.get_modified_time(name)
+
+cv_storage = ContentAddressedStorage()
+
+def get_cv_storage():
+    return cv_storage
+
+def release_cv_files(names):
+    """
+    Xóa các file CV không còn Application/Profile nào tham chiếu tới.
+    Số tham chiếu được đếm trực tiếp từ database nên không bao giờ bị lệch.
+    """
+    from .models import Application, Profile
+
+    names = {name for name in names if name}
+    if not names:
+        return
+
+    referenced = set(Application.objects.filter(cv__in=names).values_list('cv', flat=True))
+    referenced |= set(Profile.objects.filter(cv_file__in=names).values_list('cv_file', flat=True))
+    for name in names - referenced:
+        try:
+            cv_storage.delete(name)
+        except Exception as e:
+            print(f"Lỗi khi xóa file CV '{name}': {e}")
@@ -0,0 +1,168 @@
+"""
+Hàng đợi tác vụ nền lưu trong database, không cần broker (Redis/RabbitMQ).
+
+- enqueue() thêm một dòng Task; worker (manage.py run_workers) lấy tác vụ bằng claim().
+  Worker là process riêng, phải được chạy cùng web service khi deploy (xem build.sh).
+- Khi được lấy, tác vụ bị "ẩn" trong TASK_VISIBILITY_TIMEOUT giây (available_at bị đẩy lên).
+  Nếu worker chết giữa chừng, hết thời gian đó tác vụ tự xuất hiện lại cho worker khác.
+- Lỗi thì chạy lại với exponential backoff; quá max_attempts thì chuyển sang trạng thái 'dead'
+  (dead-letter) và được giữ lại để xem trong trang admin.
+
+Việc lấy tác vụ dùng UPDATE có điều kiện (optimistic locking) nên chạy đúng trên cả SQLite
+lẫn PostgreSQL, với nhiều worker cùng lúc.
+"""
+import os
+import socket
+import traceback
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from . import llm, circuit
+from .models import Task, Application
+from .scoring import screen_application, provisional_screening
+
+_handlers = {}
+
+def task(name, on_dead=None):
+    """Đăng ký một hàm xử lý tác vụ. on_dead(**payload) được gọi khi tác vụ bị chuyển vào dead-letter."""
+    def decorator(func):
+        _handlers[name] = (func, on_dead)
+        return func
+    return decorator
+
+def _config():
+    return {
+        'visibility_timeout': getattr(settings, 'TASK_VISIBILITY_TIMEOUT', 300),
+        'max_attempts': getattr(settings, 'TASK_MAX_ATTEMPTS', 5),
+        'backoff': getattr(settings, 'TASK_RETRY_BACKOFF', 10),
+    }
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def enqueue(name, delay=0, **payload):
+    return Task.objects.create(
+        name=name,
+        payload=payload,
+        max_attempts=_config()['max_attempts'],
+        available_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+def claim(worker_id, batch=10):
+    """
+    Lấy một tác vụ đến hạn (đang chờ, hoặc đang chạy nhưng đã quá thời gian ẩn).
+    Trả về Task đã được khóa cho worker_id, hoặc None nếu không còn tác vụ nào.
+    """
+    now = timezone.now()
+    visible_until = now + timedelta(seconds=_config()['visibility_timeout'])
+    candidates = Task.objects.filter(
+        status__in=['queued', 'running'], available_at__lte=now
+    ).order_by('available_at', 'id').values_list('id', 'status', 'available_at', 'attempts')[:batch]
+
+    for task_id, status, available_at, attempts in candidates:
+        claimed = Task.objects.filter(pk=task_id, status=status, available_at=available_at, attempts=attempts).update(
+            status='running', locked_by=worker_id, attempts=attempts + 1, available_at=visible_until, updated_at=now,
+        )
+        if claimed:
+            return Task.objects.get(pk=task_id)
+    return None
+
+def _owned(task_obj):
+    # Chỉ worker đang giữ đúng lượt chạy này mới được cập nhật kết quả.
+    return Task.objects.filter(pk=task_obj.pk, status='running', locked_by=task_obj.locked_by, attempts=task_obj.attempts)
+
+def _dead_letter(task_obj, error):
+    updated = _owned(task_obj).update(status='dead', last_error=error, updated_at=timezone.now())
+    _, on_dead = _handlers.get(task_obj.name, (None, None))
+    if updated and on_dead:
+        try:
+            on_dead(**task_obj.payload)
+        except Exception as e:
+            print(f"Lỗi khi xử lý dead-letter cho tác vụ {task_obj}: {e}")
+
+def run_task(task_obj):
+    """Chạy một tác vụ đã được claim(). Trả về True nếu thành công."""
+    handler, _ = _handlers.get(task_obj.name, (None, None))
+    if handler is None:
+        _dead_letter(task_obj, f"Không có hàm xử lý cho tác vụ '{task_obj.name}'.")
+        return False
+    if task_obj.attempts > task_obj.max_attempts:
+        _dead_letter(task_obj, task_obj.last_error or "Worker không hoàn thành trong thời gian cho phép.")
+        return False
+
+    try:
+        handler(**task_obj.payload)
+    except Exception as e:
+        error = ''.join(traceback.format_exception_only(type(e), e)).strip()
+        print(f"Lỗi khi chạy tác vụ {task_obj} (lần {task_obj.attempts}/{task_obj.max_attempts}): {error}")
+        if task_obj.attempts >= task_obj.max_attempts:
+            _dead_letter(task_obj, error)
+        else:
+            delay = _config()['backoff'] * (2 ** (task_obj.attempts - 1))
+            _owned(task_obj).update(
+                status='queued', locked_by='', last_error=error,
+                available_at=timezone.now() + timedelta(seconds=delay), updated_at=timezone.now(),
+            )
+        return False
+
+    _owned(task_obj).delete()
+    return True
+
+def requeue(queryset):
+    """Đưa các tác vụ trong dead-letter trở lại hàng đợi (dùng trong trang admin)."""
+    return queryset.filter(status='dead').update(
+        status='queued', attempts=0, locked_by='', available_at=timezone.now(), updated_at=timezone.now(),
+    )
+
+# --- Các tác vụ của ứng dụng -------------------------------------------------
+
+def _rescore_delay():
+    return getattr(settings, 'LLM_CIRCUIT_COOLDOWN', 30)
+
+def _score_provisionally(application_id):
+    """Chấm tạm theo từ khóa và hẹn AI chấm lại khi circuit breaker đóng."""
+    application = Application.objects.select_related('job').filter(pk=application_id).first()
+    if application is None:
+        return
+    ai_score, ai_summary = provisional_screening(application)
+    Application.objects.filter(pk=application_id).update(
+        ai_score=ai_score, ai_summary=ai_summary, ai_score_provisional=True
+    )
+    enqueue('rescore_application', delay=_rescore_delay(), application_id=application_id)
+
+def _mark_unscored(application_id):
+    # Hết số lần thử: dùng điểm tạm tính thay vì 0 để hồ sơ không bị xếp cuối danh sách.
+    if Application.objects.filter(pk=application_id, ai_score__isnull=True).exists():
+        _score_provisionally(application_id)
+
+@task('score_application', on_dead=_mark_unscored)
+def score_application(application_id):
+    application = Application.objects.select_related('job').filter(pk=application_id).first()
+    if application is None:
+        return
+    try:
+        ai_score, ai_summary = screen_application(application)
+    except llm.CircuitOpenError:
+        _score_provisionally(application_id)
+        return
+    Application.objects.filter(pk=application_id).update(
+        ai_score=ai_score, ai_summary=ai_summary, ai_score_provisional=False
+    )
+
+@task('rescore_application')
+def rescore_application(application_id):
+    """Cho AI chấm lại hồ sơ đang có điểm tạm tính; nếu AI vẫn bị ngắt thì hẹn lần sau."""
+    application = Application.objects.select_related('job').filter(pk=application_id, ai_score_provisional=True).first()
+    if application is None:
+        return
+    if circuit.is_open():
+        enqueue('rescore_application', delay=_rescore_delay(), application_id=application_id)
+        return
+    try:
+        ai_score, ai_summary = screen_application(application)
+    except llm.CircuitOpenError:
+        enqueue('rescore_application', delay=_rescore_delay(), application_id=application_id)
+        return
+    Application.objects.filter(pk=application_id, ai_score_provisional=True).update(
+        ai_score=ai_score, ai_summary=ai_summary, ai_score_provisional=False
+    )
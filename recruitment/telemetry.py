@@ -0,0 +1,132 @@
+"""
+Ghi nhận từng lời gọi LLM để biết view nào tốn quota nhất và độ trễ p95 đến từ đâu.
+
+Mỗi lời gọi qua llm.complete()/acomplete()/astream() tạo một dòng LLMCall: chỗ gọi (site), model,
+số token prompt/trả lời (lấy từ usage của API, nếu không có thì ước lượng), số token CV/JD trước và sau
+khi rút gọn (compaction.py), độ trễ tính cả thời gian chờ hạn mức và retry, số lần thử lại và kết quả (thành công, lỗi API, sai định dạng JSON,
+vượt hạn mức, bị circuit breaker chặn). Dữ liệu cũ hơn LLM_TELEMETRY_RETENTION_DAYS ngày được prune()
+xóa theo lô; worker (manage.py run_workers) gọi prune() mỗi giờ, không chạy trong request.
+
+summarize() tổng hợp theo chỗ gọi (kèm histogram độ trễ và chi phí ước tính theo LLM_PRICES);
+kết quả được trả qua /api/llm-metrics/ và lệnh `manage.py llm_stats`.
+"""
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+from .models import LLMCall
+from .compaction import count_tokens
+from .db import database_sync_to_async
+
+# Cận trên (ms) của các ô histogram độ trễ; ô cuối chứa mọi lời gọi chậm hơn.
+LATENCY_BUCKETS_MS = (250, 500, 1000, 2000, 5000, 10000, 30000)
+
+def _tokens(usage, name, text):
+    value = getattr(usage, name, None) if usage is not None else None
+    if isinstance(value, int):
+        return value
+    return count_tokens(text) if text else 0
+
+def prune(batch_size=1000):
+    """
+    Xóa các lời gọi cũ hơn LLM_TELEMETRY_RETENTION_DAYS ngày, mỗi lần DELETE tối đa batch_size dòng
+    để không giữ khóa bảng lâu. Trả về số dòng đã xóa.
+    """
+    days = getattr(settings, 'LLM_TELEMETRY_RETENTION_DAYS', 14)
+    old = LLMCall.objects.filter(created_at__lt=timezone.now() - timedelta(days=days))
+    deleted = 0
+    while True:
+        ids = list(old.order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += LLMCall.objects.filter(id__in=ids).delete()[0]
+
+def record(call_site, model, status, started, retries=0, priority='interactive', usage=None, prompt='', completion='',
+           compacted=(0, 0)):
+    """
+    Lưu một lời gọi. started là time.perf_counter() lúc bắt đầu; compacted là (token trước, token sau) khi
+    rút gọn CV/JD cho prompt này (compaction.py). Không bao giờ làm hỏng request.
+    """
+    if not getattr(settings, 'LLM_TELEMETRY', True):
+        return
+    try:
+        LLMCall.objects.create(
+            call_site=call_site,
+            model=model,
+            priority=priority,
+            status=status,
+            prompt_tokens=_tokens(usage, 'prompt_tokens', prompt),
+            completion_tokens=_tokens(usage, 'completion_tokens', completion),
+            latency_ms=int((time.perf_counter() - started) * 1000),
+            retries=retries,
+            tokens_before=compacted[0],
+            tokens_after=compacted[1],
+        )
+    except DatabaseError as e:
+        print(f"Không ghi được thống kê lời gọi AI: {e}")
+
+async def arecord(*args, **kwargs):
+    # Chạy trên loop nền của llm.py, ngoài request: dọn kết nối database như một request.
+    await database_sync_to_async(record)(*args, **kwargs)
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+def _histogram(latencies):
+    counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    for latency in latencies:
+        index = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if latency <= bound), len(LATENCY_BUCKETS_MS))
+        counts[index] += 1
+    labels = [f"<={bound}" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+    return dict(zip(labels, counts))
+
+def _cost(model, prompt_tokens, completion_tokens):
+    # Giá USD cho 1 triệu token (prompt, trả lời).
+    price_in, price_out = getattr(settings, 'LLM_PRICES', {}).get(model, (0, 0))
+    return (prompt_tokens * price_in + completion_tokens * price_out) / 1_000_000
+
+def summarize(hours=24):
+    """Tổng hợp {call_site: {...}} cho các lời gọi trong `hours` giờ gần nhất, sắp theo tổng token giảm dần."""
+    rows = LLMCall.objects.filter(created_at__gte=timezone.now() - timedelta(hours=hours)).values_list(
+        'call_site', 'model', 'status', 'prompt_tokens', 'completion_tokens', 'latency_ms', 'retries',
+        'tokens_before', 'tokens_after',
+    )
+    sites = {}
+    for (call_site, model, status, prompt_tokens, completion_tokens, latency_ms, retries,
+         tokens_before, tokens_after) in rows.iterator():
+        site = sites.setdefault(call_site, {
+            'calls': 0, 'errors': 0, 'parse_failures': 0, 'rate_limited': 0, 'circuit_open': 0, 'retries': 0,
+            'prompt_tokens': 0, 'completion_tokens': 0, 'cost_usd': 0.0, 'models': set(), 'latencies': [],
+            'compaction': {'tokens_before': 0, 'tokens_after': 0},
+        })
+        site['calls'] += 1
+        site['errors'] += status == 'error'
+        site['parse_failures'] += status == 'parse_error'
+        site['rate_limited'] += status == 'rate_limited'
+        site['circuit_open'] += status == 'circuit_open'
+        site['retries'] += retries
+        site['prompt_tokens'] += prompt_tokens
+        site['completion_tokens'] += completion_tokens
+        site['cost_usd'] += _cost(model, prompt_tokens, completion_tokens)
+        site['compaction']['tokens_before'] += tokens_before
+        site['compaction']['tokens_after'] += tokens_after
+        site['models'].add(model)
+        site['latencies'].append(latency_ms)
+
+    for site in sites.values():
+        latencies = sorted(site.pop('latencies'))
+        site['models'] = sorted(site['models'])
+        site['total_tokens'] = site['prompt_tokens'] + site['completion_tokens']
+        site['cost_usd'] = round(site['cost_usd'], 6)
+        site['compaction']['tokens_saved'] = site['compaction']['tokens_before'] - site['compaction']['tokens_after']
+        site['latency_ms'] = {
+            'p50': _percentile(latencies, 0.5),
+            'p95': _percentile(latencies, 0.95),
+            'max': latencies[-1] if latencies else 0,
+            'mean': round(sum(latencies) / len(latencies)) if latencies else 0,
+        }
+        site['histogram'] = _histogram(latencies)
+    return dict(sorted(sites.items(), key=lambda item: -item[1]['total_tokens']))
@@ -0,0 +1,45 @@
+from datetime import timedelta
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from recruitment import answer_cache
+from recruitment.models import ChatAnswer
+
+@override_settings(CHATBOT_CACHE_THRESHOLD=0.85, CHATBOT_CACHE_TTL=3600, CHATBOT_CACHE_MAX_ENTRIES=100,
+                   CHATBOT_CACHE_MIN_OVERLAP=0.8)
+class AnswerCacheTests(TestCase):
+    def test_same_question_with_different_wording_hits(self):
+        answer_cache.store("Xin chào, cách viết CV kế toán?", "Trả lời kế toán")
+        self.assertEqual(answer_cache.lookup("cv kế toán cách viết"), "Trả lời kế toán")
+
+    def test_paraphrases_hit(self):
+        pairs = [
+            ("cách nộp hồ sơ", "làm sao để nộp hồ sơ"),
+            ("cách nộp hồ sơ", "nộp hồ sơ như thế nào?"),
+            # Thêm một từ vào câu dài vẫn nằm trong ngưỡng Jaccard.
+            ("cách nộp hồ sơ ứng tuyển", "nộp hồ sơ ứng tuyển online"),
+        ]
+        for stored, asked in pairs:
+            with self.subTest(asked=asked):
+                ChatAnswer.objects.all().delete()
+                answer_cache.store(stored, "Câu trả lời cũ")
+                self.assertEqual(answer_cache.lookup(asked), "Câu trả lời cũ")
+
+    def test_near_miss_pairs_do_not_hit(self):
+        pairs = [
+            ("cách viết cv vị trí kế toán", "cách viết cv vị trí kiểm toán"),
+            ("nên ghi lương mong muốn trong cv", "không nên ghi lương mong muốn trong cv"),
+            ("nên ghi lương mong muốn trong cv không", "không nên ghi lương mong muốn trong cv"),
+            ("nên nộp hồ sơ online", "không nên nộp hồ sơ online"),
+        ]
+        for stored, asked in pairs:
+            with self.subTest(asked=asked):
+                ChatAnswer.objects.all().delete()
+                answer_cache.store(stored, "Câu trả lời cũ")
+                self.assertIsNone(answer_cache.lookup(asked))
+
+    def test_expired_entry_does_not_hide_a_fresh_one(self):
+        answer_cache.store("cách viết cv kế toán", "Câu trả lời cũ")
+        answer_cache.store("viết cv kế toán cách", "Câu trả lời mới")
+        # Câu giống hệt (cosine cao nhất) đã hết hạn nhưng chưa bị dọn.
+        ChatAnswer.objects.filter(answer="Câu trả lời cũ").update(created_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(answer_cache.lookup("cách viết cv kế toán"), "Câu trả lời mới")
@@ -0,0 +1,68 @@
+import hashlib
+from unittest import mock
+from django.test import TestCase, RequestFactory, override_settings
+from recruitment import views
+from recruitment.llm import LLMError
+from recruitment.models import Application, CustomUser, CVText, JobPosting
+
+CVS = [
+    "Lập trình viên Python Django, 4 năm kinh nghiệm PostgreSQL và Docker.",
+    "Kỹ sư Python, xây dựng API bằng Django REST framework.",
+    "Nhân viên kế toán tổng hợp, thành thạo Excel và MISA.",
+    "Chuyên viên Marketing Online, SEO, quảng cáo Facebook.",
+    "Frontend ReactJS, TypeScript, thiết kế giao diện.",
+]
+
+@override_settings(APPLICANT_SEARCH_TOP_N=2)
+class ApplicantSearchTests(TestCase):
+    def setUp(self):
+        recruiter = CustomUser.objects.create_user(username='ntd', password='x', user_type='recruiter')
+        job = JobPosting.objects.create(recruiter=recruiter, title='Lập trình viên', description='Tuyển dụng')
+        self.applications = []
+        for i, text in enumerate(CVS):
+            digest = hashlib.sha256(f"applicant-search-{i}-{text}".encode('utf-8')).hexdigest()
+            CVText.objects.create(sha256=digest, text=text)
+            candidate = CustomUser.objects.create_user(username=f"uv{i}", password='x', user_type='candidate')
+            self.applications.append(
+                Application.objects.create(job=job, candidate=candidate, cv=f"cvs/cv{i}.pdf", cv_sha256=digest)
+            )
+        self.python_devs = {self.applications[0].id, self.applications[1].id}
+        self.request = RequestFactory().get('/')
+
+    def search(self, **complete):
+        with mock.patch.object(views.llm, 'complete', **complete) as ai, \
+                mock.patch.object(views.messages, 'warning') as warning:
+            results = views._search_applications(self.request, 'python django', Application.objects.all())
+        return results, ai, warning
+
+    def test_shortlist_keeps_top_n_local_matches(self):
+        shortlist = views._shortlist_applications('python django', Application.objects.all(), 2)
+        self.assertEqual({app.id for app, _ in shortlist}, self.python_devs)
+
+    def test_only_shortlisted_cvs_are_sent_to_ai_and_reranked(self):
+        first, second = self.applications[1], self.applications[0]
+        reply = [
+            {'application_id': first.id, 'reason': 'Có kinh nghiệm Django REST'},
+            {'application_id': self.applications[2].id, 'reason': 'Không có trong danh sách rút gọn'},
+            {'application_id': 'rac'},
+            {'application_id': second.id},
+        ]
+        results, ai, warning = self.search(return_value=reply)
+        prompt = ai.call_args.args[0]
+        self.assertIn('Django REST', prompt)
+        self.assertNotIn('MISA', prompt)
+        self.assertEqual([app.id for app in results], [first.id, second.id])
+        self.assertEqual([app.search_reason for app in results], ['Có kinh nghiệm Django REST', ''])
+        warning.assert_not_called()
+
+    def test_ai_error_falls_back_to_local_order(self):
+        results, _, warning = self.search(side_effect=LLMError('hết hạn mức'))
+        self.assertEqual({app.id for app in results}, self.python_devs)
+        self.assertTrue(all(app.search_reason == '' for app in results))
+        warning.assert_called_once()
+
+    def test_no_local_match_skips_ai(self):
+        with mock.patch.object(views.llm, 'complete') as ai:
+            results = views._search_applications(self.request, 'kubernetes terraform', Application.objects.all())
+        self.assertEqual(results, [])
+        ai.assert_not_called()
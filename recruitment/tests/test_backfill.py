@@ -0,0 +1,45 @@
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase
+from recruitment.models import CustomUser, JobPosting, Application, BackfillProgress, CVText
+
+COMMAND = 'recruitment.management.commands.backfill_cv_text'
+
+class BackfillCVTextTests(TestCase):
+    def setUp(self):
+        recruiter = CustomUser.objects.create_user(username='ntd', password='x', user_type='recruiter')
+        candidate = CustomUser.objects.create_user(username='ungvien', password='x', user_type='candidate')
+        job = JobPosting.objects.create(recruiter=recruiter, title='Kế toán', description='Báo cáo thuế.')
+        self.applications = [
+            Application.objects.create(job=job, candidate=candidate, cv=f'cvs/{name}.pdf')
+            for name in ('a', 'hong', 'c')
+        ]
+        self.broken = {b'cvs/hong.pdf'}
+
+    def extract(self, data, file_extension):
+        if data in self.broken:
+            raise ValueError("PDF hỏng")
+        return f"Văn bản {data.decode()}"
+
+    def run_backfill(self):
+        with mock.patch(f'{COMMAND}.read_cv_bytes', side_effect=lambda cv_file: cv_file.name.encode()), \
+                mock.patch(f'{COMMAND}.extraction.extract_text', side_effect=self.extract), \
+                mock.patch(f'{COMMAND}.extraction.set_worker_count'):
+            call_command('backfill_cv_text', batch_size=1, workers=1, stdout=StringIO(), stderr=StringIO())
+
+    def test_checkpoint_stops_before_the_first_failure_and_rerun_retries_it(self):
+        broken = self.applications[1]
+        self.run_backfill()
+        progress = BackfillProgress.objects.get(name='backfill_cv_text:application')
+        self.assertEqual(progress.last_pk, broken.pk - 1)
+        self.assertEqual(CVText.objects.count(), 2)
+
+        self.broken.clear()
+        self.run_backfill()
+        progress.refresh_from_db()
+        # Bản ghi sau file lỗi đã có văn bản từ lần trước nên không còn trong danh sách cần xử lý.
+        self.assertEqual(progress.last_pk, broken.pk)
+        broken.refresh_from_db()
+        self.assertTrue(CVText.objects.filter(sha256=broken.cv_sha256).exists())
+        self.assertEqual(CVText.objects.count(), 3)
@@ -0,0 +1,52 @@
+import asyncio
+from unittest import mock
+from django.db import DatabaseError
+from django.test import SimpleTestCase, override_settings
+from recruitment import circuit, llm, llm_backends
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@override_settings(LLM_BACKEND='fake', LLM_FAKE_LATENCY=0, LLM_FAKE_ERROR_RATE=0, LLM_RATE_LIMIT_RPS=0,
+                   LLM_TELEMETRY=False, LLM_MAX_RETRIES=0)
+class HalfOpenTrialTests(SimpleTestCase):
+    def setUp(self):
+        llm_backends.reset_fake()
+        self.clock = FakeClock()
+        self.breaker = circuit.CircuitBreaker(failure_threshold=2, slow_call=10, cooldown=30, clock=self.clock)
+        circuit.set_breaker(self.breaker)
+        self.addCleanup(circuit.set_breaker, None)
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now = 31
+        self.assertEqual(self.breaker.state, 'half_open')
+
+    def assert_trial_released(self):
+        self.assertFalse(self.breaker._trial_running)
+        self.assertEqual(self.breaker.allow(), circuit.TRIAL)
+
+    def test_non_groq_error_in_rate_limiter_releases_trial(self):
+        with mock.patch.object(llm.ratelimit, 'limit', side_effect=DatabaseError('database is locked')):
+            with self.assertRaises(DatabaseError):
+                llm.complete('xin chào', site='test')
+        self.assert_trial_released()
+
+    def test_unexpected_client_error_releases_trial(self):
+        with mock.patch.object(llm, 'get_client', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                llm.complete('xin chào', site='test')
+        self.assert_trial_released()
+
+    def test_async_unexpected_error_releases_trial(self):
+        with mock.patch.object(llm, 'get_async_client', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                asyncio.run(llm.acomplete('xin chào', site='test'))
+        self.assert_trial_released()
+
+    def test_successful_trial_closes_circuit(self):
+        self.assertTrue(llm.complete('xin chào', site='test'))
+        self.assertEqual(self.breaker.state, 'closed')
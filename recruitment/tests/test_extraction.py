@@ -0,0 +1,120 @@
+import io
+import os
+import time
+import zipfile
+import tempfile
+import threading
+from django.test import SimpleTestCase
+from recruitment import extraction
+
+# Các hàm chạy trong worker (spawn) phải import được từ module này.
+def _sleep_then_pid(seconds):
+    time.sleep(seconds)
+    return os.getpid()
+
+def _fail():
+    raise ValueError("PDF hỏng")
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+MC = 'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+
+def _paragraph(*runs):
+    return '<w:p>' + ''.join(f'<w:r>{run}</w:r>' for run in runs) + '</w:p>'
+
+def _docx(parts):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('[Content_Types].xml', '<Types/>')
+        archive.writestr('word/styles.xml', f'<w:styles {W}><w:t>Không lấy</w:t></w:styles>')
+        for name, body in parts.items():
+            archive.writestr(f'word/{name}.xml', f'<w:document {W} {MC}><w:body>{body}</w:body></w:document>')
+    return buffer.getvalue()
+
+class DocxExtractionTests(SimpleTestCase):
+    def test_reads_header_body_table_text_box_and_footer_in_order(self):
+        text_box = (
+            '<mc:AlternateContent><mc:Choice><w:txbxContent>'
+            + _paragraph('<w:t>Kỹ năng: Python</w:t>')
+            + '</w:txbxContent></mc:Choice><mc:Fallback><w:txbxContent>'
+            + _paragraph('<w:t>Kỹ năng: Python</w:t>')
+            + '</w:txbxContent></mc:Fallback></mc:AlternateContent>'
+        )
+        data = _docx({
+            'footer1': _paragraph('<w:t>Trang 1</w:t>'),
+            'document': (
+                _paragraph('<w:t>Nguyễn </w:t>', '<w:t>Văn A</w:t>')
+                + _paragraph('<w:t>Email</w:t><w:tab/><w:t>a@example.com</w:t>', '<w:br/><w:t>Hà Nội</w:t>')
+                + '<w:tbl><w:tr><w:tc>' + _paragraph('<w:t>Django</w:t>') + '</w:tc></w:tr></w:tbl>'
+                + _paragraph(text_box)
+            ),
+            'header1': _paragraph('<w:t>CV</w:t>'),
+        })
+        self.assertEqual(
+            extraction.extract_docx_text(io.BytesIO(data)),
+            "CV\nNguyễn Văn A\nEmail\ta@example.com\nHà Nội\nDjango\nKỹ năng: Python\n\nTrang 1\n",
+        )
+
+    def test_extract_accepts_bytes_and_file_paths(self):
+        data = _docx({'document': _paragraph('<w:t>Kế toán</w:t>')})
+        self.assertEqual(extraction._extract(data, '.docx', 30), "Kế toán\n")
+        path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), 'cv.docx')
+        with open(path, 'wb') as f:
+            f.write(data)
+        self.assertEqual(extraction._extract_path(path, '.docx', 30), "Kế toán\n")
+
+class WorkerPoolTests(SimpleTestCase):
+    def setUp(self):
+        self.pool = extraction._WorkerPool(workers=2, tasks_per_worker=50)
+        self.addCleanup(self.pool.shutdown)
+
+    def run_in_thread(self, seconds, timeout, results, key):
+        def target():
+            try:
+                results[key] = self.pool.run(_sleep_then_pid, (seconds,), timeout)
+            except TimeoutError:
+                results[key] = 'timeout'
+        thread = threading.Thread(target=target)
+        thread.start()
+        return thread
+
+    def warm_up(self):
+        # Khởi động sẵn cả hai worker để thời gian spawn không ảnh hưởng phép đo.
+        results = {}
+        threads = [self.run_in_thread(0.3, 60, results, i) for i in range(2)]
+        for thread in threads:
+            thread.join()
+        return set(results.values())
+
+    def test_timeout_stops_only_the_worker_that_overran(self):
+        pids = self.warm_up()
+        results = {}
+        slow = self.run_in_thread(30, 2, results, 'slow')
+        time.sleep(1)
+        other = self.run_in_thread(1.5, 2, results, 'other')
+        slow.join()
+        other.join()
+        self.assertEqual(results['slow'], 'timeout')
+        # Tài liệu chạy song song vẫn hoàn tất trên worker cũ của nó.
+        self.assertIn(results['other'], pids)
+
+    def test_timeout_counts_from_start_of_execution_not_from_queueing(self):
+        pool = extraction._WorkerPool(workers=1, tasks_per_worker=50)
+        self.addCleanup(pool.shutdown)
+        pool.run(_sleep_then_pid, (0,), 60)
+        results = {}
+
+        def target(key):
+            results[key] = pool.run(_sleep_then_pid, (1,), 1.5)
+
+        threads = [threading.Thread(target=target, args=(i,)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 2)
+
+    def test_errors_are_raised_and_the_worker_is_reused(self):
+        pid = self.pool.run(_sleep_then_pid, (0,), 60)
+        with self.assertRaisesMessage(ValueError, "PDF hỏng"):
+            self.pool.run(_fail, (), 60)
+        self.assertEqual(self.pool.run(_sleep_then_pid, (0,), 60), pid)
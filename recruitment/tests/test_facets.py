@@ -0,0 +1,47 @@
+from django.core.cache import cache
+from django.test import TestCase
+from recruitment import facets
+from recruitment.models import CustomUser, JobPosting
+
+PROVINCES = ["Hà Nội", "Hồ Chí Minh", "Đà Nẵng"]
+
+class JobFacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.recruiter = CustomUser.objects.create_user(username='ntd', password='x', user_type='recruiter')
+        self.job('Lập trình viên Python', 'IT', 'Hà Nội')
+        self.job('Kỹ sư Python', 'IT', 'TP. Hồ Chí Minh')
+        self.job('Kiểm thử phần mềm', 'Tester', 'Hà Nội')
+
+    def job(self, title, category, location):
+        return JobPosting.objects.create(
+            recruiter=self.recruiter, title=title, description='Mô tả công việc.', category=category, location=location
+        )
+
+    def counts(self, query='', location='', category=''):
+        result = facets.job_facets(query, location, category, PROVINCES)
+        categories = {value: n for value, _, n in result['categories'] if n}
+        locations = {province: n for province, n in result['locations'] if n}
+        return result['total'], categories, locations
+
+    def test_each_count_is_the_result_size_if_that_option_were_chosen(self):
+        self.assertEqual(self.counts(), (3, {'IT': 2, 'Tester': 1}, {'Hà Nội': 2, 'Hồ Chí Minh': 1}))
+        # Số theo ngành áp dụng bộ lọc địa điểm (bỏ dấu), số theo tỉnh áp dụng bộ lọc ngành.
+        self.assertEqual(self.counts(location='ha noi'), (2, {'IT': 1, 'Tester': 1}, {'Hà Nội': 2, 'Hồ Chí Minh': 1}))
+        self.assertEqual(self.counts(category='IT'), (2, {'IT': 2, 'Tester': 1}, {'Hà Nội': 1, 'Hồ Chí Minh': 1}))
+        self.assertEqual(self.counts(query='python'), (2, {'IT': 2}, {'Hà Nội': 1, 'Hồ Chí Minh': 1}))
+
+    def test_results_are_cached(self):
+        self.counts()
+        with self.assertNumQueries(0):
+            self.counts()
+
+    def test_cache_is_invalidated_when_a_job_is_saved_or_deleted(self):
+        self.assertEqual(self.counts()[0], 3)
+        job = self.job('Chuyên viên nhân sự', 'HR', 'Đà Nẵng')
+        self.assertEqual(self.counts(), (4, {'IT': 2, 'Tester': 1, 'HR': 1}, {'Hà Nội': 2, 'Hồ Chí Minh': 1, 'Đà Nẵng': 1}))
+        job.is_archived = True
+        job.save(update_fields=['is_archived'])
+        self.assertEqual(self.counts()[0], 3)
+        JobPosting.objects.filter(category='Tester').get().delete()
+        self.assertEqual(self.counts(), (2, {'IT': 2}, {'Hà Nội': 1, 'Hồ Chí Minh': 1}))
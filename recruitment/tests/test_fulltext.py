@@ -0,0 +1,63 @@
+from unittest import mock
+from django.test import TestCase, SimpleTestCase
+from recruitment import fulltext
+from recruitment.models import CustomUser, JobPosting
+
+class QueryBuildingTests(SimpleTestCase):
+    def test_fts5_query_quotes_each_term_as_a_prefix(self):
+        self.assertEqual(fulltext._fts5_query(['ke', 'toan']), '"ke"* "toan"*')
+        # Từ khóa của cú pháp FTS5 chỉ là một chuỗi cần tìm.
+        self.assertEqual(fulltext._fts5_query(['near', 'not']), '"near"* "not"*')
+
+    def test_tsquery_joins_prefix_terms_with_and(self):
+        self.assertEqual(fulltext._tsquery(['ke', "to'an"]), "'ke':* & 'toan':*")
+
+class SearchJobsTests(TestCase):
+    def setUp(self):
+        recruiter = CustomUser.objects.create_user(username='ntd', password='x', user_type='recruiter')
+
+        def job(title, description, category='Other'):
+            return JobPosting.objects.create(recruiter=recruiter, title=title, description=description, category=category)
+
+        self.python = job('Lập trình viên Python', 'Phát triển API với Django.', 'IT')
+        self.accountant = job('Kế toán tổng hợp', 'Lập báo cáo thuế, có thể dùng Python là lợi thế.')
+        self.tester = job('QA Engineer', 'Viết test case tự động.', 'Tester')
+
+    def search(self, query):
+        return list(fulltext.search_jobs(JobPosting.objects.all(), query))
+
+    def test_prefix_and_accent_insensitive_matching(self):
+        self.assertEqual(self.search('pyth')[0], self.python)
+        self.assertEqual(self.search('ke toan'), [self.accountant])
+        self.assertEqual(self.search('KẾ TOÁN'), [self.accountant])
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self.search('python django'), [self.python])
+        self.assertEqual(self.search('python golang'), [])
+
+    def test_title_matches_rank_above_description_matches(self):
+        self.assertEqual(self.search('python'), [self.python, self.accountant])
+
+    def test_category_label_is_searchable(self):
+        self.assertEqual(self.search('kiem thu'), [self.tester])
+
+    def test_index_follows_save_and_delete(self):
+        self.python.title = 'Lập trình viên Golang'
+        self.python.description = 'Microservices.'
+        self.python.save()
+        self.assertEqual(self.search('golang'), [self.python])
+        self.assertEqual(self.search('django'), [])
+        self.python.delete()
+        self.assertEqual(self.search('golang'), [])
+
+    def test_stopword_only_query_falls_back_to_substring_filter(self):
+        self.assertEqual(self.search('và'), [])
+        results = list(fulltext.search_jobs(JobPosting.objects.all(), 'với'))
+        self.assertEqual(results, [self.python])
+        self.assertEqual(results[0].search_rank, 0.0)
+
+    def test_unsupported_database_falls_back_to_substring_filter(self):
+        with mock.patch.object(fulltext, 'supported', return_value=False):
+            results = list(fulltext.search_jobs(JobPosting.objects.all(), 'Kế toán'))
+        self.assertEqual(results, [self.accountant])
+        self.assertEqual(results[0].search_rank, 0.0)
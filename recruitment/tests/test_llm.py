@@ -0,0 +1,64 @@
+import json
+import asyncio
+from unittest import mock
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from recruitment import circuit, llm, llm_backends
+from recruitment.models import CustomUser
+
+@override_settings(LLM_BACKEND='fake', LLM_FAKE_LATENCY=0, LLM_FAKE_ERROR_RATE=0, LLM_RATE_LIMIT_RPS=0,
+                   LLM_TELEMETRY=False, LLM_MAX_RETRIES=0)
+class AsyncClientTests(SimpleTestCase):
+    def setUp(self):
+        llm_backends.reset_fake()
+        circuit.set_breaker(circuit.CircuitBreaker())
+        self.addCleanup(circuit.set_breaker, None)
+
+    def test_one_async_client_is_shared_by_every_request_loop(self):
+        # Dưới WSGI mỗi request async chạy trên một event loop mới.
+        with mock.patch.object(llm, 'create_client', wraps=llm.create_client) as create_client:
+            llm._async_clients.clear()
+            for _ in range(3):
+                asyncio.run(llm.acomplete("Xin chào", site='test'))
+        self.assertEqual(create_client.call_count, 1)
+
+    def test_cancelling_the_caller_cancels_the_call(self):
+        cancelled = []
+
+        async def slow_create(**params):
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def run():
+            client = mock.Mock()
+            client.chat.completions.create = slow_create
+            with mock.patch.object(llm, 'get_async_client', return_value=client):
+                with self.assertRaises(asyncio.TimeoutError):
+                    await asyncio.wait_for(llm.acomplete("Xin chào", site='test'), timeout=0.2)
+                await asyncio.sleep(0.1)
+
+        asyncio.run(run())
+        self.assertEqual(cancelled, [True])
+
+@override_settings(JOB_MATCH_TOP_K=5)
+class JobMatchMoreRequestTests(TestCase):
+    def setUp(self):
+        user = CustomUser.objects.create_user(username='ungvien', password='x', user_type='candidate')
+        self.client.force_login(user)
+
+    def post(self, body):
+        return self.client.post(reverse('job_matches_more'), json.dumps(body), content_type='application/json')
+
+    def test_rejects_too_many_or_non_integer_job_ids(self):
+        for job_ids in (list(range(6)), ['1'], [1.5], [True], [None], 'abc', {'id': 1}):
+            with self.subTest(job_ids=job_ids):
+                self.assertEqual(self.post({'job_ids': job_ids}).status_code, 400)
+
+    def test_accepts_a_page_of_integer_ids(self):
+        # Chưa có CV: qua được bước kiểm tra job_ids, dừng ở bước đọc CV.
+        response = self.post({'job_ids': [1, 2, 3, 4, 5]})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json()['success'])
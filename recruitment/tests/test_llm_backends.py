@@ -0,0 +1,72 @@
+import json
+import asyncio
+import tempfile
+from unittest import mock
+from django.test import SimpleTestCase, override_settings
+from recruitment import circuit, llm, llm_backends
+
+MESSAGES = [{'role': 'user', 'content': "Chấm điểm CV, trả về JSON {\"score\": ...}"}]
+
+class FakeAnswerTests(SimpleTestCase):
+    def test_answers_have_the_shape_each_call_site_expects(self):
+        batch = json.loads(llm_backends.fake_answer("[job_id=3] Python\n[job_id=7] Java"))
+        self.assertEqual([item['job_id'] for item in batch], [3, 7])
+        rerank = json.loads(llm_backends.fake_answer('[{"application_id": 5}, {"application_id": 9}]'))
+        self.assertEqual([item['application_id'] for item in rerank], [5, 9])
+        review = json.loads(llm_backends.fake_answer('Trả về {"score", "strengths", "suggestions"}'))
+        self.assertEqual(set(review), {'score', 'strengths', 'suggestions'})
+        self.assertNotIn('score', json.loads(llm_backends.fake_answer('Chỉ nhận xét: strengths, suggestions')))
+        self.assertTrue(0 <= json.loads(llm_backends.fake_answer('{"score": ...}'))['score'] <= 100)
+
+    def test_answers_are_stable_per_prompt(self):
+        self.assertEqual(llm_backends.fake_answer('{"score": ...} A'), llm_backends.fake_answer('{"score": ...} A'))
+
+class ReplayBackendTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = self.enterContext(tempfile.TemporaryDirectory())
+
+    def replay_client(self, record, inner=None, is_async=False):
+        return llm_backends.ReplayClient(inner, self.directory, record=record, is_async=is_async)
+
+    def test_missing_fixture_raises(self):
+        with self.assertRaises(llm_backends.FixtureMissing):
+            self.replay_client(record=False).chat.completions.create(model='m', messages=MESSAGES)
+
+    def test_recorded_answer_is_replayed_without_calling_the_model(self):
+        inner = mock.Mock()
+        inner.chat.completions.create.return_value = llm_backends._completion('{"score": 81}')
+        self.replay_client(record=True, inner=inner).chat.completions.create(model='m', messages=MESSAGES, temperature=0.0)
+
+        replay = self.replay_client(record=False).chat.completions
+        completion = replay.create(model='m', messages=MESSAGES, temperature=0.0)
+        self.assertEqual(completion.choices[0].message.content, '{"score": 81}')
+        inner.chat.completions.create.assert_called_once()
+        # Khác tham số (temperature) là một prompt khác.
+        with self.assertRaises(llm_backends.FixtureMissing):
+            replay.create(model='m', messages=MESSAGES, temperature=0.7)
+
+    def test_async_replay_streams_the_recorded_answer(self):
+        inner = mock.Mock()
+        inner.chat.completions.create.return_value = llm_backends._completion("Xin chào bạn")
+        self.replay_client(record=True, inner=inner).chat.completions.create(model='m', messages=MESSAGES)
+
+        async def stream():
+            chunks = await self.replay_client(record=False, is_async=True).chat.completions.create(
+                model='m', messages=MESSAGES, stream=True
+            )
+            return ''.join([chunk.choices[0].delta.content async for chunk in chunks])
+
+        self.assertEqual(asyncio.run(stream()), "Xin chào bạn")
+
+    def test_complete_raises_llm_error_for_a_prompt_without_fixture(self):
+        circuit.set_breaker(circuit.CircuitBreaker())
+        self.addCleanup(circuit.set_breaker, None)
+        with override_settings(LLM_BACKEND='replay', LLM_FIXTURES_DIR=self.directory, LLM_RATE_LIMIT_RPS=0,
+                               LLM_TELEMETRY=False, LLM_MAX_RETRIES=2), \
+                mock.patch.dict(llm._clients, clear=True), \
+                mock.patch.object(llm_backends._ReplayCompletions, 'create', autospec=True,
+                                  side_effect=llm_backends._ReplayCompletions.create) as create:
+            with self.assertRaises(llm.LLMError):
+                llm.complete("Prompt chưa được ghi", site='test')
+        # Thiếu fixture không phải lỗi tạm thời nên không retry.
+        self.assertEqual(create.call_count, 1)
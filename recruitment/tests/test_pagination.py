@@ -0,0 +1,57 @@
+from django.core import signing
+from django.test import TestCase, RequestFactory, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from recruitment import pagination
+from recruitment.models import CustomUser, Notification
+
+ORDERING = ('-created_at', '-id')
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='ungvien', password='x', user_type='candidate')
+        Notification.objects.bulk_create([Notification(recipient=self.user, message=f"Thông báo {i}") for i in range(25)])
+        # Nhiều dòng trùng created_at: thứ tự phải dựa vào id để không lặp/bỏ sót.
+        Notification.objects.filter(pk__in=Notification.objects.values_list('pk', flat=True)[:10]).update(
+            created_at=timezone.now()
+        )
+        self.queryset = Notification.objects.filter(recipient=self.user)
+
+    def page(self, cursor=None, per_page=7):
+        request = RequestFactory().get('/', {'cursor': cursor} if cursor else {})
+        return pagination.paginate(request, self.queryset, ORDERING, per_page=per_page)
+
+    def test_pages_cover_everything_without_overlap(self):
+        seen, cursor = [], None
+        while True:
+            page = self.page(cursor)
+            seen.extend(notification.pk for notification in page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        expected = list(self.queryset.order_by(*ORDERING).values_list('pk', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_tampered_cursor_is_ignored(self):
+        first = self.page()
+        values = signing.loads(first.next_cursor, salt=pagination.CURSOR_SALT)
+        forged = signing.dumps(values, salt='khac')
+        tampered = first.next_cursor[:-2] + ('AA' if not first.next_cursor.endswith('AA') else 'BB')
+        for cursor in (forged, tampered, 'rac', signing.dumps(['x'], salt=pagination.CURSOR_SALT)):
+            with self.subTest(cursor=cursor):
+                self.assertEqual([n.pk for n in self.page(cursor)], [n.pk for n in first])
+
+    def test_next_url_keeps_filters(self):
+        request = RequestFactory().get('/', {'q': 'python'})
+        page = pagination.paginate(request, self.queryset, ORDERING, per_page=5)
+        self.assertIn('q=python', page.next_url)
+        self.assertIn('cursor=', page.next_url)
+
+    @override_settings(PAGE_SIZE=10)
+    def test_notification_view_marks_only_the_shown_page_as_read(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('notifications'))
+        shown = [n.pk for n in response.context['page']]
+        self.assertEqual(len(shown), 10)
+        self.assertEqual(set(Notification.objects.filter(is_read=True).values_list('pk', flat=True)), set(shown))
+        self.assertEqual(Notification.objects.filter(is_read=False).count(), 15)
@@ -0,0 +1,95 @@
+import asyncio
+from unittest import mock
+from django.test import SimpleTestCase, override_settings
+from recruitment import ratelimit
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@override_settings(LLM_RATE_LIMIT_RPS=0.001, LLM_RATE_LIMIT_BURST=5, LLM_RATE_LIMIT_BATCH_RESERVE=3,
+                   LLM_RATE_LIMIT_MAX_WAIT=1, LLM_CONCURRENCY={'interactive': 8, 'batch': 8})
+class RateLimitTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        ratelimit.set_backend(ratelimit.LocalBackend(clock=self.clock))
+        self.addCleanup(ratelimit.set_backend, None)
+        # Semaphore được tạo theo LLM_CONCURRENCY lúc dùng lần đầu.
+        ratelimit._semaphores.clear()
+
+    def take(self, priority):
+        with ratelimit.limit(priority):
+            pass
+
+    def test_batch_calls_leave_the_reserve_to_interactive_calls(self):
+        self.take('batch')
+        self.take('batch')
+        with self.assertRaises(ratelimit.RateLimitExceeded):
+            self.take('batch')
+        # 3 token dự trữ vẫn còn cho lời gọi interactive.
+        for _ in range(3):
+            self.take('interactive')
+        with self.assertRaises(ratelimit.RateLimitExceeded):
+            self.take('interactive')
+
+    def test_refill_lets_calls_through_again(self):
+        for _ in range(5):
+            self.take('interactive')
+        with self.assertRaises(ratelimit.RateLimitExceeded):
+            self.take('interactive')
+        self.clock.now += 1000
+        self.take('interactive')
+
+    def test_async_limit_raises_when_the_wait_exceeds_max_wait(self):
+        async def run():
+            for _ in range(5):
+                async with ratelimit.alimit('interactive'):
+                    pass
+            async with ratelimit.alimit('interactive'):
+                pass
+
+        with self.assertRaisesMessage(ratelimit.RateLimitExceeded, "Vượt hạn mức gọi AI"):
+            asyncio.run(run())
+
+    def test_async_bucket_access_cleans_up_connections(self):
+        async def run():
+            async with ratelimit.alimit('interactive'):
+                pass
+
+        with mock.patch('recruitment.db.close_old_connections') as close_old_connections:
+            asyncio.run(run())
+        self.assertEqual(close_old_connections.call_count, 2)
+
+    @override_settings(LLM_CONCURRENCY={'interactive': 1})
+    def test_concurrency_limit_raises_after_max_wait(self):
+        semaphore = ratelimit._semaphore('interactive', ratelimit._config())
+        with self.assertRaisesMessage(ratelimit.RateLimitExceeded, "đang chạy"):
+            with ratelimit.limit('interactive'):
+                with ratelimit.limit('interactive'):
+                    pass
+        self.assertTrue(semaphore.acquire(blocking=False))
+        semaphore.release()
+
+    @override_settings(LLM_RATE_LIMIT_RPS=0)
+    def test_zero_rate_disables_only_the_token_bucket(self):
+        for _ in range(20):
+            self.take('batch')
+
+    @override_settings(LLM_RATE_LIMIT_RPS=0, LLM_CONCURRENCY={'batch': 1})
+    def test_concurrency_caps_apply_with_zero_rate(self):
+        with self.assertRaisesMessage(ratelimit.RateLimitExceeded, "đang chạy"):
+            with ratelimit.limit('batch'):
+                with ratelimit.limit('batch'):
+                    pass
+
+        async def run():
+            ratelimit._async_semaphores.pop(asyncio.get_running_loop(), None)
+            async with ratelimit.alimit('batch'):
+                async with ratelimit.alimit('batch'):
+                    pass
+
+        with self.assertRaisesMessage(ratelimit.RateLimitExceeded, "đang chạy"):
+            asyncio.run(run())
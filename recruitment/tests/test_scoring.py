@@ -0,0 +1,150 @@
+import asyncio
+from unittest import mock
+from django.test import TestCase, SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from recruitment import circuit, llm, llm_backends, scoring
+from recruitment.models import CustomUser, CVText, JobPosting, MatchScore, Profile
+
+CV = "Lập trình viên Python, Django, PostgreSQL, 3 năm kinh nghiệm."
+JD = "Tuyển lập trình viên Python Django."
+
+class ParseMatchScoreTests(SimpleTestCase):
+    def test_reads_score_from_json(self):
+        self.assertEqual(scoring.parse_match_score('Kết quả: {"score": 85}'), 85)
+        self.assertEqual(scoring.parse_match_score('{"score": "70"}'), 70)
+
+    def test_rejects_replies_without_a_valid_json_score(self):
+        for reply in ('Điểm phù hợp là 85/100', '', '{"score": 150}', '{"score": -3}', '{"score": "cao"}',
+                      '{"summary": "tốt"}', '{"score": 85', '{"score": 72.5}', '{"score": true}'):
+            with self.subTest(reply=reply), self.assertRaises(llm.LLMError):
+                scoring.parse_match_score(reply)
+
+    def test_batch_scores_skip_out_of_range(self):
+        results = [{'job_id': 1, 'score': 80}, {'job_id': 2, 'score': 400}, {'job_id': 3, 'score': 'x'}]
+        self.assertEqual(scoring.parse_batch_scores(results, {1, 2, 3}), {1: 80})
+
+class MatchScorePersistenceTests(TestCase):
+    def score_with_reply(self, reply):
+        with mock.patch.object(scoring.llm, 'complete', return_value=reply):
+            return scoring.get_ai_match_score(CV, JD)
+
+    def test_valid_json_score_is_stored(self):
+        self.assertEqual(self.score_with_reply('{"score": 77}'), 77)
+        self.assertEqual(MatchScore.objects.get().score, 77)
+
+    def test_unparseable_reply_returns_provisional_score_without_storing(self):
+        score = self.score_with_reply('Tôi nghĩ CV này khá phù hợp, khoảng 2024 điểm.')
+        self.assertEqual(score, scoring.keyword_overlap(CV, JD)[0])
+        self.assertFalse(MatchScore.objects.exists())
+        # Lần sau vẫn hỏi lại AI thay vì dùng điểm tạm tính.
+        self.assertEqual(self.score_with_reply('{"score": 64}'), 64)
+        self.assertEqual(MatchScore.objects.get().score, 64)
+
+    def test_out_of_range_score_is_not_stored(self):
+        self.score_with_reply('{"score": 900}')
+        self.assertFalse(MatchScore.objects.exists())
+
+class ScreenApplicationTests(SimpleTestCase):
+    def screen(self, reply):
+        application = mock.Mock(job=mock.Mock(description=JD))
+        with mock.patch.object(scoring, 'cv_text_for', return_value=CV), \
+                mock.patch.object(scoring.llm, 'complete', return_value=reply):
+            return scoring.screen_application(application)
+
+    def test_valid_score_is_returned(self):
+        self.assertEqual(self.screen({'score': '81', 'summary': 'Tốt'}), (81, 'Tốt'))
+
+    def test_invalid_score_raises_instead_of_being_stored(self):
+        for score in (250, -1, 'cao', None, True, 60.5):
+            with self.subTest(score=score), self.assertRaises(llm.LLMError):
+                self.screen({'score': score, 'summary': 'Tốt'})
+
+class ReviewCacheTests(TestCase):
+    REVIEW = {'score': 72, 'strengths': ["Python"], 'suggestions': ["Thêm dự án"]}
+    COMMENTARY = {'strengths': ["Django"], 'suggestions': ["Bổ sung SQL"]}
+
+    def review(self, reply):
+        with mock.patch.object(scoring.llm, 'complete', return_value=reply) as complete:
+            result = scoring.review_cv(CV, JD)
+        return result, [call.kwargs['site'] for call in complete.call_args_list]
+
+    def test_first_review_scores_and_comments_in_one_call_and_stores_the_score(self):
+        result, sites = self.review(self.REVIEW)
+        self.assertEqual(sites, ['review'])
+        self.assertEqual(result, self.REVIEW)
+        self.assertEqual(MatchScore.objects.get().prompt_version, scoring.REVIEW_PROMPT_VERSION)
+
+    def test_cached_pair_skips_the_scoring_call(self):
+        self.review(self.REVIEW)
+        result, sites = self.review(self.COMMENTARY)
+        self.assertEqual(sites, ['review_commentary'])
+        self.assertEqual(result, dict(self.COMMENTARY, score=72))
+        self.assertEqual(MatchScore.objects.count(), 1)
+
+    def test_score_from_single_match_is_reused(self):
+        with mock.patch.object(scoring.llm, 'complete', return_value='{"score": 64}'):
+            scoring.get_ai_match_score(CV, JD)
+        result, sites = self.review(self.COMMENTARY)
+        self.assertEqual((sites, result['score']), (['review_commentary'], 64))
+
+    def test_invalid_score_is_not_stored(self):
+        with self.assertRaises(llm.LLMError):
+            self.review(dict(self.REVIEW, score=180))
+        self.assertFalse(MatchScore.objects.exists())
+
+@override_settings(LLM_BACKEND='fake', LLM_FAKE_LATENCY=0, LLM_FAKE_ERROR_RATE=0, LLM_RATE_LIMIT_RPS=0,
+                   LLM_TELEMETRY=False, LLM_MAX_RETRIES=0)
+class BatchCacheKeyTests(TransactionTestCase):
+    # Điểm được lưu từ loop nền của llm (thread khác), nên cần dữ liệu đã commit.
+    def setUp(self):
+        llm_backends.reset_fake()
+        circuit.set_breaker(circuit.CircuitBreaker())
+        self.addCleanup(circuit.set_breaker, None)
+        recruiter = CustomUser.objects.create_user(username='ntd', password='x', user_type='recruiter')
+        self.jobs = [
+            JobPosting.objects.create(recruiter=recruiter, title=title, description="Python, Django, SQL.")
+            for title in ("Lập trình viên Python", "Trưởng nhóm Python")
+        ]
+
+    def score(self):
+        return asyncio.run(scoring.score_jobs_async(CV, self.jobs))
+
+    def test_cache_key_includes_the_title(self):
+        self.score()
+        digests = set(MatchScore.objects.values_list('jd_digest', flat=True))
+        self.assertEqual(digests, {scoring.text_digest(scoring.job_text(job)) for job in self.jobs})
+
+        calls = llm_backends.fake_behaviour().calls
+        self.jobs[1].title = "Thực tập sinh Python"
+        self.jobs[1].save()
+        scores, pending, provisional = self.score()
+        # Chỉ job vừa đổi tiêu đề phải chấm lại.
+        self.assertEqual(llm_backends.fake_behaviour().calls, calls + 1)
+        self.assertEqual((set(scores), pending, provisional), ({job.id for job in self.jobs}, [], set()))
+
+@override_settings(LLM_BACKEND='fake', LLM_FAKE_LATENCY=0, LLM_FAKE_ERROR_RATE=0, LLM_RATE_LIMIT_RPS=0,
+                   LLM_TELEMETRY=False, LLM_MAX_RETRIES=0, JOB_MATCH_MIN_LEXICAL_SCORE=0)
+class ReviewAfterJobMatchTests(TransactionTestCase):
+    def setUp(self):
+        llm_backends.reset_fake()
+        circuit.set_breaker(circuit.CircuitBreaker())
+        self.addCleanup(circuit.set_breaker, None)
+        recruiter = CustomUser.objects.create_user(username='ntd', password='x', user_type='recruiter')
+        self.job = JobPosting.objects.create(recruiter=recruiter, title="Lập trình viên Python", description=JD)
+        self.candidate = CustomUser.objects.create_user(username='uv', password='x', user_type='candidate')
+        digest = scoring.text_digest(CV)
+        CVText.objects.create(sha256=digest, text=CV)
+        Profile.objects.update_or_create(user=self.candidate, defaults={'cv_file': 'cvs/cv.pdf', 'cv_sha256': digest})
+
+    def test_pair_scored_by_job_match_only_needs_the_commentary_call(self):
+        self.client.force_login(self.candidate)
+        response = self.client.get(reverse('job_matches'))
+        score = response.context['matched_jobs'][0].match_score
+        self.assertEqual(MatchScore.objects.get().prompt_version, scoring.BATCH_PROMPT_VERSION)
+
+        with mock.patch.object(scoring.llm, 'complete', wraps=scoring.llm.complete) as complete:
+            result = self.client.post(
+                reverse('cv_review'), {'job_id': self.job.id}, content_type='application/json'
+            ).json()
+        self.assertEqual([call.kwargs['site'] for call in complete.call_args_list], ['review_commentary'])
+        self.assertEqual(result['data']['score'], score)
@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+from django.test import SimpleTestCase, override_settings
+from recruitment import search
+
+CV = "Lập trình viên Python, Django, PostgreSQL, REST API. 3 năm kinh nghiệm backend."
+
+def _job(job_id, title, description):
+    return SimpleNamespace(id=job_id, title=title, description=description)
+
+JOBS = [
+    _job(1, "Kế toán tổng hợp", "Lập báo cáo thuế, sổ sách kế toán, kiểm kê."),
+    _job(2, "Backend Python Developer", "Phát triển REST API với Django và PostgreSQL."),
+    _job(3, "Nhân viên bán hàng", "Tư vấn khách hàng tại cửa hàng."),
+    _job(4, "Lập trình viên Java", "Phát triển backend với Spring Boot."),
+]
+
+@override_settings(JOB_MATCH_TOP_K=20, JOB_MATCH_MIN_LEXICAL_SCORE=1.0)
+class RankJobsTests(SimpleTestCase):
+    def ids(self, jobs):
+        return [job.id for job in jobs]
+
+    def test_keeps_only_lexically_relevant_jobs_best_first(self):
+        self.assertEqual(self.ids(search.rank_jobs(CV, JOBS)), [2, 4])
+
+    def test_respects_top_k_and_min_score(self):
+        self.assertEqual(self.ids(search.rank_jobs(CV, JOBS, top_k=1)), [2])
+        # Không có ngưỡng: cả các job chỉ trùng từ chung chung ("lập", "viên") cũng được giữ.
+        self.assertEqual(self.ids(search.rank_jobs(CV, JOBS, min_score=0)), [2, 4, 3, 1])
+        self.assertEqual(search.rank_jobs(CV, JOBS, min_score=100), [])
+
+    def test_index_is_rebuilt_when_a_job_changes(self):
+        search.rank_jobs(CV, JOBS)
+        index = search.job_index(JOBS)
+        self.assertIs(search.job_index(list(JOBS)), index)
+
+        changed = JOBS[:2] + [_job(3, "Lập trình viên Python", "Django, PostgreSQL, REST API.")] + JOBS[3:]
+        self.assertIsNot(search.job_index(changed), index)
+        self.assertEqual(set(self.ids(search.rank_jobs(CV, changed))[:2]), {2, 3})
+
+class BM25IndexTests(SimpleTestCase):
+    def test_rare_terms_weigh_more_than_common_ones(self):
+        index = search.BM25Index([(1, "python django"), (2, "python flask"), (3, "python fastapi")])
+        scores = index.scores("python django")
+        self.assertGreater(scores[1], scores[2])
+        self.assertEqual(scores[2], scores[3])
+
+    def test_documents_without_shared_terms_are_not_scored(self):
+        index = search.BM25Index([(1, "python"), (2, "kế toán")])
+        self.assertEqual(set(index.scores("Python")), {1})
+        self.assertEqual(index.top("python", 5, min_score=100), [])
@@ -0,0 +1,68 @@
+from django.test import TestCase
+from django.urls import reverse
+from recruitment.models import CustomUser, JobPosting, Application, Profile
+
+class FoldedColumnTests(TestCase):
+    def setUp(self):
+        self.recruiter = CustomUser.objects.create_user(username='ntd', password='x', user_type='recruiter')
+        self.candidate = CustomUser.objects.create_user(username='ungvien', password='x', user_type='candidate')
+        self.hanoi = JobPosting.objects.create(
+            recruiter=self.recruiter, title='Kế toán tổng hợp', description='Lập báo cáo thuế.',
+            location='Hà Nội', category='Other',
+        )
+        self.hcm = JobPosting.objects.create(
+            recruiter=self.recruiter, title='Kiểm thử phần mềm', description='Viết test case.',
+            location='TP. Hồ Chí Minh', category='Tester',
+        )
+
+    def test_save_keeps_folded_columns_in_sync(self):
+        self.assertEqual((self.hanoi.title_folded, self.hanoi.province_folded), ('ke toan tong hop', 'ha noi'))
+        self.assertEqual((self.hcm.category_folded, self.hcm.province_folded), ('kiem thu phan mem', 'ho chi minh'))
+        self.hanoi.location = 'Tầng 3, 12 Bạch Đằng, Đà Nẵng'
+        self.hanoi.save(update_fields=['location'])
+        self.hanoi.refresh_from_db()
+        self.assertEqual(self.hanoi.province_folded, 'da nang')
+
+    def test_job_board_filters_ignore_accents(self):
+        self.client.force_login(self.candidate)
+        for params, expected in (
+            ({'location': 'ha noi'}, [self.hanoi.pk]),
+            ({'location': 'HÀ NỘI'}, [self.hanoi.pk]),
+            ({'location': 'Hồ Chí Minh'}, [self.hcm.pk]),
+            ({'location': 'noi'}, []),
+            ({'category': 'kiem thu phan mem'}, [self.hcm.pk]),
+            ({'category': 'Tester'}, [self.hcm.pk]),
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(reverse('job_board'), params)
+                self.assertEqual([job.pk for job in response.context['jobs']], expected)
+
+    def test_analytics_title_filter_matches_jobs_and_applications_alike(self):
+        Application.objects.create(job=self.hanoi, candidate=self.candidate, cv='cvs/a.pdf', status='passed')
+        Application.objects.create(job=self.hcm, candidate=self.candidate, cv='cvs/b.pdf')
+        self.client.force_login(self.recruiter)
+        response = self.client.get(reverse('recruitment_analytics'), {'job_title': 'ke toan tong hop'})
+        self.assertEqual(response.context['job_titles_comparison_json'], '["K\\u1ebf to\\u00e1n t\\u1ed5ng h\\u1ee3p"]')
+        self.assertEqual(response.context['actual_applications_json'], '[1]')
+        self.assertEqual(response.context['total_applications'], 1)
+
+    def test_analytics_groups_titles_that_differ_only_in_accents(self):
+        JobPosting.objects.create(
+            recruiter=self.recruiter, title='Ke toan tong hop', description='Đợt 2.', location='Hà Nội', quantity=2,
+        )
+        self.client.force_login(self.recruiter)
+        response = self.client.get(reverse('recruitment_analytics'), {'job_title': 'Kế toán tổng hợp'})
+        self.assertEqual(response.context['job_titles_comparison_json'], '["Ke toan tong hop"]')
+        self.assertEqual(response.context['planned_quantity_json'], '[3]')
+        self.assertEqual(len(response.context['all_job_titles_for_filter']), 2)
+
+    def test_applicant_name_filter_ignores_accents(self):
+        other = CustomUser.objects.create_user(username='tranthib', password='x', user_type='candidate')
+        Profile.objects.update_or_create(user=self.candidate, defaults={'full_name': 'Nguyễn Văn Đức'})
+        mine = Application.objects.create(job=self.hanoi, candidate=self.candidate, cv='cvs/a.pdf')
+        theirs = Application.objects.create(job=self.hanoi, candidate=other, cv='cvs/b.pdf')
+        self.client.force_login(self.recruiter)
+        for name, expected in (('van duc', [mine.pk]), ('ĐỨC', [mine.pk]), ('tranthi', [theirs.pk]), ('le', [])):
+            with self.subTest(name=name):
+                response = self.client.get(reverse('all_applicants'), {'name': name})
+                self.assertEqual([app.pk for app in response.context['applications']], expected)
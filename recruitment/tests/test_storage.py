@@ -0,0 +1,108 @@
+import os
+import hashlib
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from recruitment.models import CustomUser, JobPosting, Application, Profile
+from recruitment.storage import cv_storage, release_cv_files
+
+CV = b'%PDF-1.4 Nguyen Van A - Ke toan'
+CV_NAME = f'cvs/{hashlib.sha256(CV).hexdigest()}.pdf'
+
+class CVStorageTestCase(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def stored_files(self):
+        return sorted(default_storage.listdir('cvs')[1]) if default_storage.exists('cvs') else []
+
+class ContentAddressedStorageTests(CVStorageTestCase):
+    def test_same_content_is_stored_once_under_its_hash(self):
+        first = cv_storage.save('cvs/CV_NguyenVanA.PDF', ContentFile(CV))
+        second = cv_storage.save('cvs/cv-moi.pdf', ContentFile(CV))
+        self.assertEqual(first, CV_NAME)
+        self.assertEqual(second, CV_NAME)
+        self.assertEqual(self.stored_files(), [os.path.basename(CV_NAME)])
+
+    def test_concurrent_upload_of_the_same_file_returns_the_hashed_name(self):
+        cv_storage.save('cvs/a.pdf', ContentFile(CV))
+        # Giả lập upload đồng thời: exists() còn thấy chưa có file nên backend lưu bản sao có hậu tố.
+        real_exists = default_storage.exists
+        checks = []
+
+        def exists(name):
+            checks.append(name)
+            return len(checks) > 1 and real_exists(name)
+
+        with mock.patch.object(default_storage, 'exists', side_effect=exists):
+            name = cv_storage.save('cvs/b.pdf', ContentFile(CV))
+        self.assertEqual(name, CV_NAME)
+        self.assertGreater(len(checks), 1)
+        self.assertEqual(self.stored_files(), [os.path.basename(CV_NAME)])
+
+    def test_file_exists_error_is_treated_as_a_duplicate(self):
+        with mock.patch.object(default_storage, 'save', side_effect=FileExistsError):
+            self.assertEqual(cv_storage.save('cvs/a.pdf', ContentFile(CV)), CV_NAME)
+
+    def test_rejects_path_traversal(self):
+        with self.assertRaises(SuspiciousFileOperation):
+            cv_storage.save('../cvs/a.pdf', ContentFile(CV))
+
+class CVRecordsTestCase(CVStorageTestCase):
+    def setUp(self):
+        super().setUp()
+        recruiter = CustomUser.objects.create_user(username='ntd', password='x', user_type='recruiter')
+        self.candidate = CustomUser.objects.create_user(username='ungvien', password='x', user_type='candidate')
+        self.jobs = [
+            JobPosting.objects.create(recruiter=recruiter, title=title, description='Mô tả.')
+            for title in ('Kế toán', 'Kiểm toán')
+        ]
+
+    def apply(self, job):
+        application = Application(job=job, candidate=self.candidate)
+        application.cv.save('cv.pdf', ContentFile(CV), save=True)
+        return application
+
+class ReleaseCVFilesTests(CVRecordsTestCase):
+    def test_shared_file_is_deleted_only_after_the_last_reference(self):
+        first, second = self.apply(self.jobs[0]), self.apply(self.jobs[1])
+        self.assertEqual(first.cv.name, second.cv.name)
+
+        first.delete()
+        release_cv_files([first.cv.name])
+        self.assertTrue(cv_storage.exists(CV_NAME))
+
+        second.delete()
+        release_cv_files([second.cv.name])
+        self.assertFalse(cv_storage.exists(CV_NAME))
+
+    def test_profile_reference_keeps_the_file(self):
+        application = self.apply(self.jobs[0])
+        profile, _ = Profile.objects.get_or_create(user=self.candidate)
+        Profile.objects.filter(pk=profile.pk).update(cv_file=application.cv.name)
+
+        application.delete()
+        release_cv_files([application.cv.name])
+        self.assertTrue(cv_storage.exists(CV_NAME))
+
+class MigrateCVStorageTests(CVRecordsTestCase):
+    def test_moves_legacy_files_to_hashed_names(self):
+        for job, legacy in zip(self.jobs, ('cvs/cv_cu.pdf', 'cvs/cv_cu_ban_sao.pdf')):
+            default_storage.save(legacy, ContentFile(CV))
+            Application.objects.create(job=job, candidate=self.candidate, cv=legacy)
+
+        call_command('migrate_cv_storage', stdout=StringIO(), stderr=StringIO())
+
+        self.assertEqual(set(Application.objects.values_list('cv', 'cv_sha256')),
+                         {(CV_NAME, hashlib.sha256(CV).hexdigest())})
+        self.assertEqual(self.stored_files(), [os.path.basename(CV_NAME)])
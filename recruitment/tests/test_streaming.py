@@ -0,0 +1,66 @@
+import asyncio
+import json
+from django.test import TransactionTestCase, SimpleTestCase, override_settings
+from django.urls import reverse
+from recruitment import circuit, llm, llm_backends, ratelimit
+from recruitment.models import CustomUser
+
+FAKE_LLM = dict(LLM_BACKEND='fake', LLM_FAKE_LATENCY=0, LLM_FAKE_ERROR_RATE=0, LLM_TELEMETRY=False, LLM_MAX_RETRIES=0)
+
+@override_settings(LLM_RATE_LIMIT_RPS=1000, LLM_RATE_LIMIT_BURST=1000, LLM_CONCURRENCY={'interactive': 1}, **FAKE_LLM)
+class StreamSlotTests(SimpleTestCase):
+    def setUp(self):
+        llm_backends.reset_fake()
+        circuit.set_breaker(circuit.CircuitBreaker())
+        self.addCleanup(circuit.set_breaker, None)
+        ratelimit.set_backend(ratelimit.LocalBackend())
+        self.addCleanup(ratelimit.set_backend, None)
+        # Semaphore được tạo lại theo LLM_CONCURRENCY của test này.
+        ratelimit._async_semaphores.pop(llm._llm_loop(), None)
+
+    def slot(self):
+        # Lời gọi async chạy trên loop nền của llm, nơi giữ semaphore của ratelimit.
+        return ratelimit._async_semaphores[llm._llm_loop()]['interactive']
+
+    def test_slot_is_held_until_the_stream_ends(self):
+        async def run():
+            stream = llm.astream("Xin chào", site='test')
+            await stream.__anext__()
+            semaphore = self.slot()
+            held = semaphore.locked()
+            async for _ in stream:
+                pass
+            return held, semaphore.locked()
+
+        self.assertEqual(asyncio.run(run()), (True, False))
+
+    def test_slot_is_released_when_the_consumer_stops_early(self):
+        async def run():
+            stream = llm.astream("Xin chào", site='test')
+            await stream.__anext__()
+            await stream.aclose()
+            return self.slot().locked()
+
+        self.assertFalse(asyncio.run(run()))
+
+@override_settings(LLM_RATE_LIMIT_RPS=0, CHATBOT_CACHE_TTL=3600, **FAKE_LLM)
+class ChatStreamViewTests(TransactionTestCase):
+    # Câu trả lời được lưu vào answer_cache từ thread của sync_to_async, nên cần dữ liệu đã commit.
+    def setUp(self):
+        llm_backends.reset_fake()
+        circuit.set_breaker(circuit.CircuitBreaker())
+        self.addCleanup(circuit.set_breaker, None)
+        user = CustomUser.objects.create_user(username='ungvien', password='x', user_type='candidate')
+        self.client.force_login(user)
+
+    def test_streams_chunks_under_wsgi(self):
+        response = self.client.post(
+            reverse('chat_stream_api'), json.dumps({'message': 'Cách viết CV?'}), content_type='application/json'
+        )
+        self.assertTrue(response.streaming)
+        # Iterator đồng bộ: server WSGI gửi từng đoạn, không phải đợi Django gom cả câu trả lời.
+        self.assertFalse(response.is_async)
+        frames = [chunk.decode() for chunk in response.streaming_content]
+        self.assertGreater(len(frames), 2)
+        self.assertTrue(frames[0].startswith('data: {"delta"'))
+        self.assertEqual(frames[-1], 'event: done\ndata: {}\n\n')
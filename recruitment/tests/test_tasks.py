@@ -0,0 +1,55 @@
+import threading
+from unittest import mock
+from django.test import TransactionTestCase, override_settings
+from recruitment import circuit, llm_backends, tasks
+from recruitment.management.commands.run_workers import Command
+from recruitment.models import CustomUser, JobPosting, Application, Task
+
+@override_settings(LLM_BACKEND='fake', LLM_FAKE_LATENCY=0, LLM_FAKE_ERROR_RATE=0, LLM_RATE_LIMIT_RPS=0,
+                   LLM_TELEMETRY=False, LLM_MAX_RETRIES=0, TASK_MAX_ATTEMPTS=2, TASK_RETRY_BACKOFF=0)
+class WorkerLoopTests(TransactionTestCase):
+    # Worker gọi close_old_connections() như khi chạy thật, nên không bọc test trong transaction.
+    def setUp(self):
+        llm_backends.reset_fake()
+        circuit.set_breaker(circuit.CircuitBreaker())
+        self.addCleanup(circuit.set_breaker, None)
+        recruiter = CustomUser.objects.create_user(username='ntd', password='x', user_type='recruiter')
+        candidate = CustomUser.objects.create_user(username='ungvien', password='x', user_type='candidate')
+        job = JobPosting.objects.create(recruiter=recruiter, title='Lập trình viên Python', description='Python, Django.')
+        self.application = Application.objects.create(job=job, candidate=candidate, cv='cvs/a.pdf')
+
+    def run_worker_once(self):
+        command = Command()
+        command.stop = threading.Event()
+        counters = {'done': 0, 'failed': 0}
+        command.work('test/0', poll_interval=0, burst=True, counters=counters, lock=threading.Lock())
+        return counters
+
+    @mock.patch('recruitment.scoring.cv_text_for', return_value="Lập trình viên Python Django 3 năm.")
+    def test_enqueued_task_is_run_by_the_worker(self, _):
+        tasks.enqueue('score_application', application_id=self.application.pk)
+        self.assertEqual(self.run_worker_once(), {'done': 1, 'failed': 0})
+        self.application.refresh_from_db()
+        self.assertIsNotNone(self.application.ai_score)
+        self.assertFalse(self.application.ai_score_provisional)
+        self.assertFalse(Task.objects.exists())
+
+    @mock.patch('recruitment.scoring.cv_text_for', return_value="Lập trình viên Python Django 3 năm.")
+    @mock.patch('recruitment.tasks.screen_application', side_effect=RuntimeError("Lỗi đọc file"))
+    def test_failing_task_is_retried_then_dead_lettered_with_a_provisional_score(self, *_):
+        tasks.enqueue('score_application', application_id=self.application.pk)
+        self.assertEqual(self.run_worker_once(), {'done': 0, 'failed': 2})
+        task_obj = Task.objects.get(name='score_application')
+        self.assertEqual(task_obj.status, 'dead')
+        self.assertIn("Lỗi đọc file", task_obj.last_error)
+        self.application.refresh_from_db()
+        self.assertTrue(self.application.ai_score_provisional)
+
+    @mock.patch('recruitment.scoring.cv_text_for', return_value="Lập trình viên Python Django 3 năm.")
+    @mock.patch('recruitment.scoring.llm.complete', return_value={'score': 250, 'summary': 'Rất tốt'})
+    def test_out_of_range_ai_score_ends_as_a_provisional_score(self, *_):
+        tasks.enqueue('score_application', application_id=self.application.pk)
+        self.assertEqual(self.run_worker_once(), {'done': 0, 'failed': 2})
+        self.application.refresh_from_db()
+        self.assertTrue(self.application.ai_score_provisional)
+        self.assertLessEqual(self.application.ai_score, 100)
@@ -0,0 +1,72 @@
+import time
+import asyncio
+from unittest import mock
+from datetime import timedelta
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from recruitment import circuit, compaction, llm, llm_backends, telemetry
+from recruitment.models import LLMCall
+
+@override_settings(LLM_TELEMETRY=True, LLM_TELEMETRY_RETENTION_DAYS=14)
+class TelemetryPruneTests(TestCase):
+    def setUp(self):
+        LLMCall.objects.bulk_create([LLMCall(call_site='match', model='m', status='ok', latency_ms=10) for _ in range(7)])
+        LLMCall.objects.update(created_at=timezone.now() - timedelta(days=30))
+
+    def test_record_does_not_prune_on_the_request_path(self):
+        with self.assertNumQueries(1):
+            telemetry.record('chatbot', 'm', 'ok', time.perf_counter())
+        self.assertEqual(LLMCall.objects.count(), 8)
+
+    def test_prune_deletes_old_rows_in_batches(self):
+        telemetry.record('chatbot', 'm', 'ok', time.perf_counter())
+        with self.assertNumQueries(7):
+            # 3 lô (3 + 3 + 1 dòng), mỗi lô một SELECT id và một DELETE, thêm một SELECT rỗng để dừng.
+            self.assertEqual(telemetry.prune(batch_size=3), 7)
+        self.assertEqual(list(LLMCall.objects.values_list('call_site', flat=True)), ['chatbot'])
+
+# CV dài hơn nhiều so với ngân sách 'match' để việc rút gọn thật sự bớt token.
+LONG_CV = "Kỹ năng\nPython, Django, PostgreSQL\nSở thích\n" + "Đọc sách, du lịch, chơi cờ vua cuối tuần. " * 400
+
+@override_settings(LLM_BACKEND='fake', LLM_FAKE_LATENCY=0, LLM_FAKE_ERROR_RATE=0, LLM_RATE_LIMIT_RPS=0,
+                   LLM_TELEMETRY=True, LLM_MAX_RETRIES=0,
+                   PROMPT_TOKEN_BUDGETS={'match': {'cv': 200, 'jd': 100}})
+class CompactionTelemetryTests(TransactionTestCase):
+    # Lời gọi async ghi LLMCall từ loop nền của llm (thread khác), nên cần dữ liệu đã commit.
+    def setUp(self):
+        llm_backends.reset_fake()
+        circuit.set_breaker(circuit.CircuitBreaker())
+        self.addCleanup(circuit.set_breaker, None)
+        compaction.take_counts()
+
+    def test_compacted_tokens_are_stored_on_the_next_call_only(self):
+        cv_text, jd_text = compaction.fit_prompt('match', LONG_CV, "Tuyển lập trình viên Python.")
+        llm.complete(f"{jd_text}\n{cv_text}", site='match')
+        llm.complete("Xin chào", site='chatbot')
+
+        match = LLMCall.objects.get(call_site='match')
+        self.assertGreater(match.tokens_before, match.tokens_after)
+        self.assertEqual(match.tokens_after, compaction.count_tokens(cv_text) + compaction.count_tokens(jd_text))
+        chatbot = LLMCall.objects.get(call_site='chatbot')
+        self.assertEqual((chatbot.tokens_before, chatbot.tokens_after), (0, 0))
+
+        saved = telemetry.summarize()['match']['compaction']
+        self.assertEqual(saved['tokens_saved'], match.tokens_before - match.tokens_after)
+
+    def test_async_call_takes_counts_from_the_caller_context(self):
+        async def score():
+            cv_text, _ = compaction.fit_prompt('match', LONG_CV)
+            await llm.acomplete(cv_text, site='match')
+
+        asyncio.run(score())
+        match = LLMCall.objects.get(call_site='match')
+        self.assertGreater(match.tokens_before, match.tokens_after)
+
+@override_settings(LLM_TELEMETRY=True)
+class AsyncRecordTests(TransactionTestCase):
+    def test_connections_are_cleaned_up_around_the_write(self):
+        # arecord() chạy trên loop nền, ngoài request: phải tự dọn kết nối như request_started/finished.
+        with mock.patch('recruitment.db.close_old_connections') as close_old_connections:
+            asyncio.run(telemetry.arecord('chatbot', 'm', 'ok', time.perf_counter()))
+        self.assertEqual(close_old_connections.call_count, 2)
+        self.assertTrue(LLMCall.objects.filter(call_site='chatbot').exists())
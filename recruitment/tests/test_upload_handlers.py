@@ -0,0 +1,37 @@
+import hashlib
+from unittest import mock
+from django.core.files.uploadedfile import InMemoryUploadedFile, SimpleUploadedFile, TemporaryUploadedFile
+from django.test import RequestFactory, TestCase
+from recruitment import utils
+from recruitment.models import CVText
+
+CV = b'%PDF-1.4 ' + b'Nguyen Van A - Lap trinh vien Python. ' * 4000
+
+class CVUploadHandlerTests(TestCase):
+    def upload(self, **files):
+        request = RequestFactory().post('/', {name: SimpleUploadedFile(f'{name}.pdf', data) for name, data in files.items()})
+        return request.FILES
+
+    def test_cv_fields_are_hashed_while_receiving(self):
+        files = self.upload(cv=CV, cv_file=CV)
+        for field_name in ('cv', 'cv_file'):
+            with self.subTest(field=field_name):
+                uploaded = files[field_name]
+                self.assertIsInstance(uploaded, TemporaryUploadedFile)
+                self.assertEqual(uploaded.sha256, hashlib.sha256(CV).hexdigest())
+                self.assertEqual(uploaded.read(), CV)
+
+    def test_other_fields_use_the_default_handlers(self):
+        uploaded = self.upload(avatar=b'anh')['avatar']
+        self.assertIsInstance(uploaded, InMemoryUploadedFile)
+        self.assertFalse(hasattr(uploaded, 'sha256'))
+
+    def test_ensure_cv_text_uses_the_upload_hash_without_reading_the_file(self):
+        uploaded = self.upload(cv=CV)['cv']
+        with mock.patch.object(utils, 'read_cv_bytes') as read_cv_bytes, \
+                mock.patch.object(utils, 'extract_text_from_path', return_value="Lập trình viên Python") as extract:
+            digest, text = utils.ensure_cv_text(uploaded)
+        read_cv_bytes.assert_not_called()
+        extract.assert_called_once_with(uploaded.temporary_file_path(), '.pdf')
+        self.assertEqual(digest, hashlib.sha256(CV).hexdigest())
+        self.assertEqual(CVText.objects.get(sha256=digest).text, text)
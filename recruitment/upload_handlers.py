@@ -0,0 +1,33 @@
+import hashlib
+from django.core.files.uploadhandler import TemporaryFileUploadHandler, StopFutureHandlers
+
+class CVUploadHandler(TemporaryFileUploadHandler):
+    """
+    Upload handler cho các trường CV ('cv', 'cv_file').
+    Trong lúc file đang được nhận, từng khối dữ liệu vừa được ghi ra file tạm vừa được
+    đưa vào SHA-256, nên khi request tới view thì mã băm đã có sẵn (thuộc tính sha256)
+    và không cần đọc lại cả file vào bộ nhớ. Các trường file khác được chuyển tiếp
+    cho các handler mặc định của Django.
+    """
+    cv_field_names = ('cv', 'cv_file')
+
+    def new_file(self, field_name, *args, **kwargs):
+        self.activated = field_name in self.cv_field_names
+        if not self.activated:
+            return
+        super().new_file(field_name, *args, **kwargs)
+        self.hasher = hashlib.sha256()
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.activated:
+            return raw_data
+        self.hasher.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        if not self.activated:
+            return None
+        uploaded_file = super().file_complete(file_size)
+        uploaded_file.sha256 = self.hasher.hexdigest()
+        return uploaded_file
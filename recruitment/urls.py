@@ -9,10 +9,12 @@ urlpatterns = [
     path('jobs/', views.job_board_view, name='job_board'),
     path('profile/', views.profile_view, name='profile'),
     path('job-matches/', views.job_match_view, name='job_matches'),
+    path('api/job-matches/more/', views.job_match_more_api, name='job_matches_more'),
     path('cv-review/', views.cv_review_view, name='cv_review'),
     path('notifications/', views.notification_list_view, name='notifications'),
     path('chatbot/', views.chatbot_view, name='chatbot'),
     path('api/chat/', views.chat_api_view, name='chat_api'),
+    path('api/chat/stream/', views.chat_stream_api_view, name='chat_stream_api'),
     path('dashboard/', views.recruiter_dashboard, name='recruiter_dashboard'),
     path('create-job/', views.create_job, name='create_job'),
     path('create-job/review/', views.create_job_review, name='create_job_review'),
@@ -32,6 +34,7 @@ urlpatterns = [
     path('job/<int:job_id>/hard-delete/', views.hard_delete_job_view, name='hard_delete_job'),
     path('application/<int:application_id>/process/', views.process_application_view, name='process_application'),
     path('api/analytics-summary/', views.analytics_summary_api, name='analytics_summary_api'),
+    path('api/llm-metrics/', views.llm_metrics_api, name='llm_metrics_api'),
     path('application/<int:application_id>/result/', views.application_result_view, name='application_result'),
     path('templates/', views.manage_templates_view, name='manage_templates'),
     path('api/analyze-cv-job/', views.analyze_cv_for_job_api, name='analyze_cv_for_job_api'),
@@ -1,36 +1,84 @@
 import os
-import fitz  
-import docx
+import hashlib
+from django.db.models.fields.files import FieldFile
+from .models import CVText
+from .extraction import extract_text, extract_text_from_path
 
-def extract_text_from_cv(cv_file):
+def read_cv_bytes(cv_file):
     """
-    Trích xuất văn bản từ file CV (hỗ trợ cả PDF và DOCX).
-    cv_file là một đối tượng FieldFile của Django.
+    Đọc toàn bộ nội dung file CV.
+    cv_file có thể là FieldFile đã lưu hoặc file vừa upload (chưa lưu). Với file vừa upload,
+    file không bị đóng để Django vẫn lưu được nó sau đó.
     """
-    try:
-        file_name, file_extension = os.path.splitext(cv_file.name)
-        file_extension = file_extension.lower()
-
-        text = ""
-        
+    if isinstance(cv_file, FieldFile) and cv_file._committed:
         with cv_file.open('rb') as f:
-            if file_extension == '.pdf':
-                doc = fitz.open(stream=f, filetype='pdf')
-                for page in doc:
-                    text += page.get_text()
-                doc.close()
-                
-            elif file_extension == '.docx':
-                doc = docx.Document(f)
-                for para in doc.paragraphs:
-                    text += para.text + '\n'
-            
-            else:
-                print(f"Định dạng file không được hỗ trợ: {file_extension}")
-                return None
-
-        return text
+            return f.read()
+
+    cv_file.seek(0)
+    data = cv_file.read()
+    cv_file.seek(0)
+    return data
+
+def _pending_upload(cv_file):
+    """Trả về file upload chưa được lưu nằm sau cv_file, hoặc None nếu cv_file đã được lưu."""
+    if isinstance(cv_file, FieldFile):
+        return None if cv_file._committed else cv_file.file
+    return cv_file
+
+def ensure_cv_text(cv_file):
+    """
+    Tính SHA-256 của file CV và đảm bảo văn bản của nó có trong kho CVText.
+    File có cùng nội dung chỉ bị phân tích (PyMuPDF/lxml) đúng một lần.
+    Với file nhận qua CVUploadHandler, mã băm đã được tính trong lúc upload và file tạm
+    được trích xuất trực tiếp mà không đọc lại vào bộ nhớ.
+    Trả về (sha256, text); text là None nếu không đọc được file.
+    """
+    upload = _pending_upload(cv_file)
+    digest = getattr(upload, 'sha256', '')
+    data = None
+    if not digest:
+        try:
+            data = read_cv_bytes(cv_file)
+        except Exception as e:
+            print(f"Lỗi nghiêm trọng khi đọc file CV '{cv_file.name}': {e}")
+            return '', None
+        digest = hashlib.sha256(data).hexdigest()
+
+    cached = CVText.objects.filter(sha256=digest).values_list('text', flat=True).first()
+    if cached is not None:
+        return digest, cached
 
+    try:
+        _, file_extension = os.path.splitext(cv_file.name)
+        if data is None:
+            text = extract_text_from_path(upload.temporary_file_path(), file_extension)
+        else:
+            text = extract_text(data, file_extension)
     except Exception as e:
         print(f"Lỗi nghiêm trọng khi đọc file CV '{cv_file.name}': {e}")
-        return None
\ No newline at end of file
+        text = None
+
+    if text is not None:
+        CVText.objects.get_or_create(sha256=digest, defaults={'text': text})
+    return digest, text
+
+def cv_text_for(instance, file_attr='cv'):
+    """
+    Lấy văn bản CV của một Application (file_attr='cv') hoặc Profile (file_attr='cv_file').
+    Nếu bản ghi đã có cv_sha256 thì chỉ cần một truy vấn theo chỉ mục; nếu chưa,
+    file được đọc một lần và mã băm được lưu lại cho các lần sau.
+    """
+    cv_file = getattr(instance, file_attr)
+    if not cv_file:
+        return None
+
+    if instance.cv_sha256:
+        text = CVText.objects.filter(sha256=instance.cv_sha256).values_list('text', flat=True).first()
+        if text is not None:
+            return text
+
+    digest, text = ensure_cv_text(cv_file)
+    if digest and digest != instance.cv_sha256:
+        type(instance).objects.filter(pk=instance.pk).update(cv_sha256=digest)
+        instance.cv_sha256 = digest
+    return text
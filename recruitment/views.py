@@ -1,4 +1,5 @@
-import json, fitz, docx, groq, random, re, traceback, datetime
+import json, random, re, traceback, datetime, asyncio
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.utils import timezone
 from django.shortcuts import render, redirect, get_object_or_404
@@ -8,13 +9,19 @@ from django.urls import reverse_lazy
 from django.views import generic
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Count, Max, OuterRef, Exists, Avg, Sum
+from django.db.models import Q, Count, Max, Min, OuterRef, Exists, Avg, Sum, Value, FloatField
 from django.urls import reverse
-from django.http import JsonResponse
-from .utils import extract_text_from_cv
+from django.http import JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from .utils import ensure_cv_text, cv_text_for
+from .storage import release_cv_files
+from . import llm, tasks, answer_cache, telemetry, fulltext, pagination, facets
+from .scoring import review_cv, score_jobs_async, job_text, AI_PENDING_SUMMARY
+from .search import rank_jobs, hybrid_rank, has_features, fold_key, province_key, VIETNAM_PROVINCES
+from .compaction import fit_many
 from django.contrib.auth.forms import AuthenticationForm
-from django.db.models.functions import TruncDate
-from .models import JobPosting, Application, Profile, Notification, DirectMessage, EmailTemplate, Interview
+from django.db.models.functions import TruncDate, Coalesce
+from .models import JobPosting, Application, Profile, Notification, DirectMessage, EmailTemplate, Interview, CVText
 from django.template import Context, Template
 
 CustomUser = get_user_model()
@@ -74,37 +81,6 @@ Trân trọng,
 {{recruiter_name}}"""
 }
 
-VIETNAM_PROVINCES = [
-    "Hà Nội",
-    "Hồ Chí Minh",
-    "Đà Nẵng",
-    "Hải Phòng",
-    "Cần Thơ",
-    "Bắc Ninh",
-    "Bình Dương",
-    "Đồng Nai",
-    "Khánh Hòa",
-    "Quảng Ninh",
-]
-
-def extract_text_from_cv(cv_file):
-    text = ""
-    try:
-        cv_file.seek(0)
-        if cv_file.name.lower().endswith('.pdf'):
-            with fitz.open(stream=cv_file.read(), filetype="pdf") as doc:
-                for page in doc:
-                    text += page.get_text()
-        elif cv_file.name.lower().endswith('.docx'):
-            doc = docx.Document(cv_file)
-            for para in doc.paragraphs:
-                text += para.text + "\n"
-        else:
-            text = "Định dạng file không được hỗ trợ (chỉ hỗ trợ PDF và DOCX)."
-    except Exception as e:
-        print(f"Lỗi khi đọc file CV: {e}")
-    return text
-
 @login_required
 def create_job(request):
     if request.user.user_type != 'recruiter':
@@ -118,12 +94,7 @@ def create_job(request):
 
         generated_jd = "Không thể tạo JD."
         try:
-            client = groq.Groq(api_key=settings.GROQ_API_KEY)
-            chat_completion = client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model="llama-3.1-8b-instant",
-            )
-            generated_jd = chat_completion.choices[0].message.content
+            generated_jd = llm.complete(prompt, site='generate_jd')
         except Exception as e:
             print(f"Lỗi Groq API khi tạo JD: {e}")
             messages.error(request, 'AI đang gặp sự cố, vui lòng thử lại.')
@@ -161,75 +132,118 @@ def job_detail(request, job_id):
             messages.error(request, 'Vui lòng chọn một file CV để nộp.')
             return redirect('job_detail', job_id=job_id)
         
-        cv_text = extract_text_from_cv(cv_file)
+        cv_sha256, cv_text = ensure_cv_text(cv_file)
         if not cv_text:
             messages.error(request, 'Không thể đọc được file CV. Chỉ hỗ trợ PDF và DOCX.')
             return redirect('job_detail', job_id=job_id)
 
-        prompt = f"""Phân tích JD và CV dưới đây.
-        JD: {job.description}
-        CV: {cv_text}
-        Hãy trả về kết quả là một chuỗi json và không có bất kỳ văn bản nào khác. Json object phải có 2 key: "score" (với thang điểm từ 0-100) và "summary" """
-        
-        ai_score, ai_summary = 0, "Không thể phân tích."
-        try:
-            client = groq.Groq(api_key=settings.GROQ_API_KEY)
-            chat_completion = client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": "Bạn là một AI chuyên sàng lọc CV, chỉ trả về kết quả dưới dạng JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                model="llama-3.1-8b-instant" 
-            )
-            response_text = chat_completion.choices[0].message.content
-            ai_result = json.loads(response_text)
-            ai_score = ai_result.get('score', 0)
-            ai_summary = ai_result.get('summary', 'Lỗi tóm tắt.')
-        except Exception as e:
-            print(f"Lỗi Groq API khi sàng lọc CV (job_detail POST): {e}")
-
         new_application = Application.objects.create(
             job=job, 
             candidate=request.user, 
             cv=cv_file, 
-            ai_score=ai_score, 
-            ai_summary=ai_summary
+            cv_sha256=cv_sha256,
+            ai_score=None, 
+            ai_summary=AI_PENDING_SUMMARY
         )
+        tasks.enqueue('score_application', application_id=new_application.id)
         
         set_as_default = request.POST.get('set_as_default')
         if set_as_default:
             try:
                 profile = request.user.profile
                 profile.cv_file = new_application.cv 
+                profile.cv_sha256 = new_application.cv_sha256
                 profile.save()
             except Profile.DoesNotExist:
-                Profile.objects.create(user=request.user, cv_file=new_application.cv)
+                Profile.objects.create(user=request.user, cv_file=new_application.cv, cv_sha256=new_application.cv_sha256)
         
         messages.success(request, 'Bạn đã nộp hồ sơ thành công!')
         return redirect('job_detail', job_id=job_id)
         
     return render(request, 'recruitment/job_detail.html', {'job': job, 'my_application': my_application})
 
+def _chat_prompt(user_message):
+    return f"""Bạn là một trợ lý tuyển dụng AI thân thiện. Hãy trả lời câu hỏi của ứng viên một cách ngắn gọn, hữu ích. Câu hỏi: "{user_message}" """
+
 @login_required
 def chat_api_view(request):
     if request.method == 'POST':
         data = json.loads(request.body)
         user_message = data.get('message')
-        prompt = f"""Bạn là một trợ lý tuyển dụng AI thân thiện. Hãy trả lời câu hỏi của ứng viên một cách ngắn gọn, hữu ích. Câu hỏi: "{user_message}" """
         
-        bot_response = "Lỗi kết nối đến AI."
-        try:
-            client = groq.Groq(api_key=settings.GROQ_API_KEY)
-            chat_completion = client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model="llama-3.1-8b-instant"
-            )
-            bot_response = chat_completion.choices[0].message.content
-        except Exception as e:
-            print(f"Lỗi Groq API (Chatbot): {e}")
+        bot_response = answer_cache.lookup(user_message)
+        if bot_response is None:
+            bot_response = "Lỗi kết nối đến AI."
+            try:
+                bot_response = llm.complete(_chat_prompt(user_message), site='chatbot')
+                answer_cache.store(user_message, bot_response.strip())
+            except Exception as e:
+                print(f"Lỗi Groq API (Chatbot): {e}")
 
         return JsonResponse({'response': bot_response.strip()})
     return JsonResponse({'error': 'Invalid request method'}, status=405)
+
+def _sse(data, event=None):
+    frame = f"event: {event}\n" if event else ""
+    return frame + f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def _sync_stream(agen):
+    """
+    Chạy async generator trên một event loop riêng và yield từng phần. Dưới WSGI (gunicorn), Django
+    gom hết một async iterator rồi mới gửi; iterator đồng bộ này để server gửi từng đoạn ngay.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        # Người dùng ngắt kết nối giữa chừng: đóng generator để trả lại lượt gọi AI.
+        loop.run_until_complete(agen.aclose())
+        loop.close()
+
+@login_required
+async def chat_stream_api_view(request):
+    """
+    Giống chat_api_view nhưng trả lời dạng Server-Sent Events: mỗi đoạn văn bản model sinh ra
+    được gửi ngay ("data: {"delta": ...}"), kết thúc bằng "event: done" hoặc "event: error".
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method'}, status=405)
+    try:
+        user_message = json.loads(request.body).get('message')
+    except (ValueError, AttributeError):
+        user_message = None
+    if not user_message:
+        return JsonResponse({'error': 'Vui lòng nhập câu hỏi.'}, status=400)
+
+    cached_answer = await sync_to_async(answer_cache.lookup)(user_message)
+
+    async def events():
+        if cached_answer is not None:
+            yield _sse({'delta': cached_answer})
+            yield _sse({}, event='done')
+            return
+        parts = []
+        try:
+            async for delta in llm.astream(_chat_prompt(user_message), site='chatbot_stream'):
+                parts.append(delta)
+                yield _sse({'delta': delta})
+        except llm.LLMError as e:
+            print(f"Lỗi Groq API (Chatbot stream): {e}")
+            yield _sse({'error': 'Lỗi kết nối đến AI.'}, event='error')
+            return
+        yield _sse({}, event='done')
+        await sync_to_async(answer_cache.store)(user_message, ''.join(parts).strip())
+
+    # ASGI (uvicorn) gửi async iterator từng đoạn; WSGI cần iterator đồng bộ.
+    content = events() if isinstance(request, ASGIRequest) else _sync_stream(events())
+    response = StreamingHttpResponse(content, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 class RegisterView(generic.CreateView):
     form_class = CustomUserCreationForm
     template_name = 'registration/register.html'
@@ -265,7 +279,10 @@ def profile_view(request):
         form = FormClass(request.POST, request.FILES, instance=profile)
         
         if form.is_valid():
-            form.save()
+            profile = form.save(commit=False)
+            if 'cv_file' in form.changed_data:
+                profile.cv_sha256 = ensure_cv_text(profile.cv_file)[0] if profile.cv_file else ''
+            profile.save()
             messages.success(request, 'Hồ sơ của bạn đã được cập nhật thành công!')
             return redirect('profile') 
         else:
@@ -314,10 +331,12 @@ def recruiter_dashboard(request):
 def applicant_list_view(request, job_id):
     job = get_object_or_404(JobPosting, pk=job_id, recruiter=request.user)
     applications = Application.objects.filter(job=job).select_related('candidate__profile')
+    page = pagination.paginate(request, applications, ('-applied_at', '-id'))
 
     context = {
         'job': job,
-        'applications': applications
+        'applications': page,
+        'page': page,
     }
     return render(request, 'recruitment/applicant_list.html', context)
 
@@ -325,52 +344,85 @@ def applicant_list_view(request, job_id):
 def chatbot_view(request):
     return render(request, 'recruitment/chatbot.html')
 
+def _matched_jobs(jobs, scores, provisional=()):
+    matched_jobs_with_scores = []
+    for job in jobs:
+        score = scores.get(job.id)
+        if score is not None and score > 20:
+            job.match_score = score
+            job.is_provisional = job.id in provisional
+            matched_jobs_with_scores.append(job)
+    matched_jobs_with_scores.sort(key=lambda x: x.match_score, reverse=True)
+    return matched_jobs_with_scores
+
 @login_required
-def job_match_view(request):
-    profile, created = Profile.objects.get_or_create(user=request.user)
+async def job_match_view(request):
+    user = await request.auser()
+    profile, created = await Profile.objects.aget_or_create(user=user)
     
     if not profile.cv_file:
         context = {'has_cv': False}
-        return render(request, 'recruitment/job_matches.html', context)
+        return await sync_to_async(render)(request, 'recruitment/job_matches.html', context)
 
     try:
-        cv_text = extract_text_from_cv(profile.cv_file)
+        cv_text = await sync_to_async(cv_text_for)(profile, 'cv_file')
         if not cv_text:
             context = {'error_message': 'Không thể đọc được nội dung từ file CV của bạn.'}
-            return render(request, 'recruitment/job_matches.html', context)
-
-        print("\n--- BẮT ĐẦU PHÂN TÍCH TÌM VIỆC ---")
-        print(f"NỘI DUNG CV ĐÃ ĐỌC (150 ký tự đầu): {cv_text[:150]}...")
-        print("------------------------------------")
+            return await sync_to_async(render)(request, 'recruitment/job_matches.html', context)
 
-        all_jobs = JobPosting.objects.all()
-        matched_jobs_with_scores = []
-
-        for job in all_jobs:
-            print(f"Đang phân tích Job: '{job.title}'")
-            score = get_ai_match_score(cv_text, job.description)
-            print(f"-> Điểm AI trả về: {score}") 
-            
-            if score > 20:
-                job.match_score = score
-                matched_jobs_with_scores.append(job)
-                print("-> KẾT QUẢ: Job được thêm vào danh sách.")
-            else:
-                print("-> KẾT QUẢ: Job bị loại do điểm thấp.")
-            print("---") 
-
-        matched_jobs_with_scores.sort(key=lambda x: x.match_score, reverse=True)
+        open_jobs = [job async for job in JobPosting.objects.filter(is_archived=False).select_related('recruiter')]
+        candidate_jobs = await sync_to_async(rank_jobs, thread_sensitive=False)(cv_text, open_jobs)
+        scores, pending_job_ids, provisional = await score_jobs_async(cv_text, candidate_jobs)
                 
         context = {
             'has_cv': True,
-            'matched_jobs': matched_jobs_with_scores
+            'matched_jobs': _matched_jobs(candidate_jobs, scores, provisional),
+            'pending_job_ids': pending_job_ids,
         }
-        return render(request, 'recruitment/job_matches.html', context)
+        return await sync_to_async(render)(request, 'recruitment/job_matches.html', context)
         
     except Exception as e:
         print(f"Lỗi nghiêm trọng trong job_match_view: {e}")
         context = {'error_message': 'Đã có lỗi nghiêm trọng xảy ra trong quá trình tìm kiếm.'}
-        return render(request, 'recruitment/job_matches.html', context)
+        return await sync_to_async(render)(request, 'recruitment/job_matches.html', context)
+
+@login_required
+async def job_match_more_api(request):
+    """Chấm tiếp các job còn dang dở của trang "AI Tìm việc phù hợp" (gọi bằng JS sau khi trang đã hiển thị)."""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method'}, status=405)
+
+    try:
+        job_ids = json.loads(request.body).get('job_ids', [])
+    except (ValueError, AttributeError):
+        job_ids = None
+    # Trang chỉ gửi lại các job còn dang dở trong top JOB_MATCH_TOP_K, nên không bao giờ nhiều hơn số đó.
+    if (
+        not isinstance(job_ids, list)
+        or len(job_ids) > getattr(settings, 'JOB_MATCH_TOP_K', 20)
+        or not all(type(job_id) is int for job_id in job_ids)
+    ):
+        return JsonResponse({'success': False, 'error': 'Yêu cầu không hợp lệ'}, status=400)
+
+    user = await request.auser()
+    profile, _ = await Profile.objects.aget_or_create(user=user)
+    cv_text = await sync_to_async(cv_text_for)(profile, 'cv_file') if profile.cv_file else None
+    if not cv_text:
+        return JsonResponse({'success': False, 'error': 'Không thể đọc được nội dung từ file CV của bạn.'})
+
+    jobs = [job async for job in JobPosting.objects.select_related('recruiter').filter(id__in=job_ids, is_archived=False)]
+    scores, pending_job_ids, provisional = await score_jobs_async(cv_text, jobs)
+    matched = [{
+        'id': job.id,
+        'title': job.title,
+        'recruiter': job.recruiter.username,
+        'location': job.location or '',
+        'score': job.match_score,
+        'provisional': job.is_provisional,
+        'detail_url': reverse('job_detail', args=[job.id]),
+        'apply_url': reverse('apply_with_profile', args=[job.id]),
+    } for job in _matched_jobs(jobs, scores, provisional)]
+    return JsonResponse({'success': True, 'matched_jobs': matched, 'pending_job_ids': pending_job_ids})
 
 @login_required
 def apply_with_profile_view(request, job_id):
@@ -389,13 +441,15 @@ def apply_with_profile_view(request, job_id):
         messages.error(request, 'Bạn chưa có CV trong hồ sơ để ứng tuyển.')
         return redirect('profile')
 
-    Application.objects.create(
+    application = Application.objects.create(
         job=job, 
         candidate=request.user, 
         cv=profile.cv_file, 
-        ai_score=0, 
-        ai_summary="Ứng tuyển bằng hồ sơ có sẵn. (Chưa chạy phân tích)" 
+        cv_sha256=profile.cv_sha256,
+        ai_score=None, 
+        ai_summary=AI_PENDING_SUMMARY 
     )
+    tasks.enqueue('score_application', application_id=application.id)
 
     messages.success(request, f'Bạn đã ứng tuyển thành công vào vị trí "{job.title}"!')
     
@@ -416,53 +470,18 @@ def analyze_cv_for_job_api(request):
         
         cv_text = ""
         if cv_file:
-            cv_text = extract_text_from_cv(cv_file)
+            _, cv_text = ensure_cv_text(cv_file)
         elif use_profile_cv == 'true':
             if not profile.cv_file:
                 return JsonResponse({'success': False, 'error': 'Bạn chưa tải CV lên hồ sơ.'})
-            cv_text = extract_text_from_cv(profile.cv_file)
+            cv_text = cv_text_for(profile, 'cv_file')
         else:
             return JsonResponse({'success': False, 'error': 'Không tìm thấy CV để phân tích.'})
 
         if not cv_text:
             return JsonResponse({'success': False, 'error': 'Không thể đọc được file CV.'})
 
-        ai_score = get_ai_match_score(cv_text, job.description)
-        
-        analysis_prompt = f"""
-        Một ứng viên có CV đạt {ai_score} điểm. Dựa trên CV và JD dưới đây, hãy trả về kết quả dưới dạng MỘT CHUỖI JSON HỢP LỆ và KHÔNG có gì khác.
-        JSON object chỉ cần có 2 key:
-        1. "strengths": (list) 2-3 điểm mạnh cụ thể.
-        2. "suggestions": (list) 2-3 gợi ý cải thiện.
-        
-        --- CV ---
-        {cv_text}
-        --- JD ---
-        {job.description}
-        """
-        
-        ai_strengths = []
-        ai_suggestions = []
-
-        client = groq.Groq(api_key=settings.GROQ_API_KEY)
-        chat_completion = client.chat.completions.create(
-            messages=[{"role": "user", "content": analysis_prompt}],
-            model="llama-3.1-8b-instant"
-        )
-        response_text = chat_completion.choices[0].message.content
-        
-        json_match = re.search(r'```json\n(.*?)\n```', response_text, re.DOTALL)
-        json_str = json_match.group(1) if json_match else response_text
-            
-        analysis_data = json.loads(json_str)
-        ai_strengths = analysis_data.get("strengths", ["AI không tìm thấy điểm mạnh."])
-        ai_suggestions = analysis_data.get("suggestions", ["AI không có gợi ý cải thiện."])
-        
-        return JsonResponse({'success': True, 'data': {
-            'score': ai_score,
-            'strengths': ai_strengths,
-            'suggestions': ai_suggestions
-        }})
+        return JsonResponse({'success': True, 'data': review_cv(cv_text, job_text(job))})
 
     except Exception as e:
         print(f"Lỗi API (analyze_cv_for_job_api): {e}")
@@ -538,39 +557,13 @@ def edit_job_view(request, job_id):
 @login_required
 def re_analyze_application_view(request, application_id):
     application = get_object_or_404(Application, pk=application_id, job__recruiter=request.user)
-    
-    cv_text = extract_text_from_cv(application.cv)
-    if not cv_text:
-        messages.error(request, 'Không thể đọc được file CV của ứng viên này.')
-        return redirect('applicant_list', job_id=application.job.id)
 
-    prompt = f"""Phân tích JD và CV dưới đây.
-    JD: {application.job.description}
-    CV: {cv_text}
-    Hãy trả về kết quả là MỘT CHUỖI JSON HỢP LỆ và KHÔNG có bất kỳ văn bản nào khác. JSON object phải có 2 key: "score" (số nguyên từ 0-100) và "summary" (tóm tắt 3 điểm mạnh nhất)."""
-    
-    try:
-        client = groq.Groq(api_key=settings.GROQ_API_KEY)
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": "Bạn là một AI chuyên sàng lọc CV, chỉ trả về kết quả dưới dạng JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            model="llama-3.1-8b-instant"
-        )
-        response_text = chat_completion.choices[0].message.content
-        ai_result = json.loads(response_text)
-        
-        application.ai_score = ai_result.get('score', 0)
-        application.ai_summary = ai_result.get('summary', 'Lỗi tóm tắt.')
-        application.save()
-        
-        messages.success(request, f'Đã phân tích thành công hồ sơ của {application.candidate.username}.')
-
-    except Exception as e:
-        print(f"Lỗi Groq API khi phân tích lại CV: {e}")
-        messages.error(request, 'AI đang gặp sự cố, không thể phân tích hồ sơ này.')
+    application.ai_score = None
+    application.ai_summary = AI_PENDING_SUMMARY
+    application.save(update_fields=['ai_score', 'ai_summary'])
+    tasks.enqueue('score_application', application_id=application.id)
 
+    messages.success(request, f'Đã đưa hồ sơ của {application.candidate.username} vào hàng đợi phân tích AI.')
     return redirect('applicant_list', job_id=application.job.id)
 
 @login_required
@@ -605,10 +598,13 @@ def confirm_interview_view(request, application_id):
 
 @login_required
 def notification_list_view(request):
-    notifications = Notification.objects.filter(recipient=request.user)
-    context = {'notifications': notifications}
+    page = pagination.paginate(request, Notification.objects.filter(recipient=request.user), ('-created_at', '-id'))
+    context = {'notifications': page, 'page': page}
     
-    Notification.objects.filter(recipient=request.user, is_read=False).update(is_read=True)
+    # Chỉ đánh dấu đã đọc các thông báo trên trang vừa hiển thị; trang sau vẫn giữ trạng thái chưa đọc.
+    unread_ids = [notification.pk for notification in page.object_list if not notification.is_read]
+    if unread_ids:
+        Notification.objects.filter(pk__in=unread_ids).update(is_read=True)
     
     return render(request, 'recruitment/notifications.html', context)
 
@@ -622,7 +618,7 @@ def cv_review_view(request):
             if not profile.cv_file:
                 return JsonResponse({'success': False, 'error': 'Bạn chưa tải lên CV.'})
             
-            cv_text = extract_text_from_cv(profile.cv_file)
+            cv_text = cv_text_for(profile, 'cv_file')
             if not cv_text:
                 return JsonResponse({'success': False, 'error': 'Không thể đọc nội dung file CV.'})
 
@@ -632,43 +628,7 @@ def cv_review_view(request):
                 return JsonResponse({'success': False, 'error': 'Vui lòng chọn một vị trí công việc.'})
 
             job = get_object_or_404(JobPosting, pk=job_id)
-            jd_text = job.description
-            score = get_ai_match_score(cv_text, jd_text) 
-            analysis_prompt = f"""
-            Một ứng viên có CV đạt {score} điểm (trên thang 100) khi so sánh với một Mô tả công việc.
-            Dựa trên CV và JD dưới đây, hãy đóng vai một chuyên gia tư vấn sự nghiệp và đưa ra phân tích.
-            
-            --- CV ---
-            {cv_text}
-            --- JD ---
-            {jd_text}
-
-            Hãy trả về kết quả dưới dạng MỘT CHUỖI JSON HỢP LỆ và KHÔNG có gì khác, bọc trong cặp dấu ```json ... ```.
-            JSON object chỉ cần có 2 key:
-            1. "strengths": (list) 2-3 điểm mạnh cụ thể của CV so với JD.
-            2. "suggestions": (list) 2-3 gợi ý cải thiện mang tính hành động cao.
-            """
-            
-            client = groq.Groq(api_key=settings.GROQ_API_KEY)
-            chat_completion = client.chat.completions.create(
-                messages=[{"role": "user", "content": analysis_prompt}],
-                model="llama-3.1-8b-instant" 
-            )
-            response_text = chat_completion.choices[0].message.content
-            
-            json_match = re.search(r'```json\n(.*?)\n```', response_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                json_str = response_text
-            analysis_data = json.loads(json_str)
-            final_response_data = {
-                "score": score,
-                "strengths": analysis_data.get("strengths", []), 
-                "suggestions": analysis_data.get("suggestions", [])
-            }
-            
-            return JsonResponse({'success': True, 'data': final_response_data})
+            return JsonResponse({'success': True, 'data': review_cv(cv_text, job_text(job))})
 
         except Exception as e:
             print("--- LỖI NGHIÊM TRỌNG KHI PHÂN TÍCH CV ---")
@@ -693,14 +653,16 @@ def recruitment_analytics_view(request):
     if selected_month:
         recruiter_jobs_query = recruiter_jobs_query.filter(created_at__month=selected_month)
     if selected_job_title:
-        recruiter_jobs_query = recruiter_jobs_query.filter(title=selected_job_title)
+        recruiter_jobs_query = recruiter_jobs_query.filter(title_folded=fold_key(selected_job_title))
 
-    jobs_grouped_stats = recruiter_jobs_query.values('title').annotate(
+    # Gom theo tiêu đề đã bỏ dấu, khớp với bộ lọc: các tiêu đề chỉ khác dấu được tính là một vị trí.
+    jobs_grouped_stats = recruiter_jobs_query.values('title_folded').annotate(
+        title=Min('title'),
         total_planned=Sum('quantity'),
         
         total_actual=Count('application', filter=Q(application__status='passed'))
         
-    ).order_by('title')
+    ).order_by('title_folded')
 
     job_titles_comparison = [job['title'] for job in jobs_grouped_stats]
     planned_quantity = [job['total_planned'] for job in jobs_grouped_stats]
@@ -728,7 +690,7 @@ def recruitment_analytics_view(request):
     if selected_month:
         all_applications_query = all_applications_query.filter(applied_at__month=selected_month)
     if selected_job_title:
-        all_applications_query = all_applications_query.filter(job__title=selected_job_title)
+        all_applications_query = all_applications_query.filter(job__title_folded=fold_key(selected_job_title))
 
     total_applications = all_applications_query.count()
     processed_applications = all_applications_query.exclude(status='pending').count()
@@ -760,7 +722,7 @@ def recruitment_analytics_view(request):
     all_job_titles_for_filter = JobPosting.objects.filter(
         recruiter=recruiter,
         is_archived=False
-    ).order_by('title').values_list('title', flat=True).distinct()
+    ).values('title_folded').annotate(title=Min('title')).order_by('title_folded').values_list('title', flat=True)
 
     context = {
         'total_applications': total_applications,
@@ -788,6 +750,17 @@ def recruitment_analytics_view(request):
     }
     return render(request, 'recruitment/recruitment_analytics.html', context)
 
+@login_required
+def llm_metrics_api(request):
+    """Thống kê lời gọi AI theo chỗ gọi (token, độ trễ, lỗi, chi phí). Chỉ dành cho tài khoản quản trị."""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Bạn không có quyền xem thống kê này.'}, status=403)
+    try:
+        hours = max(1, int(request.GET.get('hours', 24)))
+    except ValueError:
+        hours = 24
+    return JsonResponse({'hours': hours, 'call_sites': telemetry.summarize(hours)})
+
 @login_required
 def analytics_summary_api(request):
     if request.method == 'POST':
@@ -815,12 +788,7 @@ def analytics_summary_api(request):
             Sử dụng giọng văn chuyên nghiệp, đi thẳng vào vấn đề.
             """
 
-            client = groq.Groq(api_key=settings.GROQ_API_KEY)
-            chat_completion = client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model="llama-3.1-8b-instant", 
-            )
-            ai_analysis = chat_completion.choices[0].message.content
+            ai_analysis = llm.complete(prompt, site='analytics_summary')
 
             return JsonResponse({'success': True, 'analysis': ai_analysis})
 
@@ -830,54 +798,6 @@ def analytics_summary_api(request):
     
     return JsonResponse({'error': 'Invalid request method'}, status=405)
 
-def get_ai_match_score(cv_text, jd_text):
-    response_content = "" 
-    try:
-        prompt = f"""
-        Bạn là một chuyên gia tuyển dụng, hãy tiến hành phân tích CV và JD dưới đây theo 4 bước sau:
-        1. Rút ra 3-5 yêu cầu quan trọng như kỹ năng, kinh nghiệm từ JD.
-        2. Tìm điểm chung cụ thể trong CV khớp với từng yêu cầu của JD.
-        3. Ghi nhận những điểm mạnh và điểm yếu.
-        4. Dựa trên phân tích ở bước 3, hãy cho một điểm số duy nhất từ 0 đến 100.
-
-        Hãy trả về kết quả dưới dạng một chuỗi json hợp lệ và không có gì khác.
-        JSON object phải có dạng: {{"score": <số_nguyên>}}
-
-
-        --- JD ---
-        {jd_text}
-        
-        --- CV ---
-        {cv_text}
-        """
-
-        client = groq.Groq(api_key=settings.GROQ_API_KEY)
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": "Bạn là một AI chỉ trả lời bằng định dạng JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            model="llama-3.1-8b-instant",
-            temperature=0.0 
-        )
-        response_content = chat_completion.choices[0].message.content
-        
-        json_match = re.search(r'\{.*\}', response_content, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(0)
-            ai_result = json.loads(json_str)
-            score = int(ai_result.get("score", 0))
-        else:
-            numbers = re.findall(r'\d+', response_content)
-            score = int(numbers[-1]) if numbers else 0
-        
-        return score
-
-    except Exception as e:
-        print(f"Lỗi khi lấy điểm AI: {e}")
-        print(f"Nội dung AI trả về (gây lỗi): {response_content}")
-        return 0 
-    
 def job_list_view(request):
     if request.user.is_authenticated:
         if request.user.user_type == 'recruiter':
@@ -891,21 +811,23 @@ def job_list_view(request):
     location = request.GET.get('location', '')
     category = request.GET.get('category', '')
 
-    if query:
-        jobs = jobs.filter(
-            Q(title__icontains=query) | Q(description__icontains=query)
-        )
-    
     if location:
-        jobs = jobs.filter(location__icontains=location)
+        jobs = jobs.filter(province_folded=province_key(location) or fold_key(location))
         
     if category:
-        jobs = jobs.filter(category=category)
+        jobs = jobs.filter(Q(category=category) | Q(category_folded=fold_key(category)))
+
+    if query:
+        page = pagination.paginate(request, fulltext.search_jobs(jobs, query), fulltext.RANKED_ORDERING)
+    else:
+        page = pagination.paginate(request, jobs, ('-created_at', '-id'))
 
     context = {
-        'jobs': jobs.order_by('-created_at'),
+        'jobs': page,
+        'page': page,
         'categories': JobPosting.CATEGORY_CHOICES,
         'provinces': VIETNAM_PROVINCES,
+        'facets': facets.job_facets(query, location, category, VIETNAM_PROVINCES),
         'search_values': request.GET
     }
     return render(request, 'recruitment/job_list.html', context)
@@ -945,21 +867,23 @@ def job_board_view(request):
     location = request.GET.get('location', '')
     category = request.GET.get('category', '')
     
-    if query:
-        jobs = jobs.filter(
-            Q(title__icontains=query) | Q(description__icontains=query)
-        )
-    
     if location:
-        jobs = jobs.filter(location__icontains=location)
+        jobs = jobs.filter(province_folded=province_key(location) or fold_key(location))
         
     if category:
-        jobs = jobs.filter(category=category)
+        jobs = jobs.filter(Q(category=category) | Q(category_folded=fold_key(category)))
+
+    if query:
+        page = pagination.paginate(request, fulltext.search_jobs(jobs, query), fulltext.RANKED_ORDERING)
+    else:
+        page = pagination.paginate(request, jobs, ('-created_at', '-id'))
 
     context = {
-        'jobs': jobs.order_by('-created_at'),
+        'jobs': page,
+        'page': page,
         'categories': JobPosting.CATEGORY_CHOICES, 
         'provinces': VIETNAM_PROVINCES,
+        'facets': facets.job_facets(query, location, category, VIETNAM_PROVINCES),
         'search_values': request.GET 
     }
     return render(request, 'recruitment/job_board.html', context)
@@ -1140,12 +1064,15 @@ def chat_view(request, application_id):
         
         return redirect('chat_view', application_id=application_id)
 
-    messages_list = DirectMessage.objects.filter(application=application)
+    messages_list = DirectMessage.objects.filter(application=application).select_related('sender')
     messages_list.filter(recipient=request.user, is_read=False).update(is_read=True)
+    # Trang đầu là các tin mới nhất; "Xem tin cũ hơn" tải tiếp về phía trước. Hiển thị theo thứ tự thời gian.
+    page = pagination.paginate(request, messages_list, ('-timestamp', '-id'))
     
     context = {
         'application': application,
-        'messages': messages_list,
+        'messages': page.object_list[::-1],
+        'page': page,
         'hide_messages': True,
     }
     return render(request, 'recruitment/chat_page.html', context)
@@ -1220,7 +1147,9 @@ def hard_delete_job_view(request, job_id):
     
     if request.method == 'POST':
         job_title = job.title
+        cv_names = list(job.application.values_list('cv', flat=True))
         job.delete() 
+        release_cv_files(cv_names)
         
         messages.success(request, f'Đã xóa vĩnh viễn tin tuyển dụng "{job_title}".')
         return redirect('archived_job_list') 
@@ -1272,6 +1201,76 @@ def manage_templates_view(request):
         
     return render(request, 'recruitment/manage_templates.html', {'templates': templates})
 
+def _shortlist_applications(query, applications, top_n):
+    """
+    Bước 1 của tìm kiếm ứng viên: xếp hạng cục bộ (BM25 + vector n-gram) trên văn bản CV đã lưu.
+    Chỉ CV chưa có trong bộ nhớ đệm đặc trưng mới phải nạp văn bản từ CVText.
+    Trả về [(application, điểm)] của tối đa top_n hồ sơ gần nhất.
+    """
+    applications = list(applications)
+    missing = {app.cv_sha256 for app in applications if app.cv_sha256 and not has_features(app.cv_sha256)}
+    texts = dict(CVText.objects.filter(sha256__in=missing).values_list('sha256', 'text'))
+    documents = []
+    for app in applications:
+        if app.cv_sha256 and (app.cv_sha256 in texts or app.cv_sha256 not in missing):
+            documents.append((app.id, app.cv_sha256, texts.get(app.cv_sha256)))
+        else:
+            cv_text = cv_text_for(app)
+            if cv_text:
+                documents.append((app.id, app.cv_sha256, cv_text))
+    by_id = {app.id: app for app in applications}
+    return [(by_id[app_id], score) for app_id, score in hybrid_rank(query, documents, top_n)]
+
+def _search_applications(request, query, base_applications_query):
+    """
+    Tìm kiếm ứng viên hai bước: lọc cục bộ lấy top-N hồ sơ, rồi chỉ gửi N CV đã rút gọn sang AI để
+    xếp hạng lại và giải thích. Nếu AI lỗi thì trả về thứ tự của bước lọc cục bộ.
+    Mỗi hồ sơ trả về có thêm thuộc tính search_reason.
+    """
+    top_n = getattr(settings, 'APPLICANT_SEARCH_TOP_N', 10)
+    shortlist = _shortlist_applications(query, base_applications_query, top_n)
+    if not shortlist:
+        return []
+
+    stored = dict(CVText.objects.filter(sha256__in={app.cv_sha256 for app, _ in shortlist}).values_list('sha256', 'text'))
+    cv_texts = {app.id: stored.get(app.cv_sha256) or '' for app, _ in shortlist}
+    all_applications_data = [
+        {"application_id": app_id, "cv_text": cv_text}
+        for app_id, cv_text in fit_many('applicant_search', cv_texts).items()
+    ]
+    applications_json_str = json.dumps(all_applications_data, ensure_ascii=False)
+    prompt = f"""Với vai trò là headhunter, hãy phân tích yêu cầu sau đây và xếp hạng các HỒ SƠ ỨNG TUYỂN trong danh sách theo mức độ phù hợp.
+    YÊU CẦU: {query}
+    DANH SÁCH HỒ SƠ ỨNG TUYỂN: {applications_json_str}
+
+    Chỉ giữ lại những hồ sơ thực sự phù hợp, hồ sơ phù hợp nhất đứng đầu.
+    Hãy trả về MỘT CHUỖI JSON HỢP LỆ. Chuỗi JSON là một danh sách (list), mỗi phần tử là một object chỉ có 2 key: "application_id" (số nguyên) và "reason" (chuỗi giải thích ngắn gọn)."""
+
+    try:
+        ai_results = llm.complete(
+            prompt,
+            schema={'type': 'array', 'required': ['application_id']},
+            system="Bạn là một AI chuyên tìm kiếm, chỉ trả về kết quả dưới dạng JSON.",
+            site='applicant_search',
+        )
+    except Exception as e:
+        print(f"Lỗi Groq API khi tìm kiếm ứng viên: {e}")
+        messages.warning(request, 'AI đang gặp sự cố, kết quả dưới đây chỉ được xếp theo độ trùng từ khóa.')
+        for app, _ in shortlist:
+            app.search_reason = ''
+        return [app for app, _ in shortlist]
+
+    by_id = {app.id: app for app, _ in shortlist}
+    applications = []
+    for result in ai_results:
+        try:
+            app = by_id.pop(int(result.get('application_id')))
+        except (KeyError, TypeError, ValueError):
+            continue
+        app.search_reason = str(result.get('reason') or '')
+        applications.append(app)
+    return applications
+
 @login_required
 def all_applicants_view(request):
     """
@@ -1290,82 +1289,53 @@ def all_applicants_view(request):
 
     is_search_results = False 
     query = "" 
+    page = None
 
     if request.method == 'POST':
         query = request.POST.get('query', '')
         is_search_results = True 
         
         if query:
-            all_applications_data = []
-            for app in base_applications_query:
-                cv_text = extract_text_from_cv(app.cv)
-                if cv_text:
-                    all_applications_data.append({
-                        "application_id": app.id, 
-                        "cv_text": cv_text
-                    })
-
-            if not all_applications_data:
-                applications = base_applications_query.none()
-            else:
-                applications_json_str = json.dumps(all_applications_data, ensure_ascii=False)
-                prompt = f"""Với vai trò là headhunter, hãy phân tích yêu cầu sau đây và tìm 3 HỒ SƠ ỨNG TUYỂN phù hợp nhất từ danh sách.
-                YÊU CẦU: {query}
-                DANH SÁCH HỒ SƠ ỨNG TUYỂN: {applications_json_str}
-                
-                Hãy trả về MỘT CHUỖI JSON HỢP LỆ. Chuỗi JSON là một danh sách (list), mỗi phần tử là một object chỉ có 2 key: "application_id" (số nguyên) và "reason" (chuỗi giải thích ngắn gọn)."""
-                
-                try:
-                    client = groq.Groq(api_key=settings.GROQ_API_KEY)
-                    chat_completion = client.chat.completions.create(
-                        messages=[
-                            {"role": "system", "content": "Bạn là một AI chuyên tìm kiếm, chỉ trả về kết quả dưới dạng JSON."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        model="llama-3.1-8b-instant" 
-                    )
-                    response_text = chat_completion.choices[0].message.content
-                    
-                    json_str = response_text
-                    json_match_markdown = re.search(r'```json\n(.*?)\n```', response_text, re.DOTALL)
-                    
-                    if json_match_markdown:
-                        json_str = json_match_markdown.group(1)
-                    else:
-                        json_match_plain = re.search(r'[\{\[].*?[\}\]]', response_text, re.DOTALL)
-                        if json_match_plain:
-                            json_str = json_match_plain.group(0)
-                    
-                    ai_results = json.loads(json_str)
-                    
-                    application_ids = [res.get("application_id") for res in ai_results]
-                    applications = base_applications_query.filter(id__in=application_ids)
-                    
-                except Exception as e:
-                    print(f"Lỗi Groq API khi tìm kiếm ứng viên: {e}")
-                    messages.error(request, 'Đã có lỗi xảy ra với AI. Vui lòng thử lại.')
-                    applications = base_applications_query.none() 
+            applications = _search_applications(request, query, base_applications_query)
         else:
             applications = base_applications_query.none()
 
     else:
         sort_by = request.GET.get('sort', '-applied_at')
         status_filter = request.GET.get('status', '')
+        name_filter = fold_key(request.GET.get('name', ''))
 
-        valid_sorts = ['-applied_at', 'applied_at', '-ai_score']
+        valid_sorts = {
+            '-applied_at': ('-applied_at', '-id'),
+            'applied_at': ('applied_at', 'id'),
+            # Hồ sơ chưa có điểm xếp cuối; khóa phân trang keyset không được NULL.
+            '-ai_score': ('-score_key', '-id'),
+        }
         if sort_by not in valid_sorts:
             sort_by = '-applied_at'
         
         filtered_applications_query = base_applications_query
         if status_filter:
             filtered_applications_query = filtered_applications_query.filter(status=status_filter)
+        if name_filter:
+            # Mỗi điều kiện là một truy vấn con trên một bảng để PostgreSQL dùng được chỉ mục trigram của
+            # full_name_folded và UPPER(username) (migration 0012, 0015); OR trên hai bảng đã JOIN thì không.
+            filtered_applications_query = filtered_applications_query.filter(
+                Q(candidate__in=Profile.objects.filter(full_name_folded__contains=name_filter).values('user'))
+                | Q(candidate__in=CustomUser.objects.filter(username__icontains=name_filter).values('pk'))
+            )
 
-        applications = filtered_applications_query.order_by(sort_by)
+        filtered_applications_query = filtered_applications_query.annotate(
+            score_key=Coalesce('ai_score', Value(-1.0), output_field=FloatField())
+        )
+        page = pagination.paginate(request, filtered_applications_query, valid_sorts[sort_by])
+        applications = page
 
     context = {
         'applications': applications,
         'status_choices': status_choices,
         'query': query, 
+        'page': page,
         'is_search_results': is_search_results 
     }
     return render(request, 'recruitment/all_applicants_list.html', context)